@@ -0,0 +1,104 @@
+# ad_features.py
+"""
+Förberäknade egenskaper per annons (distans, hybrid, anställningsform, utbildning,
+körkort, språk). Varje beskrivning gås igenom en gång när resultatet hämtas och alla
+egenskaper packas i en bitmask; chattens frågor blir sedan bara maskuppslag.
+"""
+import re
+from enum import IntFlag
+import numpy as np
+
+class AdFeature(IntFlag):
+    REMOTE = 1 << 0             # \b(distans|remote|hemifrån|fjärr)\b
+    REMOTE_EDUCATION = 1 << 1   # distansutbildning/distanskurs (inte distansjobb)
+    HYBRID = 1 << 2
+    HELTID = 1 << 3
+    DELTID = 1 << 4
+    VIKARIAT = 1 << 5
+    TILLSVIDARE = 1 << 6
+    TIMANSTALLNING = 1 << 7
+    TIDSBEGRANSAD = 1 << 8
+    GYMNASIE = 1 << 9
+    UNIVERSITET = 1 << 10
+    KORKORT = 1 << 11
+    ENGELSKA = 1 << 12
+    SVENSKA = 1 << 13
+
+# Anställningsformer som ord i frågan -> flagga (matchas som delsträng i annonsen)
+EMPLOYMENT_TYPES = {
+    "heltid": AdFeature.HELTID,
+    "deltid": AdFeature.DELTID,
+    "vikariat": AdFeature.VIKARIAT,
+    "tillsvidare": AdFeature.TILLSVIDARE,
+    "timanställning": AdFeature.TIMANSTALLNING,
+    "tidsbegränsad": AdFeature.TIDSBEGRANSAD,
+}
+
+# (flagga, ord att leta efter, ordgränsmönster eller None för delsträngsmatchning)
+# Varje beskrivning görs om till gemener en gång; de billiga delsträngstesterna körs
+# först och ordgränsmönstret bara när något av orden faktiskt finns i texten.
+_SPEC = [
+    (AdFeature.REMOTE_EDUCATION, ("distansutbildning", "distanskurs"), None),
+    (AdFeature.REMOTE, ("distans", "remote", "hemifrån", "fjärr"), r"\b(?:distans|remote|hemifrån|fjärr)\b"),
+    (AdFeature.HYBRID, ("hybrid",), r"\bhybrid\b"),
+    (AdFeature.HELTID, ("heltid",), None),
+    (AdFeature.DELTID, ("deltid",), None),
+    (AdFeature.VIKARIAT, ("vikariat",), None),
+    (AdFeature.TILLSVIDARE, ("tillsvidare",), None),
+    (AdFeature.TIMANSTALLNING, ("timanställning",), None),
+    (AdFeature.TIDSBEGRANSAD, ("tidsbegränsad",), None),
+    (AdFeature.GYMNASIE, ("gymnasie",), r"\bgymnasie\b"),
+    (AdFeature.UNIVERSITET, ("universitet", "högskola", "högre utbildning"),
+     r"\b(?:universitet|högskola|högre utbildning)\b"),
+    (AdFeature.KORKORT, ("körkort",), r"\bkörkort\b"),
+    (AdFeature.ENGELSKA, ("engelska",), r"\bengelska\b"),
+    (AdFeature.SVENSKA, ("svenska",), r"\bsvenska\b"),
+]
+_COMPILED = [(int(flag), words, re.compile(pattern) if pattern else None) for flag, words, pattern in _SPEC]
+
+def extract_features_one(text):
+    """
+    Bitmask med alla AdFeature-flaggor som förekommer i en annonstext.
+    """
+    if not isinstance(text, str):
+        return 0
+    low = text.lower()
+    flags = 0
+    for flag, words, pattern in _COMPILED:
+        if any(w in low for w in words) and (pattern is None or pattern.search(low)):
+            flags |= flag
+    return flags
+
+def extract_features(descriptions):
+    """
+    Bitmask-array (uint16) med en rad per beskrivning.
+    """
+    return np.fromiter((extract_features_one(t) for t in descriptions), dtype=np.uint16,
+                       count=len(descriptions))
+
+def add_features(df):
+    """
+    Lägger till kolumnen "features" (bitmask) i df om den saknas. Returnerar df.
+    """
+    if "features" not in df.columns:
+        df["features"] = extract_features(df["description"].tolist())
+    return df
+
+def has_any(df, flags):
+    """
+    Bool-array: annonser som har minst en av flaggorna.
+    """
+    return (df["features"].to_numpy() & int(flags)) != 0
+
+def remote_mask(df):
+    """
+    Distansjobb: nämner distans/remote/hemifrån/fjärr men inte distansutbildning/-kurs.
+    """
+    features = df["features"].to_numpy()
+    return ((features & AdFeature.REMOTE) != 0) & ((features & AdFeature.REMOTE_EDUCATION) == 0)
+
+def onsite_mask(df):
+    """
+    Platsjobb: nämner inte distans/remote/hemifrån/fjärr.
+    """
+    return ~has_any(df, AdFeature.REMOTE)
@@ -0,0 +1,172 @@
+# batch.py
+"""
+Headless batchanalys: samma flöde som appen (hämta -> embedda -> rangordna -> kompetenser)
+för många sökfrågor på en gång, fördelat på en processpool. Resultatet strömmas ut
+som JSONL, en rad per fråga, i samma ordning som frågorna.
+
+Med --ads rangordnas frågorna mot en annonsdump i stället för mot JobTech; dumpen
+embeddas en gång i huvudprocessen; arbetarna läser den kvantiserade matrisen och
+omrankar kandidaterna mot en minnesmappad float32-fil (se embedding_store).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+import embeddings
+from dump_reader import iter_ad_chunks, COLUMNS
+from embeddings import encode_texts, get_embedding
+from embedding_store import EmbeddingStore, STORE_DTYPE
+from ad_features import AdFeature, add_features, has_any, remote_mask
+from skills import find_best_occupation_from_query_or_titles, get_skills_for_user_query
+from pipeline import run_search
+
+# Satt i varje arbetsprocess av _init_worker
+_ads = None
+_ad_store = None
+
+def load_ads(path):
+    """
+    Läser en annonsdump (JSONL, en JSON-lista eller ett JobTech-svar med "hits")
+    till en DataFrame med appens kolumner. Dumpen läses strömmande, se dump_reader.
+    """
+    chunks = list(iter_ad_chunks(path))
+    if not chunks:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+def analyze_ads(query, df, top_k=7):
+    """
+    Rapport för en frågas annonser: städer, andel distans/hybrid, yrke och kompetenser.
+    df ska ha kolumnen "features" (se ad_features.add_features).
+    """
+    if df.empty:
+        return {"query": query, "n_ads": 0}
+    n = len(df)
+    cities = df["city"].fillna("Ingen ort").value_counts().head(3)
+    columns = [c for c in ("title", "company", "city", "url", "similarity") if c in df.columns]
+    occupation = find_best_occupation_from_query_or_titles(query, df)
+    return {
+        "query": query,
+        "n_ads": n,
+        "top_cities": [[city, int(cnt)] for city, cnt in cities.items()],
+        "remote_share": round(float(remote_mask(df).sum()) / n, 4),
+        "hybrid_share": round(float(has_any(df, AdFeature.HYBRID).sum()) / n, 4),
+        "occupation": occupation,
+        "skills": get_skills_for_user_query(query, df, top_k=top_k, occ=occupation),
+        "ads": [{k: (float(v) if k == "similarity" else v) for k, v in row.items()}
+                for row in df[columns].head(top_k).fillna("").to_dict("records")],
+    }
+
+def search_dump(query, num_jobs):
+    """
+    Rangordnar den delade annonsdumpen mot query (i en arbetsprocess).
+    """
+    idx, scores = _ad_store.rank(get_embedding(query), top_k=num_jobs)
+    df = _ads.iloc[idx].copy()
+    df["similarity"] = scores
+    return add_features(df)
+
+def analyze_query(query, num_jobs=10):
+    """
+    Kör hela flödet för en fråga och returnerar rapporten som en dict.
+    Fel i en enskild fråga stoppar inte batchen utan hamnar i fältet "error".
+    """
+    start = time.perf_counter()
+    try:
+        if _ad_store is not None:
+            df = search_dump(query, num_jobs)
+        else:
+            result = run_search(query, num_jobs)
+            if result.error:
+                # run_search returnerar då osorterade annonser; en rapport på dem vore missvisande
+                raise RuntimeError(f"rangordningen misslyckades: {result.error}")
+            df = result.df
+        report = analyze_ads(query, df)
+    except Exception as e:
+        report = {"query": query, "error": f"{type(e).__name__}: {e}"}
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+def _init_worker(threads, dump_dir):
+    """
+    Varje arbetsprocess får ett begränsat antal modelltrådar och ev. dumpen. Alla
+    delar embedding-cachen i EMBEDDING_CACHE_DIR (skrivningarna låses, se embedding_cache).
+    Utskrifter från arbetarna går till stderr så att stdout bara innehåller JSONL.
+    """
+    global _ads, _ad_store
+    sys.stdout = sys.stderr
+    embeddings.NUM_THREADS = threads
+    if dump_dir:
+        _ads = pd.read_pickle(os.path.join(dump_dir, "ads.pkl"))
+        _ad_store = EmbeddingStore.load(dump_dir)
+
+def _prepare_dump(ads_path, directory):
+    df = load_ads(ads_path)
+    df["description"] = df["description"].fillna("")
+    matrix = encode_texts(df["description"].tolist())
+    EmbeddingStore(matrix, STORE_DTYPE, exact=matrix).save(directory)
+    df.reset_index(drop=True).to_pickle(os.path.join(directory, "ads.pkl"))
+    return len(df)
+
+def analyze_queries(queries, num_jobs=10, jobs=None, ads_path=None):
+    """
+    Generator med en rapport per fråga, i frågornas ordning, beräknade i en processpool.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    ctx = multiprocessing.get_context("spawn")   # fork efter att modellen startat trådar kan låsa sig
+    with tempfile.TemporaryDirectory() as dump_dir:
+        if ads_path:
+            n = _prepare_dump(ads_path, dump_dir)
+            print(f"📦 Embeddade {n} annonser från {ads_path}", file=sys.stderr)
+        init_args = (threads, dump_dir if ads_path else None)
+        with ctx.Pool(jobs, initializer=_init_worker, initargs=init_args) as pool:
+            args = ((q, num_jobs) for q in queries)
+            yield from pool.imap(_analyze_args, args)
+
+def _analyze_args(args):
+    return analyze_query(*args)
+
+def read_queries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Batchanalys av sökfrågor, resultat som JSONL.")
+    parser.add_argument("queries", nargs="*", help="sökfrågor")
+    parser.add_argument("--queries-file", help="fil med en sökfråga per rad")
+    parser.add_argument("--ads", help="annonsdump (JSON/JSONL) att söka i i stället för JobTech")
+    parser.add_argument("--num-jobs", type=int, default=10, help="annonser per fråga")
+    parser.add_argument("--jobs", type=int, default=None, help="antal processer (standard: antal kärnor)")
+    parser.add_argument("--output", default="-", help="JSONL-fil (standard: stdout)")
+    args = parser.parse_args()
+
+    queries = list(args.queries)
+    if args.queries_file:
+        queries += read_queries(args.queries_file)
+    if not queries:
+        parser.error("inga sökfrågor angivna")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    failed = 0
+    try:
+        for report in analyze_queries(queries, args.num_jobs, args.jobs, args.ads):
+            failed += "error" in report
+            out.write(json.dumps(report, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(queries)} frågor på {elapsed:.1f} s ({len(queries) / elapsed:.2f} frågor/s, {failed} fel)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
+
+# python batch.py --queries-file queries.txt --jobs 4 --output rapport.jsonl
@@ -0,0 +1,56 @@
+# bench_ad_features.py
+import argparse
+import time
+import pandas as pd
+from ad_features import AdFeature, EMPLOYMENT_TYPES, add_features, has_any, remote_mask, onsite_mask
+from jobtech_stub import load_recorded_hits
+
+OLD_SCANS = [
+    r"\b(?:distans|remote|hemifrån|fjärr)\b",
+    r"distansutbildning|distanskurs",
+    r"\bhybrid\b",
+    r"\bgymnasie\b",
+    r"\b(?:universitet|högskola|högre utbildning)\b",
+    r"\bkörkort\b",
+    r"\bengelska\b",
+    r"\bsvenska\b",
+] + list(EMPLOYMENT_TYPES)
+
+def old_scans(df):
+    """
+    Den gamla vägen: en str.contains-skanning över alla beskrivningar per fråga.
+    """
+    return [df["description"].str.contains(p, case=False, na=False) for p in OLD_SCANS]
+
+def mask_lookups(df):
+    masks = [remote_mask(df), onsite_mask(df)]
+    masks += [has_any(df, f) for f in AdFeature]
+    return masks
+
+def timed(fn, *args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Egenskapsextraktion en gång jämfört med regex-skanningar per fråga.")
+    parser.add_argument("--ads", type=int, nargs="+", default=[50, 1000, 10000])
+    args = parser.parse_args()
+
+    for n in args.ads:
+        hits = load_recorded_hits(total=n)
+        df = pd.DataFrame({"description": [h["description"]["text"] for h in hits]})
+        scans = timed(old_scans, df)
+        extract = timed(lambda d: add_features(d.drop(columns="features", errors="ignore")), df)
+        add_features(df)
+        lookups = timed(mask_lookups, df)
+        print(f"{n:>6d} annonser: alla regex-skanningar {scans:8.2f} ms | "
+              f"extraktion en gång {extract:8.2f} ms | alla maskuppslag {lookups:6.3f} ms")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_ad_features.py
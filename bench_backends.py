@@ -0,0 +1,69 @@
+# bench_backends.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from embedding_backends import BACKENDS
+
+def child(ads, batch_size):
+    """
+    Körs i en ny process per backend så att importtiden mäts från kall start.
+    """
+    start = time.perf_counter()
+    import embeddings
+    imported = time.perf_counter()
+    embeddings.get_model()
+    loaded = time.perf_counter()
+    embeddings.encode_texts(["Jag kan Python och vill jobba med data"], use_cache=False)
+    first = time.perf_counter()
+
+    from bench_embeddings import synthetic_descriptions
+    descriptions = synthetic_descriptions(ads)
+    steady = time.perf_counter()
+    embeddings.encode_texts(descriptions, batch_size=batch_size, use_cache=False)
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_s": imported - start,
+        "load_s": loaded - imported,
+        "first_query_ms": (first - loaded) * 1000,
+        "ads_per_s": ads / (done - steady),
+        "torch_imported": "torch" in sys.modules,
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description="Importtid, första fråga och genomströmning per embedding-backend.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--model-dir", default=os.environ.get("EMBEDDING_MODEL_DIR"),
+                        help="lokal modellkatalog (se export_model.py)")
+    parser.add_argument("--onnx-file", default=None, help="t.ex. model_int8.onnx")
+    parser.add_argument("--ads", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.ads, args.batch_size)
+        return
+
+    for backend in args.backends:
+        env = dict(os.environ, EMBEDDING_BACKEND=backend)
+        if args.model_dir:
+            env["EMBEDDING_MODEL_DIR"] = args.model_dir
+        if args.onnx_file:
+            env["EMBEDDING_ONNX_FILE"] = args.onnx_file
+        out = subprocess.run([sys.executable, __file__, "--child", "--ads", str(args.ads),
+                              "--batch-size", str(args.batch_size)], env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{backend:<22s}: ⚠️ misslyckades: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{backend:<22s}: import {r['import_s']:5.2f} s, laddning {r['load_s']:5.2f} s, "
+              f"första fråga {r['first_query_ms']:7.1f} ms, {r['ads_per_s']:7.1f} annonser/s"
+              f"{'' if r['torch_imported'] else ' (utan torch)'}")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_backends.py --model-dir models/minilm --onnx-file model_int8.onnx
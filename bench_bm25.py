@@ -0,0 +1,87 @@
+# bench_bm25.py
+import argparse
+import random
+import time
+import numpy as np
+from bench_vector_index import clustered_embeddings
+from bm25_index import BM25Index
+from dump_reader import iter_ad_chunks, records_to_dataframe
+from jobtech_stub import load_recorded_hits
+from pipeline import fuse
+from skill_embeddings import split_sentences
+from vector_index import IVFIndex
+
+def synthetic_ads(n, seed=0):
+    """
+    n annonser ihopsatta av slumpade meningar och rubriker från de sparade JobTech-svaren,
+    med ett löpnummer i varje rubrik så att ordförrådet växer med korpusen.
+    """
+    df = records_to_dataframe(load_recorded_hits())
+    titles = df["title"].tolist()
+    sentences = [s for d in df["description"].fillna("") for s in split_sentences(d)]
+    rng = random.Random(seed)
+    return ([f"{rng.choice(titles)} {i}" for i in range(n)],
+            [" ".join(rng.choices(sentences, k=rng.randint(3, 12))) for _ in range(n)])
+
+def percentiles(times):
+    p50, p95 = np.percentile(np.array(times) * 1000, [50, 95])
+    return f"p50 {p50:6.2f} ms, p95 {p95:6.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Bygg- och frågetid för BM25-indexet och hybridsökning.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="annonser per inkrementell insättning")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dump", help="annonsdump (JSON/JSONL) i stället för syntetiska annonser")
+    args = parser.parse_args()
+
+    if args.dump:
+        titles, descriptions = [], []
+        for chunk in iter_ad_chunks(args.dump):
+            titles += chunk["title"].tolist()
+            descriptions += chunk["description"].fillna("").tolist()
+        titles, descriptions = titles[:args.rows], descriptions[:args.rows]
+    else:
+        titles, descriptions = synthetic_ads(args.rows)
+    n = len(titles)
+    ids = [str(i) for i in range(n)]
+
+    lexical = BM25Index()
+    start = time.perf_counter()
+    for s in range(0, n, args.chunk_size):
+        lexical.add(ids[s:s + args.chunk_size], titles[s:s + args.chunk_size], descriptions[s:s + args.chunk_size])
+    print(f"bygg: {n:,d} annonser i chunkar om {args.chunk_size} på {time.perf_counter() - start:.1f} s, "
+          f"{len(lexical.vocab):,d} termer, {len(lexical._segments)} segment, {lexical.nbytes / 1e6:.1f} MB")
+    start = time.perf_counter()
+    lexical.compact()
+    print(f"compact: {time.perf_counter() - start:.2f} s, {lexical.nbytes / 1e6:.1f} MB")
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(titles).split()[:-1]) for _ in range(args.queries)]
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        lexical.search(q, k=args.k)
+        times.append(time.perf_counter() - start)
+    print(f"BM25         : {percentiles(times)}")
+
+    vectors = clustered_embeddings(n, args.dim)
+    index = IVFIndex(args.dim, n_lists=256)
+    index.add(ids, vectors)
+    query_vecs = vectors[np.random.default_rng(1).integers(0, n, args.queries)]
+    for method in ("semantic", "rrf", "weighted"):
+        times = []
+        for q, vec in zip(queries, query_vecs):
+            start = time.perf_counter()
+            semantic = index.search(vec, k=args.k * 5)
+            if method != "semantic":
+                fuse(semantic, lexical.search(q, k=args.k * 5), method)[:args.k]
+            times.append(time.perf_counter() - start)
+        print(f"hybrid {method:<8s}: {percentiles(times)}")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_bm25.py --rows 100000
@@ -0,0 +1,71 @@
+# bench_embedding_store.py
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from bench_vector_index import clustered_embeddings
+from embedding_store import EmbeddingStore, DTYPES, ndcg_at_k
+from ranking import rank_by_similarity
+
+def object_column_bytes(matrix):
+    """
+    Den gamla lagringen: en NumPy-vektor per rad i en pandas object-kolumn.
+    """
+    return int(pd.Series(list(matrix)).memory_usage(deep=True)) + sum(v.nbytes for v in matrix)
+
+def dump_embeddings(path, rows, held_out):
+    """
+    Riktiga embeddings: annonsbeskrivningar som korpus och rubrikerna från de
+    undanhållna annonserna som frågor (kräver modellen).
+    """
+    from dump_reader import iter_ad_chunks
+    from embeddings import encode_texts
+    df = pd.concat(iter_ad_chunks(path), ignore_index=True).head(rows + held_out)
+    corpus = encode_texts(df["description"].iloc[held_out:].fillna("").tolist())
+    queries = encode_texts(df["title"].iloc[:held_out].fillna("").tolist())
+    return corpus, queries
+
+def main():
+    parser = argparse.ArgumentParser(description="Minne och NDCG för kvantiserade embeddings mot float32.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200, help="antal undanhållna frågor")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=4)
+    parser.add_argument("--dump", help="annonsdump att embedda i stället för syntetiska vektorer")
+    args = parser.parse_args()
+
+    if args.dump:
+        corpus, queries = dump_embeddings(args.dump, args.rows, args.queries)
+    else:
+        data = clustered_embeddings(args.rows + args.queries, args.dim)
+        corpus, queries = data[args.queries:], data[:args.queries]
+    corpus = np.ascontiguousarray(corpus, dtype=np.float32)
+    print(f"korpus {len(corpus):,d} x {corpus.shape[1]}, {len(queries)} undanhållna frågor, "
+          f"pandas object-kolumn {object_column_bytes(corpus[:10000]) * len(corpus) / 10000 / 1e6:.1f} MB")
+
+    # referens: exakt float32-rankning; graderad relevans k, k-1, ..., 1 för dess top-k, 0 för resten
+    truth = [rank_by_similarity(q, corpus, top_k=args.k)[0] for q in queries]
+    relevance = []
+    for t in truth:
+        rel = np.zeros(len(corpus))
+        rel[t] = np.arange(args.k, 0, -1)
+        relevance.append(rel)
+
+    for dtype in DTYPES:
+        for exact in ((None, corpus) if dtype != "float32" else (None,)):
+            store = EmbeddingStore(corpus, dtype, exact=exact)
+            start = time.perf_counter()
+            ranked = [store.rank(q, top_k=args.k, rerank=args.rerank)[0] for q in queries]
+            ms = (time.perf_counter() - start) / len(queries) * 1000
+            ndcg = np.mean([ndcg_at_k(r, rel, args.k) for r, rel in zip(ranked, relevance)])
+            recall = np.mean([len(set(r) & set(t)) / args.k for r, t in zip(ranked, truth)])
+            label = dtype + (" + omrankning" if exact is not None else "")
+            mb = (store.data.nbytes + (store.scales.nbytes if store.scales is not None else 0)) / 1e6
+            print(f"{label:<22s}: {mb:7.1f} MB i minnet ({corpus.nbytes / 1e6 / mb:4.1f}x mindre), "
+                  f"{ms:6.2f} ms/fråga, NDCG@{args.k} {ndcg:.4f}, recall@{args.k} {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_embedding_store.py --rows 100000
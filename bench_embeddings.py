@@ -0,0 +1,62 @@
+# bench_embeddings.py
+import argparse
+import random
+import time
+import pandas as pd
+from embeddings import get_model, create_embeddings
+
+WORDS = (
+    "vi söker en erfaren utvecklare med kunskap inom python java sql molntjänster "
+    "du kommer att arbeta i ett agilt team med fokus på kvalitet och kundnytta "
+    "körkort är meriterande heltid tillsvidare distans hybrid svenska engelska"
+).split()
+
+def synthetic_descriptions(n, seed=0):
+    """
+    Skapar n syntetiska annonstexter med varierande längd (som riktiga annonser).
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(20, 400))) for _ in range(n)]
+
+def per_row(descriptions):
+    """
+    Den gamla vägen: en forward pass per annons.
+    """
+    df = pd.DataFrame({"description": descriptions})
+    model = get_model()
+    df["embedding"] = df["description"].apply(lambda x: model.encode(x))
+    return df
+
+def batched(descriptions, batch_size, use_cache=False):
+    df = pd.DataFrame({"description": descriptions})
+    return create_embeddings(df, batch_size=batch_size, use_cache=use_cache)
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Jämför annonser/sekund för per-rad- och batchkodning.")
+    parser.add_argument("--ads", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = parser.parse_args()
+
+    descriptions = synthetic_descriptions(args.ads)
+    get_model().encode("uppvärmning")  # värm upp modellen innan mätning
+
+    elapsed = timed(per_row, descriptions)
+    print(f"per rad        : {args.ads / elapsed:8.1f} annonser/s ({elapsed:.2f} s)")
+    for bs in args.batch_sizes:
+        elapsed = timed(batched, descriptions, bs)
+        print(f"batch {bs:<9d}: {args.ads / elapsed:8.1f} annonser/s ({elapsed:.2f} s)")
+
+    # andra körningen med cache: alla annonser ska vara träffar
+    batched(descriptions, args.batch_sizes[-1], True)
+    elapsed = timed(batched, descriptions, args.batch_sizes[-1], True)
+    print(f"cache (varm)   : {args.ads / elapsed:8.1f} annonser/s ({elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_embeddings.py --ads 500
@@ -0,0 +1,82 @@
+# bench_ingest.py
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dump_reader import iter_ad_chunks
+from fetch_jobs import hits_to_dataframe
+from jobtech_stub import load_recorded_hits
+
+def write_synthetic_dump(path, n):
+    """
+    Skriver n annonser i JobTech-format som ett objekt med "hits", utan att hålla
+    dem i minnet (de inspelade annonserna upprepas med nya id:n).
+    """
+    base = load_recorded_hits()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"total": {"value": %d}, "hits": [' % n)
+        for i in range(n):
+            hit = dict(base[i % len(base)], id=str(30000000 + i))
+            f.write(("," if i else "") + json.dumps(hit, ensure_ascii=False))
+        f.write("]}")
+
+def load_all(path):
+    """
+    Den gamla vägen: hela svaret med json.load och en DataFrame över alla hits.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        hits = json.load(f)["hits"]
+    df = hits_to_dataframe(hits)
+    return len(df)
+
+def stream_chunks(path, chunk_size):
+    return sum(len(chunk) for chunk in iter_ad_chunks(path, chunk_size))
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # kB på Linux
+
+def child(mode, path, chunk_size):
+    """
+    Körs i en egen process så att toppminnet (ru_maxrss) bara gäller ett sätt.
+    """
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    n = load_all(path) if mode == "load" else stream_chunks(path, chunk_size)
+    print(json.dumps({"ads": n, "seconds": time.perf_counter() - start,
+                      "baseline_mb": baseline, "peak_mb": peak_rss_mb()}))
+
+def measure(mode, path, chunk_size):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, path, "--chunk-size", str(chunk_size)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Toppminne och tid: json.load av hela dumpen mot strömmande chunks.")
+    parser.add_argument("--ads", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.ads:
+            path = os.path.join(tmp, f"dump-{n}.json")
+            write_synthetic_dump(path, n)
+            size_mb = os.path.getsize(path) / 1e6
+            for mode in ("load", "stream"):
+                r = measure(mode, path, args.chunk_size)
+                print(f"{n:>7d} annonser ({size_mb:6.1f} MB) {mode:<6s}: {r['ads'] / r['seconds']:9.0f} annonser/s, "
+                      f"topp-RSS {r['peak_mb']:7.1f} MB (+{r['peak_mb'] - r['baseline_mb']:.1f} MB över start)")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
+
+# python bench_ingest.py --ads 10000 100000 300000
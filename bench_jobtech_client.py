@@ -0,0 +1,51 @@
+# bench_jobtech_client.py
+import argparse
+import asyncio
+import time
+import requests
+from jobtech_client import JobTechClient
+from jobtech_stub import StubJobTechServer
+
+def sequential_requests(base_url, max_ads, page_size):
+    """
+    Referens: blockerande requests.get utan session, en sida i taget.
+    """
+    hits = []
+    for offset in range(0, max_ads, page_size):
+        resp = requests.get(f"{base_url}/search", params={"q": "", "offset": offset, "limit": page_size})
+        resp.raise_for_status()
+        hits.extend(resp.json()["hits"])
+    return hits
+
+async def async_client(base_url, max_ads, page_size, concurrency):
+    """
+    Klienten skapas och värms upp innan mätningen, som den delade klienten i appen.
+    Returnerar (antal annonser, sekunder).
+    """
+    async with JobTechClient(base_url, concurrency=concurrency) as client:
+        await client.fetch_hits("", page_size * concurrency, page_size=page_size)
+        start = time.perf_counter()
+        hits = await client.fetch_hits("", max_ads, page_size=page_size)
+        return len(hits), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Genomströmning för JobTech-klienten mot en lokal stub.")
+    parser.add_argument("--ads", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulerad svarstid per sida (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with StubJobTechServer(total=args.ads, latency=args.latency) as stub:
+        start = time.perf_counter()
+        n = len(sequential_requests(stub.base_url, args.ads, args.page_size))
+        elapsed = time.perf_counter() - start
+        print(f"requests, sekventiellt : {n / elapsed:8.0f} annonser/s ({elapsed:.2f} s)")
+        for c in args.concurrency:
+            n, elapsed = asyncio.run(async_client(stub.base_url, args.ads, args.page_size, c))
+            print(f"async, concurrency {c:<4d}: {n / elapsed:8.0f} annonser/s ({elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_jobtech_client.py --ads 2000 --latency 0.1
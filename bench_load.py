@@ -0,0 +1,218 @@
+# bench_load.py
+"""
+Lasttest av chattbotens flöde mot den lokala JobTech-stubben: ett antal syntetiska
+sessioner körs samtidigt, och varje session söker som appen (pipeline.run_search:
+hämtning, embedding och hybridrangordning), tar fram kompetenser och ställer chattfrågor.
+Sökningens delsteg (fetch, embed, rank) mäts med tracerns spans.
+
+Rapporten (p50/p95/p99 per steg, genomströmning och toppminne) sparas som JSON så att
+två körningar, t.ex. före och efter en commit, kan jämföras med --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+
+QUERIES = ["Systemutvecklare", "Undersköterska", "Lastbilschaufför", "Förskollärare",
+           "Data Scientist", "Kock", "Backendutvecklare", "Drifttekniker"]
+QUESTIONS = ["Finns det distansjobb?", "Vilka kompetenser behövs?", "Krävs körkort?",
+             "Är det heltid?", "Finns det jobb i Göteborg?", "Behöver man kunna engelska?"]
+STAGES = ["search", "skills", "intents", "session"]
+
+class Recorder:
+    """
+    Latenser per steg från alla sessionstrådar.
+    """
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self.errors = {stage: 0 for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def timed(self, stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors[stage] += 1
+            raise
+        finally:
+            with self._lock:
+                self.samples[stage].append(time.perf_counter() - start)
+
+    def summary(self):
+        out = {}
+        for stage in STAGES:
+            times = np.array(self.samples[stage]) * 1000
+            if not len(times):
+                continue
+            p50, p95, p99 = np.percentile(times, [50, 95, 99])
+            out[stage] = {"count": len(times), "errors": self.errors[stage], "mean_ms": float(times.mean()),
+                          "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+                          "max_ms": float(times.max())}
+        return out
+
+def run_session(i, num_jobs, rec):
+    """
+    En användares besök: sökning (som i appen), kompetenser och alla chattfrågor.
+    """
+    from pipeline import run_search
+    from intents import CityIndex, answer_question
+    from skills import get_skills_for_user_query
+
+    query = QUERIES[i % len(QUERIES)]
+    result = rec.timed("search", run_search, query, num_jobs)
+    if result.error:
+        raise RuntimeError(f"rangordningen misslyckades: {result.error}")
+    df = result.df
+    if df.empty:
+        raise RuntimeError(f"inga annonser för {query!r}")
+    rec.timed("skills", get_skills_for_user_query, query, df)
+    city_index = CityIndex.from_df(df)
+    for question in QUESTIONS:
+        rec.timed("intents", answer_question, question, df, city_index)
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # kB på Linux
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_load_test(sessions, concurrency, num_jobs, latency, total_ads):
+    from jobtech_stub import StubJobTechServer
+    from resources import warm_up
+    import jobtech_client
+    import tracing
+
+    tracing.enable()
+    warm_up()   # taxonomi och modell laddas före mätningen, som i appen
+    tracing.tracer.reset()
+    rss_before = peak_rss_mb()
+    rec = Recorder()
+    base_url = jobtech_client.BASE_URL
+    with StubJobTechServer(total=total_ads, latency=latency) as stub:
+        def session(i):
+            try:
+                rec.timed("session", run_session, i, num_jobs, rec)
+            except Exception as e:
+                print(f"⚠️ Session {i}: {type(e).__name__}: {e}", file=sys.stderr)
+
+        jobtech_client.BASE_URL = stub.base_url   # run_search söker mot stubben
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                list(pool.map(session, range(sessions)))
+            wall = time.perf_counter() - start
+        finally:
+            jobtech_client.BASE_URL = base_url
+        served = stub.requests
+    stages = rec.summary()
+    done = stages.get("session", {}).get("count", 0) - stages.get("session", {}).get("errors", 0)
+    return {
+        "meta": {"commit": git_commit(), "date": datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "cpus": os.cpu_count(), "sessions": sessions,
+                 "concurrency": concurrency, "num_jobs": num_jobs, "stub_latency_s": latency},
+        "wall_s": wall,
+        "sessions_per_s": done / wall,
+        "searches_per_s": stages.get("search", {}).get("count", 0) / wall,
+        "requests_per_s": served / wall,    # HTTP-anrop som stubben besvarade (sidor och omförsök)
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_growth_mb": peak_rss_mb() - rss_before,
+        "stages": stages,
+        "spans": tracing.tracer.snapshot()["spans"],
+    }
+
+def print_report(report):
+    print(f"⏱️ {report['meta']['sessions']} sessioner, {report['meta']['concurrency']} samtidigt: "
+          f"{report['sessions_per_s']:.2f} sessioner/s, {report['searches_per_s']:.2f} sökningar/s, "
+          f"{report['requests_per_s']:.2f} anrop/s, toppminne {report['peak_rss_mb']:.0f} MB "
+          f"(+{report['peak_rss_growth_mb']:.0f} MB under testet)")
+    print(f"{'steg':<18s} {'antal':>6s} {'fel':>4s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:<18s} {s['count']:6d} {s['errors']:4d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['p99_ms']:9.1f}")
+
+def compare(base, new, threshold=0.10):
+    """
+    Jämför två rapporter. Returnerar rader (mått, före, efter, relativ ändring, regression?)
+    där en regression är en ökning av latens/minne eller minskning av genomströmning
+    med mer än threshold.
+    """
+    rows = []
+    def add(name, before, after, higher_is_better=False):
+        if before is None or after is None:
+            return
+        change = (after - before) / before if before else 0.0
+        worse = -change if higher_is_better else change
+        rows.append((name, before, after, change, worse > threshold))
+    add("sessions_per_s", base.get("sessions_per_s"), new.get("sessions_per_s"), higher_is_better=True)
+    add("searches_per_s", base.get("searches_per_s"), new.get("searches_per_s"), higher_is_better=True)
+    add("peak_rss_mb", base.get("peak_rss_mb"), new.get("peak_rss_mb"))
+    for stage in STAGES:
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            add(f"{stage}.{key}", base.get("stages", {}).get(stage, {}).get(key),
+                new.get("stages", {}).get(stage, {}).get(key))
+    # sökningens delsteg (fetch, embed, rank) från tracern
+    base_spans = {s["span"]: s for s in base.get("spans", [])}
+    new_spans = {s["span"]: s for s in new.get("spans", [])}
+    for name in sorted(base_spans.keys() & new_spans.keys()):
+        for key in ("p50_ms", "p95_ms"):
+            add(f"span.{name}.{key}", base_spans[name].get(key), new_spans[name].get(key))
+    return rows
+
+def print_comparison(rows, base_name, new_name):
+    print(f"{'mått':<34s} {base_name[:12]:>12s} {new_name[:12]:>12s} {'ändring':>9s}")
+    for name, before, after, change, regression in rows:
+        flag = "  ❌ regression" if regression else ""
+        print(f"{name:<34s} {before:12.2f} {after:12.2f} {change:+9.1%}{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest av sök- och chattflödet mot JobTech-stubben.")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8, help="samtidiga sessioner")
+    parser.add_argument("--num-jobs", type=int, default=50, help="annonser per sökning")
+    parser.add_argument("--latency", type=float, default=0.05, help="stubbens svarstid i sekunder")
+    parser.add_argument("--total-ads", type=int, default=2000, help="annonser som stubben serverar")
+    parser.add_argument("--output", help="spara rapporten som JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("FÖRE", "EFTER"), help="jämför två sparade rapporter")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relativ försämring som räknas som regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        rows = compare(*reports, threshold=args.threshold)
+        print_comparison(rows, *(os.path.basename(p) for p in args.compare))
+        sys.exit(1 if any(r[4] for r in rows) else 0)
+
+    # egen, tom embedding-cache så att körningar är jämförbara
+    import embeddings
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as cache_dir:
+        embeddings.CACHE_DIR = cache_dir
+        report = run_load_test(args.sessions, args.concurrency, args.num_jobs, args.latency, args.total_ads)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Sparade rapporten i {args.output}")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_load.py --sessions 64 --concurrency 8 --output load_$(git rev-parse --short HEAD).json
+# python bench_load.py --compare load_abc123.json load_def456.json
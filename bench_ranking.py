@@ -0,0 +1,54 @@
+# bench_ranking.py
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from ranking import rank_by_similarity
+
+def random_embeddings(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    m = rng.standard_normal((n, dim), dtype=np.float32)
+    m /= np.linalg.norm(m, axis=1, keepdims=True)
+    return m
+
+def old_path(matrix, qvec):
+    """
+    Den gamla vägen i app.py: en np.dot-lambda per rad och full sort_values.
+    """
+    df = pd.DataFrame({"embedding": list(matrix)})
+    def cosine_similarity(a,b): return np.dot(a,b)/(np.linalg.norm(a)*np.linalg.norm(b))
+    df["similarity"] = df["embedding"].apply(lambda x: cosine_similarity(x, qvec))
+    return df.sort_values(by="similarity", ascending=False)
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mikrobenchmark för vektoriserad rankning med top-k.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--old-max-rows", type=int, default=100_000,
+                        help="kör den gamla per-rad-vägen bara upp till så här många rader")
+    args = parser.parse_args()
+
+    for n in args.rows:
+        matrix = random_embeddings(n, args.dim)
+        qvec = random_embeddings(1, args.dim, seed=1)[0]
+        new = best_of(lambda: rank_by_similarity(qvec, matrix, top_k=args.top_k), args.repeats)
+        line = f"{n:>9,d} rader: top-{args.top_k} {new * 1000:9.2f} ms"
+        if n <= args.old_max_rows:
+            old = best_of(lambda: old_path(matrix, qvec), 1)
+            line += f" | per rad + sort_values {old * 1000:9.2f} ms ({old / new:.0f}x)"
+        print(line)
+
+if __name__ == "__main__":
+    main()
+
+# python bench_ranking.py --rows 10000 100000 1000000
@@ -0,0 +1,81 @@
+# bench_session_memory.py
+import argparse
+import json
+import random
+import tracemalloc
+import numpy as np
+from ad_features import add_features
+from fetch_jobs import hits_to_dataframe
+from jobtech_stub import load_recorded_hits
+from result_store import AdStore, SessionRegistry, trim_history, MAX_CHAT_HISTORY
+
+ANSWER = ("🌍 Jag hittade 4 distansjobb. Exempel: Systemutvecklare till Volvo Cars på Volvo (Göteborg); "
+          "Backendutvecklare på Klarna (Stockholm); Data Scientist på Spotify (Stockholm).")
+
+def session_results(hits, sessions, topics, per_topic, num_jobs, seed=0):
+    """
+    Ett sökresultat per session. Sessionerna söker bland topics ämnen, så resultaten
+    överlappar som när många användare söker på samma yrken. Varje resultat tolkas
+    från JSON på nytt, som ett eget API-svar.
+    """
+    rng = random.Random(seed)
+    pools = [hits[t * per_topic:(t + 1) * per_topic] for t in range(topics)]
+    for _ in range(sessions):
+        picked = rng.sample(rng.choice(pools), num_jobs)
+        df = hits_to_dataframe(json.loads(json.dumps(picked)), with_id=True)
+        add_features(df)
+        df["similarity"] = np.linspace(0.9, 0.4, len(df)).astype(np.float32)
+        yield df
+
+def chat(messages):
+    return [{"role": "user" if i % 2 == 0 else "bot", "content": f"{ANSWER} ({i})"} for i in range(messages)]
+
+def measure(label, build, sessions):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_session = (after - before) / sessions / 1024
+    print(f"{label:<34s}: {per_session:8.1f} KB/session, {(after - before) / 1e6:7.1f} MB totalt")
+    return held
+
+def main():
+    parser = argparse.ArgumentParser(description="Minne per session: egen DataFrame mot delad kolumnlagring.")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--topics", type=int, default=20, help="olika sökningar som sessionerna väljer bland")
+    parser.add_argument("--num-jobs", type=int, default=50)
+    parser.add_argument("--chat-messages", type=int, default=200, help="chattmeddelanden per session")
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    per_topic = args.num_jobs * 3
+    hits = load_recorded_hits(total=args.topics * per_topic)
+    print(f"{args.sessions} sessioner, {args.topics} ämnen, {args.num_jobs} annonser och "
+          f"{args.chat_messages} chattmeddelanden per session")
+
+    def per_session_frames(with_embeddings):
+        held = []
+        for df in session_results(hits, args.sessions, args.topics, per_topic, args.num_jobs):
+            if with_embeddings:
+                df["embedding"] = list(np.random.default_rng(0).standard_normal(
+                    (len(df), args.dim), dtype=np.float32))
+            held.append((df, chat(args.chat_messages)))
+        return held
+
+    def shared_store():
+        store, registry, held = AdStore(), SessionRegistry(), []
+        for i, df in enumerate(session_results(hits, args.sessions, args.topics, per_topic, args.num_jobs)):
+            registry.set(str(i), store.view(df))
+            held.append(trim_history(chat(args.chat_messages), MAX_CHAT_HISTORY))
+        return store, registry, held
+
+    measure("df + embeddings per session", lambda: per_session_frames(True), args.sessions)
+    measure("df per session", lambda: per_session_frames(False), args.sessions)
+    store, registry, _ = measure(f"delad lagring + chatt max {MAX_CHAT_HISTORY}", shared_store, args.sessions)
+    print(f"delad lagring: {len(store)} unika annonser för {registry.stats()['result_rows']} resultatrader")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_session_memory.py --sessions 300
@@ -0,0 +1,52 @@
+# bench_skill_extraction.py
+import argparse
+import time
+from dump_reader import records_to_dataframe
+from embeddings import encode_texts, encode_uncached, cache_name
+from jobtech_stub import load_recorded_hits
+from load_taxonomy import load_taxonomy_snapshot
+from phrase_matcher import PhraseMatcher
+from resources import TAXONOMY_PATH
+from skill_embeddings import SkillEmbeddings, skill_embeddings_path, split_sentences
+
+def main():
+    parser = argparse.ArgumentParser(description="Annonser/sekund: exakt frasmatchning mot semantisk kompetensextraktion.")
+    parser.add_argument("--ads", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=7)
+    args = parser.parse_args()
+
+    snapshot = load_taxonomy_snapshot(TAXONOMY_PATH)
+    descriptions = records_to_dataframe(load_recorded_hits(total=args.ads))["description"].fillna("").tolist()
+    n_sentences = sum(len(split_sentences(d)) for d in descriptions)
+    print(f"{len(descriptions)} annonser, {n_sentences} meningar, {len(snapshot.skill_labels)} skills")
+
+    start = time.perf_counter()
+    PhraseMatcher(snapshot.skill_norm, normalized=True).count(descriptions)
+    exact = time.perf_counter() - start
+    print(f"exakt     : {len(descriptions) / exact:10.0f} annonser/s")
+
+    path = skill_embeddings_path(TAXONOMY_PATH, cache_name())
+    start = time.perf_counter()
+    skills = SkillEmbeddings.load(path, snapshot.skill_labels, cache_name())
+    if skills is None:
+        skills = SkillEmbeddings.build(snapshot.skill_labels, encode_uncached)
+        skills.save(path, cache_name())
+        print(f"skill-matris byggd på {time.perf_counter() - start:.1f} s ({skills.matrix.nbytes / 1e6:.1f} MB)")
+    else:
+        print(f"skill-matris laddad på {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # meningarna embeddas en gång; matrismultiplikationen mäts separat från modellen
+    sentences = [s for d in descriptions for s in split_sentences(d)]
+    start = time.perf_counter()
+    vectors = encode_texts(sentences, use_cache=False)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    skills.top_skills(descriptions, lambda texts: vectors, top_k=args.top_k)
+    scoring = time.perf_counter() - start
+    print(f"semantisk : {len(descriptions) / (encode + scoring):10.0f} annonser/s "
+          f"(embedding {encode:.2f} s, likhet {scoring:.2f} s)")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_skill_extraction.py --ads 2000
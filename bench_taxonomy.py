@@ -0,0 +1,49 @@
+# bench_taxonomy.py
+import argparse
+import time
+from load_taxonomy import parse_taxonomy_file
+from taxonomy_snapshot import TaxonomySnapshot, compile_snapshot, snapshot_path_for
+from phrase_matcher import PhraseMatcher
+from occupation_index import OccupationIndex
+
+def from_json(path):
+    """
+    Den gamla vägen: json.load + bygg listor/set + normalisera alla etiketter.
+    """
+    taxonomy, skill_set = parse_taxonomy_file(path)
+    PhraseMatcher(skill_set)
+    OccupationIndex(taxonomy)
+
+def from_snapshot(path):
+    snapshot = TaxonomySnapshot.load(snapshot_path_for(path), source_path=path)
+    taxonomy, _ = snapshot.to_taxonomy()
+    PhraseMatcher(snapshot.skill_norm, normalized=True)
+    OccupationIndex(taxonomy, snapshot.normalized_skills_by_occupation())
+
+def best_of(fn, path, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Starttid: JSON-parsning jämfört med binär snapshot.")
+    parser.add_argument("--path", default="ssyk-level-4-groups-with-related-skills.json")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    compile_snapshot(args.path)
+    load_json = best_of(parse_taxonomy_file, args.path, args.repeats)
+    load_snap = best_of(lambda p: TaxonomySnapshot.load(snapshot_path_for(p), source_path=p).to_taxonomy(),
+                        args.path, args.repeats)
+    print(f"laddning  JSON {load_json:8.1f} ms | snapshot {load_snap:8.1f} ms")
+    full_json = best_of(from_json, args.path, args.repeats)
+    full_snap = best_of(from_snapshot, args.path, args.repeats)
+    print(f"inkl. index JSON {full_json:6.1f} ms | snapshot {full_snap:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_taxonomy.py
@@ -0,0 +1,53 @@
+# bench_vector_index.py
+import argparse
+import time
+import numpy as np
+from vector_index import IVFIndex
+
+def clustered_embeddings(n, dim, n_clusters=500, noise=2.0, seed=0):
+    """
+    Syntetiska normaliserade vektorer i kluster (annonser liknar varandra inom yrken).
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    m = centers[rng.integers(0, n_clusters, n)] + noise * rng.standard_normal((n, dim), dtype=np.float32) / np.sqrt(dim)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@k och latens för IVF-indexet mot exakt sökning.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--n-lists", type=int, default=512)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    data = clustered_embeddings(args.rows, args.dim)
+    ids = [str(i) for i in range(args.rows)]
+    index = IVFIndex(args.dim, n_lists=args.n_lists, train_size=args.rows + 1)
+    start = time.perf_counter()
+    index.add(ids, data)
+    index.train()
+    print(f"bygg: {args.rows:,d} rader, {args.n_lists} listor på {time.perf_counter() - start:.1f} s")
+
+    rng = np.random.default_rng(1)
+    queries = data[rng.integers(0, args.rows, args.queries)] + 0.3 * rng.standard_normal(
+        (args.queries, args.dim), dtype=np.float32) / np.sqrt(args.dim)
+
+    start = time.perf_counter()
+    truth = [set(index.brute_force(q, args.k)[0]) for q in queries]
+    exact_ms = (time.perf_counter() - start) / args.queries * 1000
+    print(f"exakt          : {exact_ms:7.3f} ms/fråga")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found = [index.search(q, args.k, nprobe=nprobe)[0] for q in queries]
+        ms = (time.perf_counter() - start) / args.queries * 1000
+        recall = np.mean([len(truth[i] & set(f)) / args.k for i, f in enumerate(found)])
+        print(f"ivf nprobe={nprobe:<4d}: {ms:7.3f} ms/fråga, recall@{args.k} = {recall:.3f}")
+
+if __name__ == "__main__":
+    main()
+
+# python bench_vector_index.py --rows 100000
@@ -0,0 +1,238 @@
+# bm25_index.py
+"""
+Lokalt inverterat index med BM25 över annonsernas rubriker och beskrivningar.
+Tokeniseringen är text_utils.normalize_text (samma som i resten av appen).
+
+Postningslistorna lagras kompakt i NumPy-arrayer (CSR: indptr per term-ID,
+dokumentrader som int32 och termfrekvenser som uint16) i segment. Nya annonser
+blir ett nytt litet segment, och segment av samma storleksordning slås ihop,
+så att insättningar går snabbt och antalet segment växer logaritmiskt.
+
+Borttagna annonser maskas bort direkt men räknas i df/snittlängd tills
+compact() (eller save()) bygger om statistiken, som i Lucene.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+from text_utils import normalize_text
+
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3     # rubrikens ord räknas som om de stod så här många gånger
+
+def tokenize(text):
+    return normalize_text(text).split()
+
+def ids_digest(ids):
+    """
+    SHA-1 över en mängd annons-ID:n (oberoende av ordning och dubbletter). Sparas i
+    bm25.json så att ett BM25-index kan jämföras med vektorindexet det byggdes för.
+    """
+    return hashlib.sha1("\n".join(sorted(set(map(str, ids)))).encode("utf-8")).hexdigest()
+
+def _segment(terms, docs, tfs, n_terms):
+    """
+    CSR-segment från postningar (term, rad, tf) i godtycklig ordning.
+    """
+    order = np.argsort(terms, kind="stable")
+    indptr = np.zeros(n_terms + 1, dtype=np.int64)
+    np.cumsum(np.bincount(terms, minlength=n_terms), out=indptr[1:])
+    return indptr, docs[order].astype(np.int32), tfs[order].astype(np.uint16)
+
+def _postings(segment):
+    """
+    Segmentets postningar som (term, rad, tf)-arrayer.
+    """
+    indptr, docs, tfs = segment
+    terms = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    return terms, docs, tfs
+
+class BM25Index:
+    """
+    Stöder inkrementella insättningar (en befintlig id ersätts), borttagning och
+    persistens till en katalog, som vector_index.IVFIndex.
+    """
+
+    def __init__(self, k1=K1, b=B, title_weight=TITLE_WEIGHT):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self.vocab = {}                                 # term -> term-ID
+        self._df = np.zeros(0, dtype=np.int32)          # antal rader som innehåller termen
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._segments = []
+        self.ids = []          # rad -> id
+        self._row = {}         # id -> rad
+        self.saved_digest = None   # ids_digest vid senaste save()/load()
+
+    def __len__(self):
+        return len(self._row)
+
+    def __contains__(self, ad_id):
+        return ad_id in self._row
+
+    @property
+    def nbytes(self):
+        arrays = [self._df, self._doc_len, self._alive] + [a for seg in self._segments for a in seg]
+        return int(sum(a.nbytes for a in arrays))
+
+    def _term_ids(self, tokens):
+        vocab = self.vocab
+        return [vocab.setdefault(t, len(vocab)) for t in tokens]
+
+    def add(self, ids, titles, descriptions):
+        """
+        Lägger till (eller ersätter) annonser.
+        """
+        start = len(self.ids)
+        terms, docs, tfs, lengths = [], [], [], []
+        for offset, (title, description) in enumerate(zip(titles, descriptions)):
+            tokens = tokenize(title) * self.title_weight + tokenize(description)
+            uniq, counts = np.unique(np.array(self._term_ids(tokens), dtype=np.int32), return_counts=True)
+            terms.append(uniq)
+            tfs.append(np.minimum(counts, np.iinfo(np.uint16).max))
+            docs.append(np.full(len(uniq), start + offset, dtype=np.int32))
+            lengths.append(len(tokens))
+        self._doc_len = np.concatenate([self._doc_len, np.array(lengths, dtype=np.float32)])
+        self._alive = np.concatenate([self._alive, np.ones(len(lengths), dtype=bool)])
+        for ad_id in ids:
+            old = self._row.get(ad_id)
+            if old is not None:
+                self._alive[old] = False
+            self._row[ad_id] = len(self.ids)
+            self.ids.append(ad_id)
+        if self._df.shape[0] < len(self.vocab):
+            self._df = np.concatenate([self._df, np.zeros(len(self.vocab) - len(self._df), dtype=np.int32)])
+        if not terms:
+            return
+        terms = np.concatenate(terms)
+        np.add.at(self._df, terms, 1)
+        self._segments.append(_segment(terms, np.concatenate(docs), np.concatenate(tfs), len(self.vocab)))
+        # slå ihop de sista segmenten så länge det senaste är minst halva det föregående,
+        # så att segmenten halveras i storlek bakåt och blir högst ~log2(postningar)
+        while len(self._segments) > 1 and 2 * len(self._segments[-1][1]) >= len(self._segments[-2][1]):
+            newer, older = self._segments.pop(), self._segments.pop()
+            self._segments.append(self._merge([older, newer]))
+
+    def _merge(self, segments):
+        parts = [_postings(seg) for seg in segments]
+        return _segment(*(np.concatenate([p[i] for p in parts]) for i in range(3)), len(self.vocab))
+
+    def delete(self, ids):
+        """
+        Markerar ids som borttagna. Returnerar antal borttagna.
+        """
+        removed = 0
+        for ad_id in ids:
+            row = self._row.pop(ad_id, None)
+            if row is not None:
+                self._alive[row] = False
+                removed += 1
+        return removed
+
+    def compact(self):
+        """
+        Tar bort borttagna rader, slår ihop alla segment och räknar om df (ändrar radnumren).
+        """
+        rows = np.flatnonzero(self._alive)
+        new_row = np.full(len(self._alive), -1, dtype=np.int32)
+        new_row[rows] = np.arange(len(rows), dtype=np.int32)
+        if self._segments:
+            terms, docs, tfs = _postings(self._merge(self._segments))
+            keep = self._alive[docs]
+            terms, docs, tfs = terms[keep], new_row[docs[keep]], tfs[keep]
+            self._segments = [_segment(terms, docs, tfs, len(self.vocab))]
+            self._df = np.bincount(terms, minlength=len(self.vocab)).astype(np.int32)
+        self._doc_len = self._doc_len[rows]
+        self._alive = np.ones(len(rows), dtype=bool)
+        self.ids = [self.ids[r] for r in rows.tolist()]
+        self._row = {ad_id: i for i, ad_id in enumerate(self.ids)}
+
+    def scores(self, query):
+        """
+        BM25-poäng för alla rader (0 för rader utan någon av frågans termer).
+        """
+        out = np.zeros(len(self.ids), dtype=np.float32)
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or not len(out):
+            return out
+        n = len(self.ids)
+        avgdl = max(float(self._doc_len.mean()), 1.0)
+        k1, b = self.k1, self.b
+        for t in term_ids:
+            idf = np.log1p((n - self._df[t] + 0.5) / (self._df[t] + 0.5))
+            for indptr, docs, tfs in self._segments:
+                if t + 1 >= len(indptr):
+                    continue
+                lo, hi = indptr[t], indptr[t + 1]
+                if lo == hi:
+                    continue
+                d, tf = docs[lo:hi], tfs[lo:hi].astype(np.float32)
+                norm = k1 * (1.0 - b + b * self._doc_len[d] / avgdl)
+                out[d] += idf * tf * (k1 + 1.0) / (tf + norm)
+        out[~self._alive] = 0.0
+        return out
+
+    def search(self, query, k=10):
+        """
+        De k annonser som matchar query bäst (bara de med poäng > 0).
+        Returnerar (ids, scores) med högst poäng först.
+        """
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if k <= 0 or not len(hits):
+            return [], np.empty(0, dtype=np.float32)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [self.ids[r] for r in hits.tolist()], scores[hits]
+
+    def save(self, directory):
+        """
+        Sparar indexet (komprimerat) i directory som bm25.json + bm25.npz.
+        """
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        indptr, docs, tfs = self._segments[0] if self._segments else _segment(
+            np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.uint16), len(self.vocab))
+        np.savez(os.path.join(directory, "bm25.npz"), indptr=indptr, docs=docs, tfs=tfs,
+                 df=self._df, doc_len=self._doc_len)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        self.saved_digest = ids_digest(self.ids)
+        meta = {"k1": self.k1, "b": self.b, "title_weight": self.title_weight, "vocab": vocab, "ids": self.ids,
+                "ids_sha1": self.saved_digest}
+        with open(os.path.join(directory, "bm25.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "bm25.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(meta["k1"], meta["b"], meta["title_weight"])
+        index.vocab = {t: i for i, t in enumerate(meta["vocab"])}
+        with np.load(os.path.join(directory, "bm25.npz")) as data:
+            index._segments = [(data["indptr"], data["docs"], data["tfs"])]
+            index._df = data["df"]
+            index._doc_len = data["doc_len"]
+        index.ids = meta["ids"]
+        index._row = {ad_id: i for i, ad_id in enumerate(index.ids)}
+        index._alive = np.ones(len(index.ids), dtype=bool)
+        index.saved_digest = meta.get("ids_sha1")
+        return index
+
+    @classmethod
+    def from_payloads(cls, payloads, chunk_size=10_000):
+        """
+        Bygger indexet från ett vektorindex payloads (id -> annonsens metadata), t.ex.
+        för ett annonsindex som skapades innan BM25 fanns.
+        """
+        index = cls()
+        items = list(payloads.items())
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            index.add([ad_id for ad_id, _ in chunk],
+                      [(p or {}).get("title") for _, p in chunk],
+                      [(p or {}).get("description") for _, p in chunk])
+        return index
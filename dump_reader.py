@@ -0,0 +1,174 @@
+# dump_reader.py
+"""
+Strömmande läsning av stora annonsdumpar (JobTechs historik/snapshots) med konstant
+minne. Annonserna läses en i taget ur JSONL, en JSON-lista eller ett objekt med
+"hits", och lämnas vidare i DataFrames om högst chunk_size rader med samma kolumner
+som get_jobs (title/company/city/description/url), så att de kan embeddas och
+indexeras bit för bit.
+"""
+import gzip
+import json
+import pandas as pd
+from fetch_jobs import hits_to_dataframe
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_BUFFER_SIZE = 1 << 20
+COLUMNS = ["title", "company", "city", "description", "url"]
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+_PARTIAL_TOKEN = 6   # längsta påbörjade token som kan sluta i bufferten, t.ex. "fals" eller "\\u00e"
+
+class _JSONStream:
+    """
+    Minimal iterativ JSON-läsare: texten läses i block om buffer_size tecken och
+    ett värde i taget avkodas med JSONDecoder.raw_decode. Bara det värde som
+    avkodas just nu (t.ex. en annons) behöver få plats i minnet.
+    """
+
+    def __init__(self, f, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.f = f
+        self.buffer_size = buffer_size
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0    # tecken i filen före buf
+
+    def _fill(self):
+        data = self.f.read(self.buffer_size)
+        if not data:
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _truncated(self, error):
+        """
+        Kan felet bero på att värdet fortsätter efter buffertens slut? Annars är
+        JSON:en trasig och fler block hjälper inte.
+        """
+        return error.msg.startswith("Unterminated string") or len(self.buf) - error.pos < _PARTIAL_TOKEN
+
+    def peek(self):
+        """
+        Nästa tecken som inte är blanksteg ("" vid filslut).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"ogiltig JSON: väntade {char!r}, fick {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._truncated(e) and self._fill():
+                    continue
+                raise ValueError(f"ogiltig JSON vid tecken {self.offset + e.pos}: {e.msg}") from e
+            # ett tal precis i slutet av bufferten kan fortsätta i nästa block
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self):
+        """
+        Elementen i en lista, ett i taget.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"ogiltig JSON: väntade ',' eller ']', fick {sep!r}")
+
+    def hits(self):
+        """
+        Annonserna i dokumentet: en lista på toppnivå, eller listan under "hits".
+        Övriga nycklar i ett objekt (t.ex. "total") läses och kastas.
+        """
+        first = self.peek()
+        if first == "[":
+            yield from self.items()
+            return
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key == "hits":
+                yield from self.items()
+            else:
+                self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"ogiltig JSON: väntade ',' eller '}}', fick {sep!r}")
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_records(path, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Generator över annonserna (dicts) i en dump. .jsonl läses rad för rad, annat
+    som JSON; .gz packas upp i farten.
+    """
+    with _open(path) as f:
+        if path.endswith((".jsonl", ".jsonl.gz")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _JSONStream(f, buffer_size).hits()
+
+def records_to_dataframe(records, with_id=False):
+    """
+    Annonser i JobTech-format (med "headline") eller redan platta annonser ->
+    DataFrame med appens kolumner.
+    """
+    if records and "headline" in records[0]:
+        return hits_to_dataframe(records, with_id=with_id)
+    df = pd.DataFrame(records)
+    columns = (["id"] if with_id else []) + COLUMNS + (["deadline"] if with_id else [])
+    for col in columns:
+        if col not in df.columns:
+            df[col] = None if col == "deadline" else ""
+    if with_id:
+        df["id"] = df["id"].astype(str)
+    df["city"] = df["city"].fillna("Ingen ort")
+    return df[columns]
+
+def iter_ad_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, with_id=False, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Generator över DataFrames med högst chunk_size annonser var.
+    """
+    chunk = []
+    for record in iter_records(path, buffer_size):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield records_to_dataframe(chunk, with_id)
+            chunk = []
+    if chunk:
+        yield records_to_dataframe(chunk, with_id)
@@ -0,0 +1,155 @@
+# embedding_backends.py
+"""
+Utbytbara backends för embedding-modellen. Alla har samma gränssnitt som
+SentenceTransformer (get_sentence_embedding_dimension() och encode(texts, batch_size=...)),
+så resten av koden märker inte vilken som används. Välj med miljövariabler:
+
+  EMBEDDING_BACKEND   sentence-transformers (referens, PyTorch), onnx eller torch-int8
+  EMBEDDING_MODEL_DIR lokal katalog med modellen (se export_model.py); då hämtas inget från nätet
+  EMBEDDING_ONNX_FILE filnamn i modellkatalogen för onnx-backenden (standard model.onnx)
+  EMBEDDING_THREADS   antal CPU-trådar för modellen (0 = bibliotekets standard)
+
+onnx-backenden behöver bara onnxruntime och tokenizers och importerar aldrig torch.
+"""
+import abc
+import json
+import os
+import warnings
+import numpy as np
+
+BACKENDS = ("sentence-transformers", "onnx", "torch-int8")
+DEFAULT_MAX_LENGTH = 256   # all-MiniLM-L6-v2:s max_seq_length
+
+def _max_length(model_dir):
+    path = os.path.join(model_dir, "sentence_bert_config.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("max_seq_length", DEFAULT_MAX_LENGTH))
+    return DEFAULT_MAX_LENGTH
+
+def _load_tokenizer(model_dir, max_length):
+    from tokenizers import Tokenizer
+    tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding(pad_id=tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+    return tokenizer
+
+def mean_pool(hidden, attention_mask):
+    """
+    Medelvärde av token-vektorerna där attention_mask är 1 (som Pooling-lagret i sentence-transformers).
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+class _TokenizedBackend(abc.ABC):
+    """
+    Gemensam del för backends som tokeniserar själva: batchning, mean pooling och
+    L2-normalisering, så att vektorerna blir jämförbara med referensmodellens.
+    """
+
+    name = None
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self.max_length = _max_length(model_dir)
+        self.tokenizer = _load_tokenizer(model_dir, self.max_length)
+        self.dim = None
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    @abc.abstractmethod
+    def _forward(self, input_ids, attention_mask, token_type_ids):
+        """
+        Modellens sista dolda lager, (batch, tokens, dim), för en tokeniserad batch.
+        """
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            token_type_ids = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self._forward(input_ids, attention_mask, token_type_ids)
+            pooled = mean_pool(hidden, attention_mask)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out[start:start + len(encodings)] = pooled
+        return out[0] if single else out
+
+class OnnxBackend(_TokenizedBackend):
+    """
+    Exporterad modell i ONNX Runtime på CPU (ev. en int8-kvantiserad .onnx-fil).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir, onnx_file=None, num_threads=0):
+        super().__init__(model_dir)
+        import onnxruntime as ort
+        onnx_file = onnx_file or os.environ.get("EMBEDDING_ONNX_FILE", "model.onnx")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(os.path.join(model_dir, onnx_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self.session.get_inputs()}
+        self.dim = int(self._forward(*[np.zeros((1, 1), dtype=np.int64)] * 3).shape[-1])
+
+    def _forward(self, input_ids, attention_mask, token_type_ids):
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": token_type_ids}
+        return self.session.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+
+class TorchInt8Backend(_TokenizedBackend):
+    """
+    Transformer-modellen med dynamisk int8-kvantisering av alla Linear-lager (PyTorch, CPU).
+    """
+
+    name = "torch-int8"
+
+    def __init__(self, model_dir):
+        super().__init__(model_dir)
+        import torch
+        from transformers import AutoModel
+        self._torch = torch
+        model = AutoModel.from_pretrained(model_dir, local_files_only=True).eval()
+        with warnings.catch_warnings():
+            # torch.ao.quantization är markerat som utfasat men finns kvar och fungerar på CPU
+            warnings.simplefilter("ignore", (DeprecationWarning, UserWarning))
+            self.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.dim = int(model.config.hidden_size)
+
+    def _forward(self, input_ids, attention_mask, token_type_ids):
+        torch = self._torch
+        with torch.inference_mode():
+            out = self.model(input_ids=torch.from_numpy(input_ids),
+                             attention_mask=torch.from_numpy(attention_mask),
+                             token_type_ids=torch.from_numpy(token_type_ids))
+        return out.last_hidden_state.numpy()
+
+def _set_torch_threads(num_threads):
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+
+def load_backend(name, model_name, model_dir=None, num_threads=0):
+    """
+    Skapar vald backend. Utan model_dir laddar referens-backenden model_name från
+    Hugging Face (eller dess cache); de andra kräver en lokal katalog.
+    """
+    if name == "sentence-transformers":
+        from sentence_transformers import SentenceTransformer
+        _set_torch_threads(num_threads)
+        if model_dir:
+            return SentenceTransformer(model_dir, local_files_only=True)
+        return SentenceTransformer(model_name)
+    if name not in BACKENDS:
+        raise ValueError(f"okänd embedding-backend {name!r}, välj en av {BACKENDS}")
+    if not model_dir:
+        raise ValueError(f"backenden {name!r} kräver EMBEDDING_MODEL_DIR (se export_model.py)")
+    if name == "onnx":
+        return OnnxBackend(model_dir, num_threads=num_threads)
+    _set_torch_threads(num_threads)
+    return TorchInt8Backend(model_dir)
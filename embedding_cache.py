@@ -0,0 +1,197 @@
+# embedding_cache.py
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+try:
+    import fcntl
+except ImportError:   # Windows: inget fillås, men läsningarna verifieras ändå mot nyckeln
+    fcntl = None
+
+def text_key(text):
+    """
+    Innehållsadress för en annonstext: sha1 av texten med normaliserade blanksteg.
+    """
+    norm = re.sub(r"\s+", " ", text if isinstance(text, str) else "").strip()
+    return hashlib.sha1(norm.encode("utf-8")).digest()
+
+class EmbeddingCache:
+    """
+    Persistent embedding-cache på disk, adresserad på textens hash.
+
+    Lagringen består av tre minnesmappade filer per modell:
+      - vectors.f32 : (capacity, dim) float32-matris
+      - keys.bin    : (capacity, 20) sha1-nycklar, nollor = tom rad
+      - ticks.u64   : senaste användning per rad, används för LRU-ordningen
+      - generation.u64 : räknas upp vid varje skrivning
+    När cachen är full återanvänds raden som använts minst nyligen.
+
+    Flera processer (t.ex. appen och ingest.py) kan dela katalogen: skrivningar tar
+    ett exklusivt fcntl-lås på filen "lock" och läsningar ett delat, så en läsning ser
+    aldrig en halvskriven rad. Har en annan process skrivit sedan sist läses indexet
+    in på nytt (under läslåset), och en träff räknas bara om raden på disk fortfarande
+    har den sökta nyckeln. En rad skrivs i ordningen: nyckeln nollas, vektorn, nyckeln.
+    Utan fcntl (Windows) finns inget lås och då skyddar bara skrivordningen och
+    nyckelkontrollen.
+    """
+
+    def __init__(self, directory, model_name, dim, capacity=50000):
+        self.model_name = model_name
+        self.dim = int(dim)
+        self.capacity = int(capacity)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        slug = re.sub(r"[^\w\-]+", "_", model_name)
+        self.directory = os.path.join(directory, slug)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock_path = os.path.join(self.directory, "lock")
+        # filerna skapas under låset så att två processer inte initierar samtidigt
+        with _FileLock(self._lock_path):
+            meta = {"model_name": model_name, "dim": self.dim, "capacity": self.capacity}
+            meta_path = os.path.join(self.directory, "meta.json")
+            fresh = True
+            if os.path.exists(meta_path):
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    fresh = json.load(f) != meta
+            mode = "w+" if fresh else "r+"
+
+            self._vectors = np.memmap(os.path.join(self.directory, "vectors.f32"), dtype=np.float32,
+                                      mode=mode, shape=(self.capacity, self.dim))
+            self._keys = np.memmap(os.path.join(self.directory, "keys.bin"), dtype=np.uint8,
+                                   mode=mode, shape=(self.capacity, 20))
+            self._ticks = np.memmap(os.path.join(self.directory, "ticks.u64"), dtype=np.uint64,
+                                    mode=mode, shape=(self.capacity,))
+            gen_path = os.path.join(self.directory, "generation.u64")
+            self._gen = np.memmap(gen_path, dtype=np.uint64, mode=mode if os.path.exists(gen_path) else "w+", shape=(1,))
+            if fresh:
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+            self._reload()
+
+    def _reload(self):
+        """
+        Bygger upp index, lediga rader och LRU-ordning från det som ligger på disk.
+        """
+        self._seen_gen = int(self._gen[0])
+        used = np.flatnonzero(self._ticks)
+        used = used[np.argsort(self._ticks[used], kind="stable")]
+        self._index = OrderedDict((self._keys[row].tobytes(), int(row)) for row in used)
+        self._free = sorted(set(range(self.capacity)) - set(self._index.values()), reverse=True)
+        self._tick = int(self._ticks.max()) if self.capacity else 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def _touch(self, key, row):
+        self._tick += 1
+        self._ticks[row] = self._tick
+        self._index.move_to_end(key)
+
+    def get_many(self, keys):
+        """
+        Slår upp nycklar. Returnerar (found, vectors) där found är en bool-array
+        och vectors en (len(keys), dim)-matris där träffarna är ifyllda.
+        """
+        out = np.zeros((len(keys), self.dim), dtype=np.float32)
+        found = np.zeros(len(keys), dtype=bool)
+        with self._lock, self._file_lock(shared=True):
+            if int(self._gen[0]) != self._seen_gen:
+                self._reload()   # en annan process har skrivit sedan sist
+            for i, key in enumerate(keys):
+                row = self._index.get(key)
+                if row is None:
+                    continue
+                # nyckeln kontrolleras före och efter läsningen: en annan process kan
+                # ha återanvänt raden, och då är det en miss
+                if self._keys[row].tobytes() != key:
+                    del self._index[key]
+                    continue
+                out[i] = self._vectors[row]
+                if self._keys[row].tobytes() != key:
+                    del self._index[key]
+                    continue
+                found[i] = True
+                self._touch(key, row)
+            n_hits = int(found.sum())
+            self.hits += n_hits
+            self.misses += len(keys) - n_hits
+        return found, out
+
+    def put_many(self, keys, vectors):
+        """
+        Lägger in vektorer för nycklar; äldsta raderna evictas när cachen är full.
+        """
+        if self.capacity == 0:
+            return
+        with self._lock, self._file_lock():
+            if int(self._gen[0]) != self._seen_gen:
+                self._reload()
+            for key, vec in zip(keys, vectors):
+                row = self._index.get(key)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        _, row = self._index.popitem(last=False)
+                    self._index[key] = row
+                    # nyckeln sist: en rad med ny nyckel har alltid sin nya vektor
+                    self._keys[row] = 0
+                    self._vectors[row] = vec
+                    self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+                else:
+                    self._vectors[row] = vec
+                self._touch(key, row)
+            self._gen[0] += 1
+            self._seen_gen = int(self._gen[0])
+            self.flush()
+
+    def _file_lock(self, shared=False):
+        return _FileLock(self._lock_path, shared)
+
+    def flush(self):
+        self._vectors.flush()
+        self._keys.flush()
+        self._ticks.flush()
+        self._gen.flush()
+
+    def stats(self):
+        """
+        Räknare som appen kan visa: träffar, missar, träffkvot och antal lagrade vektorer.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._index),
+            "capacity": self.capacity,
+        }
+
+class _FileLock:
+    """
+    fcntl-lås mellan processer, exklusivt eller delat (no-op där fcntl saknas).
+    """
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self._f = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._f = open(self.path, "a+b")
+            fcntl.flock(self._f, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._f is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+            self._f.close()
+            self._f = None
+        return False
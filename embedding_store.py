@@ -0,0 +1,189 @@
+# embedding_store.py
+"""
+Kompakt lagring av embeddings: en sammanhängande matris i float32, float16 eller int8
+(skalär kvantisering med en skala per vektor). Sökning sker i två steg: ungefärliga
+likheter direkt på den kvantiserade matrisen och, om fullprecisionsvektorerna finns
+(t.ex. som en minnesmappad fil), omrankning av de bästa kandidaterna med dem.
+"""
+import os
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+STORE_DTYPE = os.environ.get("EMBEDDING_STORE_DTYPE", "int8")
+BLOCK_ROWS = 8192   # rader som avkvantiseras åt gången, håller temporärminnet litet
+
+def quantize_int8(matrix):
+    """
+    Symmetrisk int8-kvantisering per rad: x ≈ q * scale, scale = max|x| / 127.
+    Returnerar (q, scales).
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / 127.0 if matrix.size else np.empty(len(matrix), dtype=np.float32)
+    scales = scales.astype(np.float32)
+    safe = np.where(scales > 0, scales, 1.0)[:, None]
+    q = np.clip(np.rint(matrix / safe), -127, 127).astype(np.int8)
+    return q, scales
+
+class EmbeddingStore:
+    """
+    (n, dim)-matris med L2-normaliserade rader i valfri precision.
+      - dtype: "float32", "float16" eller "int8"
+      - exact: valfri float32-matris (eller memmap) med samma rader, används för omrankning
+    """
+
+    def __init__(self, matrix, dtype=STORE_DTYPE, exact=None):
+        if dtype not in DTYPES:
+            raise ValueError(f"okänd dtype {dtype!r}, välj en av {DTYPES}")
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(matrix), -1)
+        self.dtype = dtype
+        self.scales = None
+        if dtype == "int8":
+            self.data, self.scales = quantize_int8(matrix)
+        else:
+            self.data = np.ascontiguousarray(matrix, dtype=dtype)
+        self.exact = exact
+
+    @classmethod
+    def _from_parts(cls, dtype, data, scales, exact):
+        store = cls.__new__(cls)
+        store.dtype, store.data, store.scales, store.exact = dtype, data, scales, exact
+        return store
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self):
+        """
+        Bytes i minnet (fullprecisionsvektorer som är memmaps räknas inte).
+        """
+        n = self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+        if self.exact is not None and not isinstance(self.exact, np.memmap):
+            n += self.exact.nbytes
+        return int(n)
+
+    def _dequantize(self, start, stop):
+        block = self.data[start:stop].astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[start:stop, None]
+        return block
+
+    def vectors(self, idx=None):
+        """
+        Avkvantiserade float32-vektorer (alla, eller raderna idx).
+        """
+        if idx is None:
+            return self._dequantize(0, len(self))
+        idx = np.asarray(idx, dtype=np.intp)
+        block = self.data[idx].astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[idx, None]
+        return block
+
+    def take(self, idx):
+        """
+        Ny store med raderna idx (i den ordningen).
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        scales = self.scales[idx] if self.scales is not None else None
+        exact = np.asarray(self.exact[idx]) if self.exact is not None else None
+        return self._from_parts(self.dtype, self.data[idx], scales, exact)
+
+    def scores(self, query_vec):
+        """
+        Ungefärlig cosinuslikhet mot alla rader, beräknad blockvis på den kvantiserade matrisen.
+        """
+        q = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+        if self.dtype == "float32":
+            return self.data @ q
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, len(self))
+            if self.scales is not None:
+                # skalan per rad kan tas efter produkten: (q_i * s_i) · x = s_i * (q_i · x)
+                out[start:stop] = (self.data[start:stop].astype(np.float32) @ q) * self.scales[start:stop]
+            else:
+                out[start:stop] = self.data[start:stop].astype(np.float32) @ q
+        return out
+
+    def rank(self, query_vec, top_k=None, rerank=4):
+        """
+        Rangordnar raderna mot query_vec, som ranking.rank_by_similarity.
+        Med exact-vektorer tas top_k * rerank kandidater fram ur den kvantiserade
+        matrisen och omrankas exakt; annars returneras de ungefärliga likheterna.
+        Returnerar (index, scores) sorterade med högst likhet först.
+        """
+        n = len(self)
+        q = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+        if n == 0 or (top_k is not None and top_k <= 0):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        k = n if top_k is None else min(int(top_k), n)
+
+        scores = self.scores(q)
+        if self.exact is None or self.dtype == "float32":
+            return _top(scores, np.arange(n), k)
+        candidates = _top(scores, np.arange(n), min(n, k * rerank))[0]
+        order = np.sort(candidates)   # stigande radordning läser memmap sekventiellt
+        exact_scores = np.asarray(self.exact[order], dtype=np.float32) @ q
+        return _top(exact_scores, order, k)
+
+    def save(self, directory, with_exact=True):
+        """
+        Sparar matrisen (och ev. float32-vektorerna för omrankning) som .npy-filer.
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, f"store.{self.dtype}.npy"), self.data)
+        if self.scales is not None:
+            np.save(os.path.join(directory, "scales.npy"), self.scales)
+        if with_exact and self.exact is not None:
+            np.save(os.path.join(directory, "exact.f32.npy"), np.asarray(self.exact, dtype=np.float32))
+
+    @classmethod
+    def load(cls, directory, mmap_exact=True):
+        """
+        Läser en sparad store. Fullprecisionsvektorerna minnesmappas (bara kandidaterna
+        vid omrankning läses från disk).
+        """
+        for dtype in DTYPES:
+            path = os.path.join(directory, f"store.{dtype}.npy")
+            if os.path.exists(path):
+                break
+        else:
+            raise FileNotFoundError(f"ingen embedding-store i {directory}")
+        data = np.load(path)
+        scales_path = os.path.join(directory, "scales.npy")
+        scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        exact_path = os.path.join(directory, "exact.f32.npy")
+        exact = None
+        if os.path.exists(exact_path):
+            exact = np.load(exact_path, mmap_mode="r" if mmap_exact else None)
+        return cls._from_parts(dtype, data, scales, exact)
+
+def _top(scores, rows, k):
+    if k >= len(scores):
+        top = np.argsort(-scores, kind="stable")
+    else:
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+    return rows[top], scores[top]
+
+def ndcg_at_k(ranked, relevance, k):
+    """
+    NDCG@k för en rangordning (radindex) givet graderad relevans per rad.
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    gains = relevance[np.asarray(ranked[:k], dtype=np.intp)]
+    dcg = float((gains * discounts[:len(gains)]).sum())
+    ideal = np.sort(relevance)[::-1][:k]
+    idcg = float((ideal * discounts[:len(ideal)]).sum())
+    return dcg / idcg if idcg > 0 else 0.0
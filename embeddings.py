@@ -1,28 +1,171 @@
 # embeddings.py
-from sentence_transformers import SentenceTransformer
+import hashlib
+import os
+import threading
 import numpy as np
+from embedding_cache import EmbeddingCache, text_key
+from embedding_backends import load_backend
 
-# --- Initiera Hugging Face model ---
-hf_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
 
-def create_embeddings(df):
+# --- Backend (se embedding_backends.py); referensen är sentence-transformers på PyTorch ---
+BACKEND = os.environ.get("EMBEDDING_BACKEND", "sentence-transformers")
+MODEL_DIR = os.environ.get("EMBEDDING_MODEL_DIR") or None
+NUM_THREADS = int(os.environ.get("EMBEDDING_THREADS", "0"))
+
+DEFAULT_BATCH_SIZE = 64
+
+# --- Embedding-cache på disk (samma annonser återkommer mellan sökningar) ---
+CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", ".embedding_cache")
+CACHE_CAPACITY = int(os.environ.get("EMBEDDING_CACHE_CAPACITY", "50000"))
+
+# Modell och cache skapas en gång per process vid första användning och delas mellan
+# alla sessioner. Modellen körs under ett lås så att samtidiga användare inte
+# kör forward passes parallellt på samma modell-instans.
+_model = None
+_cache = None
+_init_lock = threading.Lock()
+_encode_lock = threading.Lock()
+
+def get_model():
+    """
+    Embedding-modellen i vald backend, laddad en gång per process.
+    """
+    global _model
+    if _model is None:
+        with _init_lock:
+            if _model is None:
+                _model = load_backend(BACKEND, MODEL_NAME, MODEL_DIR, NUM_THREADS)
+    return _model
+
+def cache_name():
+    """
+    Namn på embedding-cachen: andra backends än referensen ger lite andra vektorer
+    och får därför en egen cache, och en lokal modellkatalog (EMBEDDING_MODEL_DIR)
+    kan innehålla en annan modell än MODEL_NAME och får en hash av katalogen i namnet.
+    """
+    name = MODEL_NAME if BACKEND == "sentence-transformers" else f"{MODEL_NAME}@{BACKEND}"
+    if MODEL_DIR:
+        name += "@" + model_dir_digest(MODEL_DIR)
+    return name
+
+def model_dir_digest(model_dir):
+    """
+    Kort hash av modellkatalogens sökväg och konfiguration (och ONNX-filen för onnx-backenden).
+    """
+    h = hashlib.sha1(os.path.realpath(model_dir).encode("utf-8"))
+    if BACKEND == "onnx":
+        h.update(os.environ.get("EMBEDDING_ONNX_FILE", "model.onnx").encode("utf-8"))
+    for filename in ("config.json", "sentence_bert_config.json"):
+        path = os.path.join(model_dir, filename)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+def get_embedding_cache():
+    """
+    Embedding-cachen på disk, öppnad en gång per process.
+    """
+    global _cache
+    if _cache is None:
+        dim = get_model().get_sentence_embedding_dimension()
+        with _init_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(CACHE_DIR, cache_name(), dim, capacity=CACHE_CAPACITY)
+    return _cache
+
+def normalize_rows(matrix):
+    """
+    L2-normaliserar varje rad i en matris (nollvektorer lämnas orörda).
+    Returnerar en sammanhängande float32-matris.
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.size == 0:
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+def _encode_batched(texts, batch_size):
+    """
+    Kör modellen på texterna i batchar. Texterna sorteras på längd innan kodning
+    så att varje batch får lite padding; resultatet kommer i samma ordning som texts.
+    """
+    model = get_model()
+    dim = model.get_sentence_embedding_dimension()
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    if not texts:
+        return out
+
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = [texts[i] for i in idx]
+        with _encode_lock:
+            out[idx] = model.encode(batch, batch_size=len(batch), convert_to_numpy=True)
+    return normalize_rows(out)
+
+def encode_texts(texts, batch_size=DEFAULT_BATCH_SIZE, use_cache=True):
+    """
+    Kodar en lista texter och returnerar en (n, dim) float32-matris
+    med L2-normaliserade rader, i samma ordning som texts.
+    Texter som redan finns i embedding-cachen slås upp; bara missarna körs genom modellen.
+    """
+    texts = ["" if not isinstance(t, str) else t for t in texts]
+    if not use_cache:
+        return _encode_batched(texts, batch_size)
+
+    cache = get_embedding_cache()
+    keys = [text_key(t) for t in texts]
+    found, out = cache.get_many(keys)
+    if not found.all():
+        # samma text kan förekomma flera gånger i en sökning, koda den bara en gång
+        missing = {}
+        for i in np.flatnonzero(~found):
+            missing.setdefault(keys[i], []).append(i)
+        miss_keys = list(missing)
+        vectors = _encode_batched([texts[missing[k][0]] for k in miss_keys], batch_size)
+        for k, vec in zip(miss_keys, vectors):
+            out[missing[k]] = vec
+        cache.put_many(miss_keys, vectors)
+    return out
+
+def encode_uncached(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    encode_texts utan embedding-cachen, för texter som inte är annonser (skill- och
+    yrkesetiketter, meningsfragment). De skulle annars fylla cachen och tränga undan
+    annonsvektorerna; skill-etiketternas vektorer sparas i stället i egen fil (se skill_embeddings).
+    """
+    return encode_texts(texts, batch_size, use_cache=False)
+
+def create_embeddings(df, batch_size=DEFAULT_BATCH_SIZE, use_cache=True):
     """
     Skapar embeddings för alla rader i df['description'] med Hugging Face.
+    Hela kolumnen kodas i batchar; df['embedding'] får en normaliserad vektor per rad.
+    Annonser som redan finns i embedding-cachen körs inte genom modellen igen.
     """
     if 'description' not in df.columns:
         raise ValueError("DataFrame saknar kolumnen 'description'")
-    
+
     # Gör NaN till tom sträng för säkerhets skull
     df['description'] = df['description'].fillna("")
 
-    df['embedding'] = df['description'].apply(lambda x: hf_model.encode(x))
+    matrix = encode_texts(df['description'].tolist(), batch_size=batch_size, use_cache=use_cache)
+    df['embedding'] = list(matrix)
     return df
 
 def get_embedding(text):
     """
-    Skapar embedding för en textsträng med Hugging Face.
+    Skapar embedding för en textsträng med Hugging Face (normaliserad float32-vektor).
     """
-    return hf_model.encode(text)
-
-
+    return encode_texts([text])[0]
 
+def embedding_cache_stats():
+    """
+    Träff/miss-räknare för embedding-cachen (nollor om cachen inte har öppnats än).
+    """
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0, "capacity": CACHE_CAPACITY}
+    return _cache.stats()
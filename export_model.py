@@ -0,0 +1,69 @@
+# export_model.py
+"""
+Förbereder en lokal modellkatalog för EMBEDDING_MODEL_DIR (körs en gång, med nätverk):
+  - sparar referensmodellen (sentence-transformers-format, räcker för torch-int8)
+  - --onnx: exporterar transformern till model.onnx (kräver paketet onnx)
+  - --quantize: skapar även model_int8.onnx med dynamisk int8-kvantisering (kräver onnxruntime)
+"""
+import argparse
+import os
+from embeddings import MODEL_NAME
+
+ONNX_INPUTS = ["input_ids", "attention_mask", "token_type_ids"]
+
+def save_reference(model_name, out_dir):
+    from sentence_transformers import SentenceTransformer
+    SentenceTransformer(model_name).save(out_dir)
+
+def export_onnx(model_dir, onnx_path, opset=17):
+    """
+    Exporterar transformern (utan pooling) med dynamisk batch- och sekvenslängd;
+    pooling och normalisering görs i embedding_backends.
+    """
+    import torch
+    from transformers import AutoModel
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                              token_type_ids=token_type_ids).last_hidden_state
+
+    model = AutoModel.from_pretrained(model_dir, local_files_only=True).eval()
+    dummy = torch.ones((1, 8), dtype=torch.long)
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in ONNX_INPUTS}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    torch.onnx.export(_LastHiddenState(model), (dummy, dummy, torch.zeros_like(dummy)), onnx_path,
+                      input_names=ONNX_INPUTS, output_names=["last_hidden_state"],
+                      dynamic_axes=dynamic, opset_version=opset, dynamo=False)
+
+def quantize_onnx(onnx_path, out_path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(onnx_path, out_path, weight_type=QuantType.QInt8)
+
+def main():
+    parser = argparse.ArgumentParser(description="Spara och exportera embedding-modellen för offline-bruk.")
+    parser.add_argument("out_dir", help="katalog att skriva modellen till (EMBEDDING_MODEL_DIR)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--onnx", action="store_true", help="exportera även till ONNX")
+    parser.add_argument("--quantize", action="store_true", help="skapa även en int8-kvantiserad ONNX-fil")
+    args = parser.parse_args()
+
+    save_reference(args.model, args.out_dir)
+    print(f"💾 Sparade {args.model} i {args.out_dir}")
+    if args.onnx or args.quantize:
+        onnx_path = os.path.join(args.out_dir, "model.onnx")
+        export_onnx(args.out_dir, onnx_path)
+        print(f"📦 Exporterade {onnx_path}")
+        if args.quantize:
+            quantized = os.path.join(args.out_dir, "model_int8.onnx")
+            quantize_onnx(onnx_path, quantized)
+            print(f"📦 Kvantiserade till {quantized} (EMBEDDING_ONNX_FILE=model_int8.onnx)")
+
+if __name__ == "__main__":
+    main()
+
+# python export_model.py models/minilm --onnx --quantize
@@ -1,38 +1,45 @@
 # fetch_jobs.py
+import httpx
 import pandas as pd
-import requests
+from jobtech_client import search_hits, JobTechError
+from tracing import count
 
-def get_jobs(query=None, limit=5):
+def hits_to_dataframe(hits, with_id=False):
     """
-    Hämtar riktiga jobbannonser från JobTech API.
+    Gör om JobTech-hits till DataFrame med kolumnerna title/company/city/description/url.
+    Med with_id kommer även annonsens id och sista ansökningsdag (deadline) med.
     """
-
-    url = "https://jobsearch.api.jobtechdev.se/search"
-    params = {
-        "q": query if query else "",
-        "limit": limit
-    }
-
-    try:
-        resp = requests.get(url, params=params)
-        resp.raise_for_status()
-        hits = resp.json().get("hits", [])
-    except Exception as e:
-        print("⚠️ Fel vid API-anrop:", e)
-        return pd.DataFrame([])
-
-    data = {
+    data = {}
+    if with_id:
+        data["id"] = [str(hit.get("id", "")) for hit in hits]
+    data.update({
         "title": [hit.get("headline", "Ingen titel") for hit in hits],
         "company": [hit.get("employer", {}).get("name", "Ingen arbetsgivare") for hit in hits],
         "city": [hit.get("workplace_address", {}).get("municipality", "Ingen ort") for hit in hits],
         "description": [hit.get("description", {}).get("text", "Ingen beskrivning") for hit in hits],
         "url": [hit.get("webpage_url", "#") for hit in hits]
-    }
+    })
+    if with_id:
+        data["deadline"] = [hit.get("application_deadline") for hit in hits]
 
     df = pd.DataFrame(data)
     df['city'] = df['city'].fillna("Ingen ort")
     return df
 
+def get_jobs(query=None, limit=5, base_url=None):
+    """
+    Hämtar riktiga jobbannonser från JobTech API.
+    Fler än 100 annonser hämtas som parallella sidor via den delade asynkrona klienten.
+    """
+    try:
+        hits = search_hits(query, limit, base_url=base_url)
+    except (JobTechError, httpx.HTTPError, ValueError) as e:
+        print("⚠️ Fel vid API-anrop:", e)
+        count("fetch_errors")
+        return pd.DataFrame([])
+
+    return hits_to_dataframe(hits)
+
 
 
 # python fetch_jobs.py
@@ -0,0 +1,151 @@
+# ingest.py
+"""
+Offline-ingest: hämtar stora mängder annonser från JobTech, embeddar dem och
+lägger dem i ett lokalt IVF-index på disk som appen kan söka direkt i.
+Samma annonser läggs i ett BM25-index (bm25_index) i samma katalog.
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from fetch_jobs import hits_to_dataframe
+from jobtech_client import stream_pages, MAX_OFFSET
+from dump_reader import iter_ad_chunks, DEFAULT_CHUNK_SIZE
+from embeddings import encode_texts
+from vector_index import IVFIndex
+from bm25_index import BM25Index, ids_digest
+
+INDEX_DIR = os.environ.get("AD_INDEX_DIR", ".ad_index")
+PAYLOAD_COLUMNS = ["title", "company", "city", "description", "url", "deadline"]
+
+def open_index(directory=INDEX_DIR, dim=None, n_lists=256):
+    """
+    Öppnar indexet på disk, eller skapar ett tomt om det inte finns (då krävs dim).
+    """
+    if os.path.exists(os.path.join(directory, "index.json")):
+        return IVFIndex.load(directory)
+    if dim is None:
+        return None
+    return IVFIndex(dim, n_lists=n_lists)
+
+def open_lexical_index(directory=INDEX_DIR, index=None, save=False):
+    """
+    Öppnar BM25-indexet på disk. Saknas det, eller hör det inte ihop med vektorindexet
+    index (ids-hashen i bm25.json skiljer sig), byggs det om från indexets payloads och
+    sparas om save är satt. None om inget av dem finns.
+    """
+    if os.path.exists(os.path.join(directory, "bm25.json")):
+        lexical = BM25Index.load(directory)
+        if index is None or lexical.saved_digest == ids_digest(i for i in index.ids if i in index):
+            return lexical
+    if index is None:
+        return None
+    start = time.perf_counter()
+    lexical = BM25Index.from_payloads(index.payloads)
+    print(f"🔁 Byggde om BM25-indexet ({len(lexical)} annonser) på {time.perf_counter() - start:.1f} s")
+    if save:
+        try:
+            lexical.save(directory)
+        except OSError as e:
+            print(f"⚠️ Kunde inte spara BM25-indexet i {directory}: {e}")
+    return lexical
+
+def add_ads(index, df, lexical=None):
+    """
+    Embeddar och lägger in en DataFrame med annonser (kolumnen "id" krävs), även i
+    BM25-indexet lexical om det ges. Returnerar antal inlagda annonser.
+    """
+    df = df[df["id"] != ""]
+    if df.empty:
+        return 0
+    df = df.drop_duplicates("id", keep="last")
+    vectors = encode_texts(df["description"].fillna("").tolist())
+    payloads = df[PAYLOAD_COLUMNS].to_dict("records")
+    index.add(df["id"].tolist(), vectors, payloads)
+    if lexical is not None:
+        lexical.add(df["id"].tolist(), df["title"].tolist(), df["description"].tolist())
+    return len(df)
+
+def ingest_query(index, query, max_ads=MAX_OFFSET, base_url=None, lexical=None):
+    """
+    Hämtar upp till max_ads annonser för query, sida för sida, och lägger in dem
+    i indexet allteftersom sidorna kommer in.
+    """
+    added = 0
+    for _, hits in stream_pages(query, max_ads, base_url=base_url):
+        added += add_ads(index, hits_to_dataframe(hits, with_id=True), lexical)
+    return added
+
+def ingest_dump(index, path, chunk_size=DEFAULT_CHUNK_SIZE, lexical=None):
+    """
+    Lägger in alla annonser i en dump (JSON/JSONL, ev. .gz) chunk för chunk, så att
+    dumpen aldrig behöver få plats i minnet. Annonser utan id hoppas över.
+    """
+    added = 0
+    for chunk in iter_ad_chunks(path, chunk_size, with_id=True):
+        added += add_ads(index, chunk, lexical)
+    return added
+
+def remove_expired(index, now=None, lexical=None):
+    """
+    Tar bort annonser vars sista ansökningsdag har passerats (även ur lexical).
+    """
+    now = now or datetime.now()
+    expired = []
+    for ad_id, payload in index.payloads.items():
+        deadline = (payload or {}).get("deadline")
+        if not deadline:
+            continue
+        try:
+            if datetime.fromisoformat(deadline[:19]) < now:
+                expired.append(ad_id)
+        except ValueError:
+            continue
+    if lexical is not None:
+        lexical.delete(expired)
+    return index.delete(expired)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bygg/uppdatera det lokala annonsindexet.")
+    parser.add_argument("queries", nargs="*", help="sökfrågor att hämta annonser för")
+    parser.add_argument("--queries-file", help="fil med en sökfråga per rad")
+    parser.add_argument("--dump", action="append", default=[], help="annonsdump (JSON/JSONL, ev. .gz) att läsa in")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-ads", type=int, default=MAX_OFFSET, help="max annonser per fråga")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--n-lists", type=int, default=256)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--prune-expired", action="store_true", help="ta bort annonser med passerad deadline")
+    args = parser.parse_args()
+
+    queries = list(args.queries)
+    if args.queries_file:
+        with open(args.queries_file, "r", encoding="utf-8") as f:
+            queries += [line.strip() for line in f if line.strip()]
+
+    dim = encode_texts(["dim"], use_cache=False).shape[1]
+    index = open_index(args.index_dir, dim=dim, n_lists=args.n_lists)
+    lexical = open_lexical_index(args.index_dir, index)
+    start = time.perf_counter()
+    for q in queries:
+        try:
+            n = ingest_query(index, q, args.max_ads, base_url=args.base_url, lexical=lexical)
+            print(f"✅ {q!r}: {n} annonser ({len(index)} totalt)")
+        except Exception as e:
+            print(f"⚠️ Fel vid ingest av {q!r}: {e}")
+    for path in args.dump:
+        try:
+            n = ingest_dump(index, path, args.chunk_size, lexical)
+            print(f"✅ {path}: {n} annonser ({len(index)} totalt)")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Fel vid inläsning av {path}: {e}")
+    if args.prune_expired:
+        print(f"🧹 Tog bort {remove_expired(index, lexical=lexical)} utgångna annonser")
+    index.save(args.index_dir)
+    lexical.save(args.index_dir)
+    print(f"💾 Sparade {len(index)} annonser i {args.index_dir} på {time.perf_counter() - start:.1f} s")
+
+if __name__ == "__main__":
+    main()
+
+# python ingest.py --queries-file queries.txt --prune-expired
@@ -0,0 +1,250 @@
+# intents.py
+"""
+Chattens frågor som en tabell av intents. Varje intent har nyckelord, prioritet och en
+handler(question, df) -> svarstext. Alla nyckelord kompileras till ett enda mönster som
+körs en gång över frågan, och städer slås upp i ett hashindex på normaliserade namn,
+så kostnaden för att välja svar växer inte med antalet intents.
+Handlers är vanliga funktioner och kan testas utan Streamlit.
+"""
+import re
+from ad_features import AdFeature, EMPLOYMENT_TYPES, has_any, remote_mask, onsite_mask
+from skills import get_skills_for_user_query
+from text_utils import normalize_text
+from tracing import span
+
+NO_DATA_ANSWER = "🤖 Jag har ingen annonsdata att analysera just nu. Sök efter jobb först."
+FALLBACK_ANSWER = "Åhnej, detta har jag inte lärt mig än 🙁️ Kan jag kanske hjälpa till med något annat istället?"
+
+class Intent:
+    def __init__(self, name, keywords, handler, priority):
+        self.name = name
+        self.keywords = tuple(keywords)
+        self.handler = handler
+        self.priority = priority
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+INTENTS = []
+
+def intent(name, keywords, priority):
+    """
+    Dekorator som registrerar en handler. Lägst prioritet vinner när flera intents matchar.
+    """
+    def register(handler):
+        INTENTS.append(Intent(name, keywords, handler, priority))
+        return handler
+    return register
+
+class IntentRouter:
+    """
+    Ett sammanslaget mönster (?=(kw1|kw2|...)) över alla nyckelord, längsta först.
+    Lookahead gör att träffar får överlappa; ett nyckelord som är prefix till ett
+    längre (t.ex. "kompetens"/"kompetenser") räknas in i det längres intents redan
+    när routern byggs, så en träff per position räcker.
+    """
+
+    def __init__(self, intents):
+        self.intents = sorted(intents, key=lambda i: i.priority)
+        by_keyword = {}
+        for it in self.intents:
+            for kw in it.keywords:
+                by_keyword.setdefault(kw.lower(), []).append(it)
+        keywords = sorted(by_keyword, key=lambda k: (-len(k), k))
+        self._intents_for = {
+            kw: {it for short in keywords if kw.startswith(short) for it in by_keyword[short]}
+            for kw in keywords
+        }
+        alternation = "|".join(re.escape(k) for k in keywords)
+        self._pattern = re.compile(f"(?=({alternation}))") if keywords else None
+
+    def match(self, question):
+        """
+        Alla intents vars nyckelord förekommer i frågan, i prioritetsordning.
+        """
+        if self._pattern is None or not isinstance(question, str):
+            return []
+        found = set()
+        for m in self._pattern.finditer(question.lower()):
+            found |= self._intents_for[m.group(1)]
+        return sorted(found, key=lambda i: i.priority)
+
+    def route(self, question):
+        """
+        Den intent som ska svara, eller None.
+        """
+        matches = self.match(question)
+        return matches[0] if matches else None
+
+class CityIndex:
+    """
+    Normaliserat stadsnamn -> stad som den står i annonserna. Frågan normaliseras en
+    gång och dess n-gram (upp till längsta stadsnamnet) slås upp i indexet.
+    """
+
+    def __init__(self, cities):
+        self._cities = {}
+        for city in cities:
+            key = normalize_text(city)
+            if key:
+                self._cities.setdefault(key, city)
+        self._max_tokens = max((len(k.split()) for k in self._cities), default=0)
+
+    @classmethod
+    def from_df(cls, df):
+        if df is None or df.empty:
+            return cls([])
+        return cls(df["city"].fillna("").unique())
+
+    def __len__(self):
+        return len(self._cities)
+
+    def find(self, question):
+        """
+        Staden som nämns i frågan (längsta namnet först, sedan tidigast i frågan), eller None.
+        """
+        tokens = normalize_text(question).split()
+        for n in range(min(self._max_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - n + 1):
+                key = " ".join(tokens[start:start + n])
+                # genitiv: "Stockholms" ska hitta Stockholm
+                city = self._cities.get(key) or (key.endswith("s") and self._cities.get(key[:-1])) or None
+                if city is not None:
+                    return city
+        return None
+
+def format_examples(df, n=3):
+    return "; ".join(f"{r['title']} på {r['company']} ({r['city']})" for _, r in df.head(n).iterrows())
+
+def _filtered_answer(df, mask, found, empty):
+    hits = df[mask]
+    if not len(hits):
+        return empty
+    return found.format(cnt=len(hits), examples=format_examples(hits))
+
+# --- handlers ---
+
+def answer_city(df, city):
+    hits = df[df["city"].fillna("") == city]
+    if hits.empty:
+        return f"📄 Det finns inga jobb i {city} i de sökta annonserna."
+    return f"📄 Det finns {len(hits)} jobb i {city}. Exempel: {format_examples(hits)}."
+
+def answer_top_city(question, df):
+    counts = df["city"].fillna("Ingen ort").value_counts()
+    if counts.empty:
+        return "🤔 Jag hittar inga annonser att analysera."
+    max_count = counts.max()
+    top = counts[counts == max_count].index.tolist()
+    if len(top) == 1:
+        return f"🏙️ Flest jobb finns i: {top[0]} ({max_count} annonser)."
+    return f"🏙️ Flera städer delar förstaplatsen ({max_count} annonser): " + ", ".join(top)
+
+def answer_examples(question, df):
+    return "📋 Här är tre exempeljobb: " + format_examples(df)
+
+def answer_remote_button(question, df):
+    return _filtered_answer(df, remote_mask(df), "🌍 Jag hittade {cnt} distansjobb. Exempel: {examples}.",
+                            "🤔 Inga distansjobb hittades i de sökta annonserna.")
+
+@intent("remote", ["distans", "remote", "hemifrån", "fjärr"], priority=10)
+def answer_remote(question, df):
+    return _filtered_answer(df, remote_mask(df), "🌍 Jag hittade {cnt} distansjobb. Exempel: {examples}.",
+                            "🌍 Jag hittade tyvärr inga distansjobb.")
+
+@intent("hybrid", ["hybrid", "både"], priority=20)
+def answer_hybrid(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.HYBRID),
+                            "💻 Jag hittade {cnt} hybridjobb. Exempel: {examples}.",
+                            "💻 Inga hybridjobb hittades i de sökta annonserna.")
+
+@intent("onsite", ["plats", "kontor", "på plats"], priority=30)
+def answer_onsite(question, df):
+    return _filtered_answer(df, onsite_mask(df), "🏢 Jag hittade {cnt} jobb på plats. Exempel: {examples}.",
+                            "🏢 Inga platsjobb hittades i de sökta annonserna.")
+
+@intent("employment_type", list(EMPLOYMENT_TYPES), priority=40)
+def answer_employment_type(question, df):
+    q_low = question.lower()
+    types = [w for w in EMPLOYMENT_TYPES if w in q_low]
+    return _filtered_answer(df, has_any(df, sum(EMPLOYMENT_TYPES[w] for w in types)),
+                            f"🕒 Jag hittade {{cnt}} jobb som matchar ({', '.join(types)}). Exempel: {{examples}}.",
+                            f"🕒 Inga jobb matchar ({', '.join(types)}) i de sökta annonserna.")
+
+@intent("gymnasie", ["gymnasie", "gymnasiet", "gymnasieutbildning"], priority=50)
+def answer_gymnasie(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.GYMNASIE),
+                            "📘 {cnt} jobb nämner gymnasieutbildning. Exempel: {examples}.",
+                            "📘 Inga jobb nämner gymnasieutbildning i de sökta annonserna.")
+
+@intent("universitet", ["universitet", "högskola", "högre utbildning"], priority=60)
+def answer_universitet(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.UNIVERSITET),
+                            "🎓 {cnt} jobb nämner universitet eller högre utbildning. Exempel: {examples}.",
+                            "🎓 Inga jobb nämner universitet eller högre utbildning i de sökta annonserna.")
+
+@intent("korkort", ["körkort"], priority=70)
+def answer_korkort(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.KORKORT),
+                            "🚗 {cnt} jobb kräver körkort. Exempel: {examples}.",
+                            "🚗 Inga jobb kräver körkort i de sökta annonserna.")
+
+@intent("engelska", ["engelska"], priority=80)
+def answer_engelska(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.ENGELSKA),
+                            "🗣️ {cnt} jobb nämner engelska. Exempel: {examples}.",
+                            "🗣️ Inga jobb nämner engelska i de sökta annonserna.")
+
+@intent("svenska", ["svenska"], priority=90)
+def answer_svenska(question, df):
+    return _filtered_answer(df, has_any(df, AdFeature.SVENSKA),
+                            "🗣️ {cnt} jobb nämner svenska. Exempel: {examples}.",
+                            "🗣️ Inga jobb nämner svenska i de sökta annonserna.")
+
+@intent("skills", ["kompetens", "kompetenser", "skills", "behövs", "krävs"], priority=100)
+def answer_skills(question, df):
+    skills = get_skills_for_user_query(question, df, top_k=7)
+    return "🛠️ Några vanliga kompetenser inom detta område: " + ", ".join(skills)
+
+# Snabbknapparna i chatten: (knapptext, frågan som visas i historiken, handler)
+BUTTONS = [
+    ("🏙️ Vilken stad har flest jobb?", "Vilken stad har flest jobb?", answer_top_city),
+    ("📋 Visa tre exempeljobb!", "Visa tre exempeljobb!", answer_examples),
+    ("🌍 Vilka jobb kan vara på distans?", "Hur många distansjobb finns?", answer_remote_button),
+]
+
+_router = None
+
+def get_router():
+    """
+    Routern över alla registrerade intents, byggd en gång (om när nya registreras).
+    """
+    global _router
+    if _router is None or len(_router.intents) != len(INTENTS):
+        _router = IntentRouter(INTENTS)
+    return _router
+
+def answer_question(question, df, city_index=None):
+    """
+    Svar på en fri chattfråga om annonserna i df. En stad i frågan går före alla
+    nyckelord (som tidigare); city_index kan byggas en gång per sökresultat.
+    """
+    if df is None or df.empty:
+        return NO_DATA_ANSWER
+    with span("intent.route"):
+        city = (city_index or CityIndex.from_df(df)).find(question)
+        match = get_router().route(question) if city is None else None
+    if city is not None:
+        with span("intent.city"):
+            return answer_city(df, city)
+    if match is None:
+        return FALLBACK_ANSWER
+    with span(f"intent.{match.name}"):
+        return match.handler(question, df)
+
+def answer_button(handler, question, df):
+    """
+    Svar för en snabbknapp (se BUTTONS), tidtaget som ett eget intent.
+    """
+    with span(f"intent.{handler.__name__.removeprefix('answer_')}"):
+        return handler(question, df)
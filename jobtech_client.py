@@ -0,0 +1,194 @@
+# jobtech_client.py
+"""
+Asynkron klient mot JobTechs sök-API med connection pooling, keep-alive,
+parallell paginering (offset), timeouts och retries med backoff.
+"""
+import asyncio
+import os
+import queue
+import random
+import threading
+import httpx
+
+BASE_URL = os.environ.get("JOBTECH_BASE_URL", "https://jobsearch.api.jobtechdev.se")
+MAX_PAGE_SIZE = 100   # API:ts största tillåtna limit per anrop
+MAX_OFFSET = 2000     # API:t ger inga träffar efter offset 2000
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class JobTechError(Exception):
+    pass
+
+class JobTechClient:
+    """
+    Används som async context manager:
+
+        async with JobTechClient() as client:
+            async for offset, hits in client.iter_pages("systemutvecklare", max_ads=500):
+                ...
+    """
+
+    def __init__(self, base_url=None, concurrency=4, timeout=10.0, retries=3, backoff=0.5):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client = None
+
+    async def open(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"accept": "application/json"},
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency),
+            )
+        return self
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def search_page(self, query, offset=0, limit=MAX_PAGE_SIZE):
+        """
+        Hämtar en sida från /search. Nätverksfel, 429 och 5xx görs om med
+        exponentiell backoff (och Retry-After om servern skickar det).
+        """
+        params = {"q": query or "", "offset": offset, "limit": limit}
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+            try:
+                resp = await self._client.get("/search", params=params)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise JobTechError(f"nätverksfel efter {attempt + 1} försök: {e}") from e
+            else:
+                if resp.status_code not in RETRY_STATUS:
+                    resp.raise_for_status()
+                    return resp.json()
+                if attempt == self.retries:
+                    raise JobTechError(f"HTTP {resp.status_code} efter {attempt + 1} försök")
+                retry_after = resp.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+    async def iter_pages(self, query, max_ads, page_size=MAX_PAGE_SIZE):
+        """
+        Hämtar upp till max_ads annonser. Första sidan avgör hur många träffar som finns;
+        resten av sidorna hämtas parallellt (högst concurrency åt gången) och lämnas
+        till anroparen i den ordning de blir klara, som (offset, hits).
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE, max_ads)
+        if page_size <= 0:
+            return
+        first = await self.search_page(query, 0, page_size)
+        hits = first.get("hits", [])
+        yield 0, hits
+
+        total = first.get("total", {}).get("value", len(hits))
+        end = min(max_ads, total, MAX_OFFSET + page_size)
+        offsets = list(range(page_size, end, page_size))
+        if not offsets or len(hits) < page_size:
+            return
+
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(offset):
+            async with sem:
+                page = await self.search_page(query, offset, min(page_size, end - offset))
+            return offset, page.get("hits", [])
+
+        tasks = [asyncio.ensure_future(fetch(o)) for o in offsets]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def fetch_hits(self, query, max_ads, page_size=MAX_PAGE_SIZE):
+        """
+        Alla hits upp till max_ads, i API:ts relevansordning.
+        """
+        pages = [page async for page in self.iter_pages(query, max_ads, page_size)]
+        pages.sort(key=lambda p: p[0])
+        return [hit for _, page in pages for hit in page][:max_ads]
+
+class _BackgroundLoop:
+    """
+    En event loop i en egen tråd så att synkron kod (Streamlit) kan återanvända
+    samma klient, och därmed samma öppna anslutningar, mellan sökningar.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="jobtech-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+_loop = None
+_clients = {}
+_lock = threading.Lock()
+
+def get_shared_client(base_url=None):
+    """
+    Processgemensam klient (per bas-URL) som lever i bakgrundsloopen.
+    """
+    global _loop
+    base_url = (base_url or BASE_URL).rstrip("/")
+    with _lock:
+        if _loop is None:
+            _loop = _BackgroundLoop()
+        client = _clients.get(base_url)
+        if client is None:
+            client = JobTechClient(base_url)
+            _loop.run(client.open())
+            _clients[base_url] = client
+    return _loop, client
+
+def search_hits(query, max_ads, base_url=None):
+    """
+    Synkron variant av fetch_hits via den delade klienten.
+    """
+    loop, client = get_shared_client(base_url)
+    return loop.run(client.fetch_hits(query, max_ads))
+
+def stream_pages(query, max_ads, page_size=MAX_PAGE_SIZE, base_url=None):
+    """
+    Synkron generator som lämnar (offset, hits) allteftersom sidorna kommer in.
+    """
+    loop, client = get_shared_client(base_url)
+    pages = queue.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async for page in client.iter_pages(query, max_ads, page_size):
+                pages.put(page)
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(done)
+
+    future = asyncio.run_coroutine_threadsafe(produce(), loop.loop)
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        future.cancel()
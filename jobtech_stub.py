@@ -0,0 +1,108 @@
+# jobtech_stub.py
+"""
+Lokal stub av JobTechs /search-endpoint som spelar upp sparade svar.
+Används av tester och benchmarks så att de inte går mot det riktiga API:t.
+"""
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE_PATH = "testdata/jobtech_search.json"
+
+def load_recorded_hits(path=FIXTURE_PATH, total=None):
+    """
+    Läser sparade hits. Med total > antal sparade upprepas de med unika id:n
+    så att stubben kan servera godtyckligt många annonser.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        hits = json.load(f)["hits"]
+    if total is None or total <= len(hits):
+        return hits[:total] if total is not None else hits
+    out = []
+    for i in range(total):
+        hit = copy.deepcopy(hits[i % len(hits)])
+        hit["id"] = f"{hit['id']}-{i // len(hits)}"
+        out.append(hit)
+    return out
+
+class StubJobTechServer:
+    """
+    HTTP/1.1-server (med keep-alive) i en bakgrundstråd.
+      - latency: fördröjning per svar i sekunder
+      - fail_first: antal första anrop som får 503, för att testa retries
+    """
+
+    def __init__(self, hits=None, total=None, latency=0.0, fail_first=0, host="127.0.0.1", port=0):
+        self.hits = hits if hits is not None else load_recorded_hits(total=total)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/search":
+                    return self._send(404, {"message": "not found"})
+                with stub._lock:
+                    stub.requests += 1
+                    fail = stub.fail_first > 0
+                    if fail:
+                        stub.fail_first -= 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if fail:
+                    return self._send(503, {"message": "service unavailable"})
+                params = parse_qs(url.query)
+                offset = int(params.get("offset", ["0"])[0])
+                limit = int(params.get("limit", ["10"])[0])
+                self._send(200, {
+                    "total": {"value": len(stub.hits)},
+                    "positions": len(stub.hits),
+                    "hits": stub.hits[offset:offset + limit],
+                })
+
+            def _send(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,63 +1,96 @@
 import json
+from taxonomy_snapshot import TaxonomySnapshot, snapshot_path_for
 
-def load_taxonomy(path="ssyk-level-4-groups-with-related-skills.json"):
+def parse_taxonomy_file(path):
     """
-    Läser in SSYK-taxonomi (JobTech-format) och returnerar:
-      - taxonomy: lista av dicts [{occupation, skills[]}, ...]
-      - taxonomy_skill_set: set() av alla kompetenser (för sökning i text)
+    Parsar SSYK-taxonomins JSON-fil (JobTech-format) och returnerar (taxonomy, taxonomy_skill_set).
     """
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
 
-        taxonomy = []
-        taxonomy_skill_set = set()
+    taxonomy = []
+    taxonomy_skill_set = set()
 
-        # Data kan vara antingen {"data": {"concepts": [...]}} eller {"concepts": [...]}
-        concepts = []
-        if isinstance(data, dict):
-            if "data" in data and isinstance(data["data"], dict) and "concepts" in data["data"]:
-                concepts = data["data"]["concepts"]
-            elif "concepts" in data:
-                concepts = data["concepts"]
-            else:
-                # ibland en lista av poster i "data"
-                if isinstance(data.get("data"), list):
-                    concepts = data["data"]
-        elif isinstance(data, list):
-            concepts = data
+    # Data kan vara antingen {"data": {"concepts": [...]}} eller {"concepts": [...]}
+    concepts = []
+    if isinstance(data, dict):
+        if "data" in data and isinstance(data["data"], dict) and "concepts" in data["data"]:
+            concepts = data["data"]["concepts"]
+        elif "concepts" in data:
+            concepts = data["concepts"]
+        else:
+            # ibland en lista av poster i "data"
+            if isinstance(data.get("data"), list):
+                concepts = data["data"]
+    elif isinstance(data, list):
+        concepts = data
 
-        for entry in concepts:
-            occ_label = entry.get("preferred_label") or entry.get("label") or ""
-            if not occ_label:
+    for entry in concepts:
+        occ_label = entry.get("preferred_label") or entry.get("label") or ""
+        if not occ_label:
+            continue
+        occ_label = occ_label.strip().lower()
+
+        related = entry.get("related", [])
+        skills = []
+        for rel in related:
+            if not isinstance(rel, dict):
                 continue
-            occ_label = occ_label.strip().lower()
+            label = rel.get("preferred_label") or rel.get("label")
+            if isinstance(label, dict):
+                label = label.get("sv") or label.get("en")
+            if isinstance(label, str):
+                skill_label = label.strip().lower()
+                if len(skill_label) > 2:
+                    skills.append(skill_label)
+                    taxonomy_skill_set.add(skill_label)
 
-            related = entry.get("related", [])
-            skills = []
-            for rel in related:
-                if not isinstance(rel, dict):
-                    continue
-                label = rel.get("preferred_label") or rel.get("label")
-                if isinstance(label, dict):
-                    label = label.get("sv") or label.get("en")
-                if isinstance(label, str):
-                    skill_label = label.strip().lower()
-                    if len(skill_label) > 2:
-                        skills.append(skill_label)
-                        taxonomy_skill_set.add(skill_label)
+        taxonomy.append({
+            "occupation": occ_label,
+            "skills": list(dict.fromkeys(skills))
+        })
 
-            taxonomy.append({
-                "occupation": occ_label,
-                "skills": list(set(skills))
-            })
+    return taxonomy, taxonomy_skill_set
 
-        print(f"✅ Laddade {len(taxonomy)} yrken med kompetenser ({len(taxonomy_skill_set)} unika skills) från {path}")
-        return taxonomy, taxonomy_skill_set
+def load_taxonomy_snapshot(path="ssyk-level-4-groups-with-related-skills.json"):
+    """
+    Laddar taxonomin som TaxonomySnapshot. Den kompilerade binärfilen bredvid JSON-filen
+    används om den är aktuell; annars parsas JSON-filen och snapshoten skrivs om.
+    Returnerar None om taxonomin inte kunde läsas.
+    """
+    snap_path = snapshot_path_for(path)
+    try:
+        snapshot = TaxonomySnapshot.load(snap_path, source_path=path)
+    except Exception as e:
+        print(f"⚠️ Kunde inte läsa {snap_path}, parsar JSON i stället: {e}")
+        snapshot = None
+    if snapshot is not None:
+        return snapshot
 
+    try:
+        taxonomy, _ = parse_taxonomy_file(path)
     except Exception as e:
         print(f"❌ Misslyckades med att läsa {path}: {e}")
+        return None
+    snapshot = TaxonomySnapshot.from_taxonomy(taxonomy)
+    try:
+        snapshot.save(snap_path, path)
+    except OSError as e:
+        print(f"⚠️ Kunde inte skriva {snap_path}: {e}")
+    return snapshot
+
+def load_taxonomy(path="ssyk-level-4-groups-with-related-skills.json"):
+    """
+    Läser in SSYK-taxonomi (JobTech-format) och returnerar:
+      - taxonomy: lista av dicts [{occupation, skills[]}, ...]
+      - taxonomy_skill_set: set() av alla kompetenser (för sökning i text)
+    """
+    snapshot = load_taxonomy_snapshot(path)
+    if snapshot is None:
         return [], set()
+    taxonomy, taxonomy_skill_set = snapshot.to_taxonomy()
+    print(f"✅ Laddade {len(taxonomy)} yrken med kompetenser ({len(taxonomy_skill_set)} unika skills) från {path}")
+    return taxonomy, taxonomy_skill_set
 
 
 if __name__ == "__main__":
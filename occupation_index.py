@@ -0,0 +1,103 @@
+# occupation_index.py
+import os
+import re
+import numpy as np
+from text_utils import normalize_text
+from phrase_matcher import PhraseMatcher
+
+# närmaste-yrke-fallback via embeddings för sökfrågor som inte matchar någon etikett (av som standard)
+EMBEDDING_FALLBACK = os.environ.get("OCCUPATION_EMBEDDING_FALLBACK", "0") == "1"
+
+def occupation_aliases(label):
+    """
+    Normaliserade sökformer för en yrkesetikett, t.ex. "lastbilsförare m.fl."
+    ger både "lastbilsförare m fl" och "lastbilsförare".
+    """
+    norm = normalize_text(label)
+    aliases = [norm]
+    short = re.sub(r"\s+m fl$", "", norm)
+    if short != norm:
+        aliases.append(short)
+    return [a for a in aliases if a]
+
+class OccupationIndex:
+    """
+    Index över taxonomins yrken, byggs en gång när taxonomin laddas:
+      - en PhraseMatcher över alla yrkesetiketter (query och titlar matchas i en genomgång)
+      - dict yrke -> skills (och normaliserade skills, förberäknade om de skickas in)
+      - valfri embedding-matris över yrkesetiketterna för närmaste-yrke-fallback
+    """
+
+    def __init__(self, taxonomy, normalized_skills=None):
+        self.occupations = []
+        self.skills = {}
+        self.normalized_skills = {}
+        self._alias_to_occ = {}
+        for entry in taxonomy:
+            occ = entry["occupation"]
+            if not occ or occ in self.skills:
+                continue
+            self.occupations.append(occ)
+            self.skills[occ] = entry["skills"]
+            if normalized_skills is not None:
+                self.normalized_skills[occ] = normalized_skills[occ]
+            else:
+                self.normalized_skills[occ] = [normalize_text(sk) for sk in entry["skills"]]
+            for alias in occupation_aliases(occ):
+                self._alias_to_occ.setdefault(alias, occ)
+        self._order = {occ: i for i, occ in enumerate(self.occupations)}
+        self._matcher = PhraseMatcher(self._alias_to_occ)
+        self._label_matrix = None
+
+    def __len__(self):
+        return len(self.occupations)
+
+    def skills_for(self, occupation):
+        return self.skills.get(occupation, [])
+
+    def match_query(self, query):
+        """
+        Yrket vars etikett förekommer i frågan; vid flera träffar vinner den längsta
+        (mest specifika) etiketten, därefter taxonomins ordning. None om inget matchar.
+        """
+        hits = self._matcher.count(query)
+        if not hits:
+            return None
+        best = min(hits, key=lambda alias: (-len(alias), self._order[self._alias_to_occ[alias]]))
+        return self._alias_to_occ[best]
+
+    def match_titles(self, titles):
+        """
+        Det yrke som nämns flest gånger i annonstitlarna, eller None.
+        """
+        counts = {}
+        for alias, c in self._matcher.count([str(t) for t in titles]).items():
+            occ = self._alias_to_occ[alias]
+            counts[occ] = counts.get(occ, 0) + c
+        if not counts:
+            return None
+        return min(counts, key=lambda occ: (-counts[occ], self._order[occ]))
+
+    def build_label_embeddings(self, encode_fn):
+        """
+        Förberäknar en normaliserad embedding-matris över yrkesetiketterna.
+        encode_fn tar en lista texter och returnerar en (n, dim)-matris, t.ex. embeddings.encode_uncached.
+        """
+        if self._label_matrix is None:
+            self._label_matrix = np.asarray(encode_fn(self.occupations), dtype=np.float32)
+        return self._label_matrix
+
+    def nearest(self, query_vec, encode_fn, min_score=0.45):
+        """
+        Närmaste yrke i embedding-rummet, eller None om likheten är under min_score.
+        """
+        matrix = self.build_label_embeddings(encode_fn)
+        if matrix.shape[0] == 0:
+            return None
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return None
+        scores = matrix @ (q / norm)
+        best = int(np.argmax(scores))
+        return self.occupations[best] if scores[best] >= min_score else None
@@ -0,0 +1,98 @@
+# phrase_matcher.py
+import re
+from collections import Counter
+from text_utils import normalize_text
+
+# Normaliserad text består av ordtecken, bindestreck och mellanslag.
+# Vi delar upp den i maximala ord- och separator-sekvenser; en fras med
+# ordgränser (\b) i båda ändar matchar då exakt en följd av hela tokens.
+_TOKEN_RE = re.compile(r"\w+|[^\w]+")
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text)
+
+class PhraseMatcher:
+    """
+    Aho-Corasick-automat över tokens för många fraser samtidigt (t.ex. alla taxonomi-skills).
+    Byggs en gång; count() går igenom texten en gång och räknar varje fras-träff
+    med ordgränser, motsvarande re.search(rf"\\b{fras}\\b", text) för varje fras.
+    Med normalized=True antas fraserna redan vara normaliserade (t.ex. från taxonomi-snapshoten).
+    """
+
+    def __init__(self, phrases, normalized=False):
+        self.phrases = []
+        self._ids = {}
+        # trie: lista av dicts token -> nod, plus fail-länkar och utdata per nod
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for phrase in phrases:
+            norm = (phrase if normalized else normalize_text(phrase)).strip("- ")
+            if len(norm) < 2 or norm in self._ids:
+                continue
+            self._ids[norm] = len(self.phrases)
+            self.phrases.append(norm)
+            self._insert(tokenize(norm), self._ids[norm])
+        self._build_fail_links()
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def __contains__(self, phrase):
+        return phrase in self._ids
+
+    def _insert(self, tokens, phrase_id):
+        node = 0
+        for tok in tokens:
+            nxt = self._goto[node].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][tok] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (phrase_id,)
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for tok, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(tok, 0)
+                self._fail[child] = target if target != child else 0
+                # ärv utdata från suffixet så att kortare fraser inuti längre också räknas
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def count(self, texts, normalized=False):
+        """
+        Räknar alla frasträffar i en text eller en lista texter.
+        Returnerar Counter {normaliserad fras: antal förekomster}.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        goto, fail, out = self._goto, self._fail, self._out
+        counts = Counter()
+        for text in texts:
+            if not normalized:
+                text = normalize_text(text)
+            node = 0
+            for tok in tokenize(text):
+                while node and tok not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(tok, 0)
+                for phrase_id in out[node]:
+                    counts[phrase_id] += 1
+        return Counter({self.phrases[i]: c for i, c in counts.items()})
+
+def most_common(counts, top_k):
+    """
+    De top_k vanligaste fraserna; vid lika antal vinner längre (mer specifika) fraser.
+    """
+    return [p for p, _ in sorted(counts.items(), key=lambda kv: (-kv[1], -len(kv[0]), kv[0]))[:top_k]]
@@ -0,0 +1,136 @@
+# pipeline.py
+"""
+Sökflödet som appen kör för en sökning: hämta -> embedda -> rangordna,
+eller direkt mot det lokala annonsindexet.
+
+Rangordningen är hybrid: likheten i embedding-rummet slås ihop med BM25 över
+rubrik och beskrivning (SEARCH_FUSION=rrf eller weighted), så att exakta träffar
+på titel/kompetens inte hamnar under vagt liknande annonser. SEARCH_FUSION=semantic
+rangordnar bara efter likhet, som tidigare.
+"""
+import os
+import numpy as np
+import pandas as pd
+from fetch_jobs import get_jobs
+from embeddings import encode_texts, get_embedding
+from embedding_store import EmbeddingStore, STORE_DTYPE
+from ad_features import add_features
+from bm25_index import BM25Index
+from ranking import reciprocal_rank_fusion, weighted_fusion
+from tracing import span, count
+
+FUSION = os.environ.get("SEARCH_FUSION", "rrf")                 # rrf, weighted eller semantic
+LEXICAL_WEIGHT = float(os.environ.get("LEXICAL_WEIGHT", "1.0"))  # BM25:s vikt relativt likheten
+LOCAL_CANDIDATES = 5   # kandidater per källa i lokal sökning, i multiplar av num_jobs
+
+class SearchResult:
+    """
+    Färdigt sökresultat. df är sorterad efter den sammanslagna rangordningen (kolumnerna
+    "similarity" och "bm25" har källornas poäng) och embeddings är en EmbeddingStore (kvantiserad, se STORE_DTYPE) i samma radordning som df.
+    Resultat delas via sökcachen och ska behandlas som skrivskyddade.
+    error är satt om rangordningen misslyckades; df är då osorterad.
+    """
+
+    def __init__(self, query, df, embeddings, error=None):
+        self.query = query
+        self.df = df
+        self.embeddings = embeddings
+        self.error = error
+
+    def __len__(self):
+        return len(self.df)
+
+    def nbytes(self):
+        return int(self.df.memory_usage(deep=True).sum()) + self.embeddings.nbytes
+
+def _empty_store():
+    return EmbeddingStore(np.empty((0, 0), dtype=np.float32), STORE_DTYPE)
+
+def fuse(semantic, lexical, method=None):
+    """
+    Slår ihop (ids, scores) från embedding-sökningen och BM25 enligt method (standard FUSION).
+    Returnerar ids i sammanslagen ordning.
+    """
+    method = method or FUSION
+    if method == "rrf":
+        return reciprocal_rank_fusion([list(semantic[0]), list(lexical[0])], [1.0, LEXICAL_WEIGHT])[0]
+    if method == "weighted":
+        return weighted_fusion([semantic, lexical], [1.0, LEXICAL_WEIGHT])[0]
+    return list(semantic[0])
+
+def run_search(query, num_jobs):
+    """
+    Hämtar annonser för query från JobTech och rangordnar dem efter likhet med frågan,
+    sammanslaget med BM25 över de hämtade annonserna (se FUSION).
+    Annonsernas egenskaper (kolumnen "features") beräknas en gång här.
+    Går embedding/rankning fel returneras annonserna osorterade med felet i result.error.
+    """
+    with span("fetch"):
+        df = get_jobs(query=query, limit=num_jobs * 2)
+    if df.empty:
+        return SearchResult(query, df, _empty_store())
+    df = df.head(num_jobs).copy()
+    df["description"] = df["description"].fillna("")
+    with span("features"):
+        add_features(df)
+    try:
+        with span("embed"):
+            matrix = encode_texts(df["description"].tolist())
+            query_vec = get_embedding(query)
+        with span("rank"):
+            # rangordna och visa likheten i full precision; bara det som cachas kvantiseras
+            idx, scores = EmbeddingStore(matrix, "float32").rank(query_vec)
+            similarity = np.empty(len(df), dtype=np.float32)
+            similarity[idx] = scores
+            lexical = np.zeros(len(df), dtype=np.float32)
+            if FUSION != "semantic":
+                bm25 = BM25Index()
+                bm25.add(range(len(df)), df["title"].tolist(), df["description"].tolist())
+                lexical = bm25.scores(query)
+                hits = np.flatnonzero(lexical > 0)
+                hits = hits[np.argsort(-lexical[hits], kind="stable")]
+                idx = np.array(fuse((idx.tolist(), scores), (hits.tolist(), lexical[hits])), dtype=np.intp)
+    except Exception as e:
+        # t.ex. modellen kan inte laddas; visa annonserna ändå men dölj inte felet
+        print(f"⚠️ Rangordningen misslyckades för {query!r}: {type(e).__name__}: {e}")
+        count("rank_failures")
+        return SearchResult(query, df, _empty_store(), error=f"{type(e).__name__}: {e}")
+    df_sorted = df.iloc[idx].copy()
+    df_sorted["similarity"] = similarity[idx]
+    df_sorted["bm25"] = lexical[idx]
+    return SearchResult(query, df_sorted, EmbeddingStore(matrix[idx], STORE_DTYPE))
+
+def run_local_search(query, num_jobs, index, lexical=None):
+    """
+    Sökning direkt i det lokala annonsindexet (se ingest.py), helt offline. Med ett
+    BM25-index (lexical) slås kandidaterna från båda indexen ihop enligt FUSION.
+    """
+    with span("embed"):
+        query_vec = get_embedding(query)
+    use_lexical = lexical is not None and FUSION != "semantic"
+    candidates = num_jobs * LOCAL_CANDIDATES if use_lexical else num_jobs
+    with span("index_search"):
+        ids, scores = index.search(query_vec, k=candidates)
+    lexical_scores = {}
+    if use_lexical:
+        with span("bm25_search"):
+            lex_ids, lex_scores = lexical.search(query, k=candidates)
+        lexical_scores = dict(zip(lex_ids, lex_scores.tolist()))
+        similarity = dict(zip(ids, scores.tolist()))
+        ids = [ad_id for ad_id in fuse((ids, scores), (lex_ids, lex_scores)) if ad_id in index][:num_jobs]
+        # annonser som bara BM25 hittade saknar likhet; räkna den från vektorn
+        missing = [ad_id for ad_id in ids if ad_id not in similarity]
+        if missing:
+            q = np.asarray(query_vec, dtype=np.float32)
+            q = q / (np.linalg.norm(q) or 1.0)
+            similarity.update(zip(missing, (index.vectors_for(missing) @ q).tolist()))
+        scores = np.array([similarity[ad_id] for ad_id in ids], dtype=np.float32)
+    if not ids:
+        return SearchResult(query, pd.DataFrame([]), _empty_store())
+    df = pd.DataFrame([index.payloads.get(ad_id) or {} for ad_id in ids])
+    df.insert(0, "id", ids)
+    df["similarity"] = scores
+    df["bm25"] = np.array([lexical_scores.get(ad_id, 0.0) for ad_id in ids], dtype=np.float32)
+    df["description"] = df["description"].fillna("")
+    add_features(df)
+    return SearchResult(query, df, EmbeddingStore(index.vectors_for(ids), STORE_DTYPE))
@@ -0,0 +1,74 @@
+# ranking.py
+import numpy as np
+
+def stack_embeddings(embeddings):
+    """
+    Staplar en kolumn/lista av embedding-vektorer till en sammanhängande float32-matris.
+    """
+    if len(embeddings) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.vstack(list(embeddings)), dtype=np.float32)
+
+def rank_by_similarity(query_vec, matrix, top_k=None):
+    """
+    Rangordnar raderna i matrix efter cosinuslikhet mot query_vec.
+    Raderna antas vara L2-normaliserade (som från encode_texts); frågevektorn
+    normaliseras här, så likheten blir en enda matris-vektor-produkt.
+    Med top_k väljs de bästa raderna med argpartition i stället för full sortering.
+    Returnerar (index, scores) sorterade med högst likhet först.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+    q = np.asarray(query_vec, dtype=np.float32)
+    norm = np.linalg.norm(q)
+    if norm > 0:
+        q = q / norm
+    scores = matrix @ q
+
+    if top_k is None or top_k >= n:
+        idx = np.argsort(-scores, kind="stable")
+    else:
+        top_k = max(int(top_k), 0)
+        if top_k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+    return idx, scores[idx]
+
+RRF_K = 60
+
+def reciprocal_rank_fusion(rankings, weights=None, k=RRF_K):
+    """
+    Slår ihop flera rangordningar (listor med id:n, bäst först) med reciprocal rank
+    fusion: poäng = summa av weight / (k + rank). Ett id som saknas i en lista får
+    inget bidrag från den. Vid lika poäng behålls ordningen från den första listan.
+    Returnerar (ids, scores) sorterade med högst poäng först.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, 1):
+            fused[item] = fused.get(item, 0.0) + weight / (k + rank)
+    items = sorted(fused, key=fused.get, reverse=True)
+    return items, np.array([fused[i] for i in items], dtype=np.float32)
+
+def weighted_fusion(results, weights=None):
+    """
+    Viktad summa av min-max-normaliserade poäng. results är en lista med
+    (ids, scores) per källa; ett id som saknas i en källa får 0 från den.
+    Returnerar (ids, scores) sorterade med högst poäng först.
+    """
+    weights = weights or [1.0] * len(results)
+    fused = {}
+    for (items, scores), weight in zip(results, weights):
+        scores = np.asarray(scores, dtype=np.float32)
+        if not len(scores):
+            continue
+        low, span = scores.min(), scores.max() - scores.min()
+        normalized = (scores - low) / span if span > 0 else np.ones_like(scores)
+        for item, score in zip(items, normalized.tolist()):
+            fused[item] = fused.get(item, 0.0) + weight * score
+    items = sorted(fused, key=fused.get, reverse=True)
+    return items, np.array([fused[i] for i in items], dtype=np.float32)
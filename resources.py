@@ -0,0 +1,208 @@
+# resources.py
+"""
+Processgemensamma resurser: modell, taxonomi och index laddas en gång per process
+och delas mellan alla Streamlit-sessioner och omkörningar av app.py.
+"""
+import os
+import threading
+import time
+from embeddings import get_model, get_embedding_cache, encode_texts, encode_uncached, embedding_cache_stats, cache_name
+from load_taxonomy import load_taxonomy_snapshot
+from phrase_matcher import PhraseMatcher
+from occupation_index import OccupationIndex, EMBEDDING_FALLBACK
+from search_cache import SearchCache
+from result_store import AdStore, SessionRegistry
+from skill_embeddings import SkillEmbeddings, skill_embeddings_path, SKILL_MODE
+from ingest import open_index, open_lexical_index, INDEX_DIR
+from tracing import tracer, start_metrics_server, METRICS_PORT
+
+TAXONOMY_PATH = "ssyk-level-4-groups-with-related-skills.json"
+# Fil som skapas när uppvärmningen är klar, för t.ex. en readiness-probe (test -f ...)
+READY_FILE = os.environ.get("JOBCOACH_READY_FILE")
+SEARCH_CACHE_TTL = int(os.environ.get("SEARCH_CACHE_TTL", "600"))
+SEARCH_CACHE_MAX_BYTES = int(os.environ.get("SEARCH_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_resources = {}
+_locks = {}
+_locks_lock = threading.Lock()
+_ready = threading.Event()
+_warm_up_thread = None
+
+def _shared(name, factory):
+    """
+    Returnerar resursen name och skapar den med factory() första gången.
+    Varje resurs har sitt eget lås, så en långsam modell-laddning blockerar inte taxonomin.
+    """
+    res = _resources.get(name)
+    if res is not None:
+        return res
+    with _locks_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        res = _resources.get(name)
+        if res is None:
+            res = factory()
+            _resources[name] = res
+    return res
+
+def _taxonomy_bundle():
+    snapshot = load_taxonomy_snapshot(TAXONOMY_PATH)
+    if snapshot is None:
+        return {"snapshot": None, "taxonomy": [], "skill_set": set(), "normalized_skills": None}
+    taxonomy, skill_set = snapshot.to_taxonomy()
+    print(f"✅ Laddade {len(taxonomy)} yrken med kompetenser ({len(skill_set)} unika skills) från {TAXONOMY_PATH}")
+    return {
+        "snapshot": snapshot,
+        "taxonomy": taxonomy,
+        "skill_set": skill_set,
+        "normalized_skills": snapshot.normalized_skills_by_occupation(),
+    }
+
+def get_taxonomy():
+    """
+    (taxonomy, taxonomy_skill_set) i samma format som load_taxonomy.
+    """
+    bundle = _shared("taxonomy", _taxonomy_bundle)
+    return bundle["taxonomy"], bundle["skill_set"]
+
+def get_skill_matcher():
+    """
+    PhraseMatcher över alla normaliserade taxonomi-skills.
+    """
+    def build():
+        snapshot = _shared("taxonomy", _taxonomy_bundle)["snapshot"]
+        return PhraseMatcher(snapshot.skill_norm if snapshot else [], normalized=True)
+    return _shared("skill_matcher", build)
+
+def get_occupation_index():
+    """
+    OccupationIndex över taxonomins yrken.
+    """
+    def build():
+        bundle = _shared("taxonomy", _taxonomy_bundle)
+        return OccupationIndex(bundle["taxonomy"], bundle["normalized_skills"])
+    return _shared("occupation_index", build)
+
+def get_skill_embeddings():
+    """
+    Embeddings för alla taxonomins skill-etiketter. Beräknas en gång (kräver modellen)
+    och sparas bredvid taxonomin; laddas sedan från disk.
+    """
+    def build():
+        snapshot = _shared("taxonomy", _taxonomy_bundle)["snapshot"]
+        labels = snapshot.skill_labels if snapshot else []
+        path = skill_embeddings_path(TAXONOMY_PATH, cache_name())
+        skills = SkillEmbeddings.load(path, labels, cache_name())
+        if skills is None:
+            start = time.perf_counter()
+            skills = SkillEmbeddings.build(labels, encode_uncached)
+            skills.save(path, cache_name())
+            print(f"✅ Embeddade {len(skills)} skill-etiketter på {time.perf_counter() - start:.1f} s ({path})")
+        return skills
+    return _shared("skill_embeddings", build)
+
+def get_search_cache():
+    """
+    Sökcachen som delas av alla sessioner (färdiga, rangordnade resultat).
+    """
+    return _shared("search_cache", lambda: SearchCache(
+        ttl=SEARCH_CACHE_TTL, max_bytes=SEARCH_CACHE_MAX_BYTES, sizeof=lambda result: result.nbytes()))
+
+def get_ad_index():
+    """
+    Det lokala annonsindexet från ingest.py, eller None om inget index har byggts.
+    """
+    return _shared("ad_index", lambda: open_index(INDEX_DIR) or False) or None
+
+def get_ad_store():
+    """
+    Kolumnlagringen där alla sessioners sökresultat delar annonserna (se result_store).
+    """
+    return _shared("ad_store", AdStore)
+
+def get_session_registry():
+    """
+    Sessionernas resultat (referenser in i get_ad_store()), med eviction av inaktiva sessioner.
+    """
+    return _shared("session_registry", SessionRegistry)
+
+def get_lexical_index():
+    """
+    BM25-indexet som hör till det lokala annonsindexet, eller None om inget index har byggts.
+    """
+    return _shared("lexical_index", lambda: open_lexical_index(INDEX_DIR, get_ad_index(), save=True) or False) or None
+
+def start_metrics():
+    """
+    Registrerar cachernas räknare hos tracern (en gång per process) och startar
+    Prometheus-endpointen /metrics om JOBCOACH_METRICS_PORT är satt.
+    """
+    def build():
+        tracer.add_collector("embedding_cache", embedding_cache_stats, counters=("hits", "misses"))
+        tracer.add_collector("search_cache", lambda: get_search_cache().stats(),
+                             counters=("hits", "misses", "coalesced"))
+        tracer.add_collector("ad_store", lambda: get_ad_store().stats())
+        tracer.add_collector("sessions", lambda: get_session_registry().stats(), counters=("evicted",))
+        if METRICS_PORT:
+            server = start_metrics_server(METRICS_PORT)
+            print(f"📈 Prometheus-mätvärden på http://localhost:{METRICS_PORT}/metrics")
+            return server
+        return True
+    return _shared("metrics", build)
+
+def warm_up(load_model=True):
+    """
+    Laddar allt som en förfrågan behöver: taxonomi, index (ett inaktuellt BM25-index byggs
+    om och sparas här, inte i första sökningen) och (valfritt) modell + cache.
+    Modellen körs en gång så att första riktiga sökningen inte betalar uppstartskostnaden,
+    och yrkes-embeddings förberäknas. Markerar processen som redo när allt är klart.
+    """
+    start = time.perf_counter()
+    get_taxonomy()
+    get_skill_matcher()
+    occupation_index = get_occupation_index()
+    get_ad_index()
+    get_lexical_index()
+    if load_model:
+        get_model()
+        get_embedding_cache()
+        encode_texts(["uppvärmning"], use_cache=False)
+        if EMBEDDING_FALLBACK:
+            occupation_index.build_label_embeddings(encode_uncached)
+        if SKILL_MODE == "semantic":
+            get_skill_embeddings()
+    _ready.set()
+    if READY_FILE:
+        with open(READY_FILE, "w", encoding="utf-8") as f:
+            f.write("ready\n")
+    print(f"✅ Resurser uppvärmda på {time.perf_counter() - start:.1f} s")
+
+def _warm_up_in_background(load_model):
+    try:
+        warm_up(load_model)
+    except Exception as e:
+        print(f"❌ Uppvärmningen misslyckades: {e}")
+
+def start_warm_up(load_model=True):
+    """
+    Startar warm_up i en bakgrundstråd (en gång per process) så att appen kan
+    rita sidan direkt medan modellen laddas.
+    """
+    global _warm_up_thread
+    with _locks_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up_in_background, args=(load_model,), name="warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+def is_ready():
+    """
+    True när warm_up har körts klart i den här processen.
+    """
+    return _ready.is_set()
+
+if __name__ == "__main__":
+    # Förladda (och ladda ner) modell, taxonomi-snapshot och embedding-cache, t.ex. i en image-build
+    warm_up()
+
+# python resources.py
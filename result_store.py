@@ -0,0 +1,249 @@
+# result_store.py
+"""
+Sökresultat som delas av alla sessioner i processen, lagrade kolumnvis.
+
+Varje annons lagras en gång (internerad på annons-ID, annars URL eller innehåll)
+i NumPy-kolumner i AdStore. En session håller bara en ResultView: radnummer in i
+lagringen plus sina egna poäng i resultatets ordning. Annonser som ingen vy längre
+pekar på frigörs och deras rader återanvänds.
+
+SessionRegistry håller sessionernas vyer och släpper dem för sessioner som varit
+inaktiva längre än SESSION_IDLE_SECONDS. Chatthistoriken kapas med trim_history.
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+from ad_features import extract_features
+
+AD_COLUMNS = ["title", "company", "city", "description", "url"]
+INTERNED_COLUMNS = ("company", "city")   # få unika värden, delas som samma str-objekt
+SESSION_IDLE_SECONDS = int(os.environ.get("SESSION_IDLE_SECONDS", "1800"))
+MAX_CHAT_HISTORY = int(os.environ.get("MAX_CHAT_HISTORY", "50"))
+
+def ad_keys(df):
+    """
+    Nyckel per rad: annonsens id, annars dess URL, annars en hash av innehållet.
+    """
+    n = len(df)
+    ids = df["id"].tolist() if "id" in df.columns else [None] * n
+    urls = df["url"].tolist() if "url" in df.columns else [None] * n
+    content = zip(*(df[c].tolist() if c in df.columns else [""] * n for c in AD_COLUMNS))
+    keys = []
+    for ad_id, url, values in zip(ids, urls, content):
+        if ad_id:
+            keys.append(f"id:{ad_id}")
+        elif isinstance(url, str) and url not in ("", "#"):
+            keys.append(f"url:{url}")
+        else:
+            keys.append("sha1:" + hashlib.sha1("\x00".join(map(str, values)).encode("utf-8")).hexdigest())
+    return keys
+
+class AdStore:
+    """
+    Kolumnlagrade annonser med referensräkning per rad.
+    """
+
+    def __init__(self):
+        self._columns = {c: np.empty(0, dtype=object) for c in AD_COLUMNS}
+        self._features = np.zeros(0, dtype=np.uint16)
+        self._refs = np.zeros(0, dtype=np.int32)
+        self._keys = []        # rad -> nyckel (None = ledig rad)
+        self._row = {}         # nyckel -> rad
+        self._free = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._row)
+
+    def _grow(self, extra):
+        cap = len(self._refs)
+        need = len(self._keys) + extra
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2, 1024)
+        for c, col in self._columns.items():
+            grown = np.empty(new_cap, dtype=object)
+            grown[:cap] = col
+            self._columns[c] = grown
+        self._features = np.concatenate([self._features, np.zeros(new_cap - cap, dtype=np.uint16)])
+        self._refs = np.concatenate([self._refs, np.zeros(new_cap - cap, dtype=np.int32)])
+
+    def _allocate(self, key):
+        if self._free:
+            row = self._free.pop()
+            self._keys[row] = key
+        else:
+            row = len(self._keys)
+            self._keys.append(key)
+        self._row[key] = row
+        return row
+
+    def intern(self, df):
+        """
+        Lägger in df:s annonser (redan lagrade återanvänds) och returnerar deras radnummer.
+        Varje returnerad rad får en referens som släpps med release().
+        """
+        keys = ad_keys(df)
+        values = {c: df[c].tolist() if c in df.columns else [""] * len(df) for c in AD_COLUMNS}
+        if "features" in df.columns:
+            features = df["features"].to_numpy()
+        else:
+            features = extract_features([v if isinstance(v, str) else "" for v in values["description"]])
+        rows = np.empty(len(keys), dtype=np.int32)
+        with self._lock:
+            self._grow(sum(1 for k in set(keys) if k not in self._row))
+            for i, key in enumerate(keys):
+                row = self._row.get(key)
+                if row is None:
+                    row = self._allocate(key)
+                    for c in AD_COLUMNS:
+                        v = values[c][i]
+                        self._columns[c][row] = sys.intern(v) if c in INTERNED_COLUMNS and isinstance(v, str) else v
+                    self._features[row] = features[i]
+                rows[i] = row
+            np.add.at(self._refs, rows, 1)
+        return rows
+
+    def release(self, rows):
+        """
+        Släpper en referens per rad; rader utan referenser frigörs.
+        """
+        with self._lock:
+            np.subtract.at(self._refs, rows, 1)
+            for row in np.unique(rows[self._refs[rows] <= 0]).tolist():
+                del self._row[self._keys[row]]
+                self._keys[row] = None
+                for col in self._columns.values():
+                    col[row] = None
+                self._refs[row] = 0
+                self._free.append(row)
+
+    def frame(self, rows):
+        """
+        DataFrame med annonserna på rows (i den ordningen). Strängarna delas med lagringen.
+        """
+        with self._lock:
+            data = {c: self._columns[c][rows] for c in AD_COLUMNS}
+            data["features"] = self._features[rows]
+        return pd.DataFrame(data)
+
+    def view(self, df, score_columns=("similarity", "bm25")):
+        """
+        ResultView för ett rangordnat resultat; poängkolumnerna hör till vyn.
+        """
+        scores = {c: df[c].to_numpy(dtype=np.float32) for c in score_columns if c in df.columns}
+        return ResultView(self, self.intern(df), scores)
+
+    def nbytes(self):
+        """
+        Ungefärligt minne för lagrade annonser (kolumnerna och deras strängar).
+        """
+        with self._lock:
+            strings = sum(sys.getsizeof(v) for c in AD_COLUMNS if c not in INTERNED_COLUMNS
+                          for v in self._columns[c][:len(self._keys)] if v is not None)
+            arrays = sum(col.nbytes for col in self._columns.values()) + self._features.nbytes + self._refs.nbytes
+        return strings + arrays
+
+    def stats(self):
+        return {"ads": len(self), "rows": len(self._keys), "free_rows": len(self._free)}
+
+class ResultView:
+    """
+    En sessions resultat: rader i en AdStore och egna poängkolumner i samma ordning.
+    Referenserna släpps med release() eller när vyn skräpsamlas.
+    """
+
+    def __init__(self, store, rows, scores=None):
+        self.store = store
+        self.rows = rows
+        self.scores = scores or {}
+        self._finalizer = weakref.finalize(self, store.release, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def released(self):
+        return not self._finalizer.alive
+
+    def release(self):
+        self._finalizer()
+
+    def frame(self):
+        df = self.store.frame(self.rows)
+        for c, values in self.scores.items():
+            df[c] = values
+        return df
+
+    def nbytes(self):
+        return self.rows.nbytes + sum(v.nbytes for v in self.scores.values())
+
+class SessionRegistry:
+    """
+    Sessions-ID -> ResultView, med eviction av sessioner som varit inaktiva för länge.
+    """
+
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS, clock=time.monotonic):
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self.evicted = 0
+        self._sessions = {}    # sessions-ID -> [senast använd, vy]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def set(self, session_id, view):
+        """
+        Sparar sessionens nya resultat; ett tidigare resultat släpps.
+        """
+        self.evict_idle()
+        with self._lock:
+            old = self._sessions.get(session_id)
+            self._sessions[session_id] = [self.clock(), view]
+        if old is not None and old[1] is not view:
+            old[1].release()
+
+    def get(self, session_id):
+        """
+        Sessionens resultat, eller None om det saknas eller har släppts efter inaktivitet.
+        """
+        self.evict_idle()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            entry[0] = self.clock()
+            return entry[1]
+
+    def evict_idle(self):
+        """
+        Släpper resultaten för sessioner som inte använts på idle_seconds. Returnerar antal.
+        """
+        limit = self.clock() - self.idle_seconds
+        with self._lock:
+            idle = [sid for sid, (seen, _) in self._sessions.items() if seen < limit]
+            views = [self._sessions.pop(sid)[1] for sid in idle]
+            self.evicted += len(views)
+        for view in views:
+            view.release()
+        return len(views)
+
+    def stats(self):
+        with self._lock:
+            views = [view for _, view in self._sessions.values()]
+        return {"sessions": len(views), "evicted": self.evicted,
+                "result_rows": sum(len(v) for v in views), "view_bytes": sum(v.nbytes() for v in views)}
+
+def trim_history(history, max_messages=MAX_CHAT_HISTORY):
+    """
+    Kapar en chatthistorik (lista) på plats till de senaste max_messages meddelandena.
+    """
+    if len(history) > max_messages:
+        del history[:len(history) - max_messages]
+    return history
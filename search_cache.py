@@ -0,0 +1,108 @@
+# search_cache.py
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from text_utils import normalize_text
+
+def search_key(query, limit):
+    """
+    Cachenyckel för en sökning: normaliserad fråga + antal annonser.
+    """
+    return normalize_text(query), int(limit)
+
+class SearchCache:
+    """
+    Processgemensam cache för färdiga sökresultat (hämtade, embeddade och rangordnade).
+      - ttl: sekunder innan ett resultat anses för gammalt
+      - max_entries / max_bytes: LRU-eviction när någon av gränserna överskrids
+      - samtidiga identiska sökningar delar på en beräkning (request coalescing)
+    Cachade värden delas mellan sessioner och får inte ändras av anroparen.
+    """
+
+    def __init__(self, ttl=600, max_entries=256, max_bytes=256 * 1024 * 1024, sizeof=sys.getsizeof):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._inflight = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute, cache_if=None):
+        """
+        Returnerar det cachade värdet för key, eller kör compute() en gång och cachar svaret.
+        Pågår redan en beräkning för samma nyckel väntar anroparen på den i stället.
+        cache_if(value) kan användas för att inte cacha t.ex. tomma svar.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._remove(key)
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if cache_if is None or cache_if(value):
+                self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+            "size": len(self._entries),
+            "bytes": self._bytes,
+        }
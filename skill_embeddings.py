@@ -0,0 +1,148 @@
+# skill_embeddings.py
+"""
+Semantisk kompetensextraktion: alla skill-etiketter i taxonomin embeddas en gång och
+sparas som en matris. Annonserna delas upp i meningar som embeddas i batchar, och
+likheten mot alla skills räknas med en matrismultiplikation per block av meningar.
+Hittar omskrivningar som den exakta frasmatchningen missar.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import numpy as np
+
+SKILL_MODE = os.environ.get("SKILL_EXTRACTION", "exact")   # exact eller semantic
+MIN_SCORE = float(os.environ.get("SKILL_MIN_SCORE", "0.5"))
+BLOCK_SENTENCES = 1024        # meningar per matrismultiplikation
+MAX_SENTENCES_PER_AD = 64
+MIN_SENTENCE_CHARS = 12
+
+# meningsslut, radbrytningar och punktlistor
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;:])\s+|[\r\n]+|\s[•·▪*–-]\s|^[•·▪*–-]\s")
+
+def split_sentences(text, max_sentences=MAX_SENTENCES_PER_AD, min_chars=MIN_SENTENCE_CHARS):
+    """
+    Delar en annonstext i meningar/listpunkter; för korta fragment hoppas över.
+    """
+    if not isinstance(text, str):
+        return []
+    parts = (p.strip(" \t•·▪*–-") for p in _SENTENCE_BREAK.split(text))
+    return [p for p in parts if len(p) >= min_chars][:max_sentences]
+
+def skill_embeddings_path(json_path, model_name):
+    """
+    Matrisen sparas bredvid taxonomin, en fil per modell: foo.json -> foo.skills.<modell>.npz
+    """
+    base, _ = os.path.splitext(json_path)
+    slug = re.sub(r"[^\w\-]+", "_", model_name)
+    return f"{base}.skills.{slug}.npz"
+
+def _labels_sha1(labels):
+    return hashlib.sha1("\x00".join(labels).encode("utf-8")).hexdigest()
+
+class SkillEmbeddings:
+    """
+    labels[i] har embedding matrix[i] (L2-normaliserad float32).
+    """
+
+    def __init__(self, labels, matrix):
+        self.labels = list(labels)
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._column = {label: i for i, label in enumerate(self.labels)}
+
+    def __len__(self):
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, labels, encode_fn):
+        """
+        encode_fn tar en lista texter och returnerar en (n, dim)-matris, t.ex. embeddings.encode_uncached.
+        """
+        labels = list(labels)
+        return cls(labels, encode_fn(labels) if labels else np.empty((0, 0), dtype=np.float32))
+
+    def save(self, path, model_name):
+        """
+        Skriver matrisen atomärt via en egen temporärfil i samma katalog, så att två
+        processer som sparar samtidigt inte skriver i samma fil.
+        """
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".skills-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, matrix=self.matrix, model_name=np.array(model_name),
+                         labels_sha1=np.array(_labels_sha1(self.labels)))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, labels, model_name):
+        """
+        Läser en sparad matris, eller None om den saknas eller gäller andra etiketter/annan modell.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if str(data["model_name"]) != model_name or str(data["labels_sha1"]) != _labels_sha1(labels):
+                return None
+            return cls(labels, data["matrix"])
+
+    def columns(self, labels):
+        """
+        Kolumnindex för de etiketter som finns i matrisen (t.ex. ett yrkes skills).
+        """
+        return np.array([self._column[l] for l in labels if l in self._column], dtype=np.intp)
+
+    def ad_scores(self, descriptions, encode_fn, columns=None, block_sentences=BLOCK_SENTENCES):
+        """
+        (n_ads, n_skills)-matris: för varje annons och skill den högsta likheten mellan
+        skillen och någon av annonsens meningar. Annonser utan meningar får -1.
+        """
+        skills = self.matrix if columns is None else self.matrix[columns]
+        sentences, owner = [], []
+        for i, text in enumerate(descriptions):
+            parts = split_sentences(text)
+            sentences += parts
+            owner += [i] * len(parts)
+        out = np.full((len(descriptions), len(skills)), -1.0, dtype=np.float32)
+        if not sentences or not len(skills):
+            return out
+        vectors = np.asarray(encode_fn(sentences), dtype=np.float32)
+        owner = np.asarray(owner, dtype=np.intp)
+        # meningarna ligger i annonsordning: max per annons i ett block är en reduceat över
+        # blockets rader, och en annons som delas mellan två block slås ihop med np.maximum
+        for start in range(0, len(sentences), block_sentences):
+            stop = min(start + block_sentences, len(sentences))
+            ads, first = np.unique(owner[start:stop], return_index=True)
+            sims = vectors[start:stop] @ skills.T
+            out[ads] = np.maximum(out[ads], np.maximum.reduceat(sims, first, axis=0))
+        return out
+
+    def top_skills_per_ad(self, descriptions, encode_fn, top_k=5, min_score=MIN_SCORE, columns=None):
+        """
+        Per annons: lista med (etikett, likhet), bäst först, högst top_k och minst min_score.
+        """
+        scores = self.ad_scores(descriptions, encode_fn, columns)
+        labels = self.labels if columns is None else [self.labels[c] for c in columns]
+        result = []
+        for row in scores:
+            k = min(top_k, len(row))
+            top = np.argpartition(-row, k - 1)[:k] if k else np.empty(0, dtype=np.intp)
+            top = top[np.argsort(-row[top], kind="stable")]
+            result.append([(labels[j], float(row[j])) for j in top if row[j] >= min_score])
+        return result
+
+    def top_skills(self, descriptions, encode_fn, top_k=7, min_score=MIN_SCORE, columns=None):
+        """
+        För ett helt resultat: skills sorterade efter i hur många annonser de når min_score,
+        därefter summerad likhet. Returnerar en lista med (etikett, antal annonser, summa).
+        """
+        scores = self.ad_scores(descriptions, encode_fn, columns)
+        labels = self.labels if columns is None else [self.labels[c] for c in columns]
+        hits = scores >= min_score
+        n_ads = hits.sum(axis=0)
+        total = np.where(hits, scores, 0.0).sum(axis=0)
+        order = np.lexsort((-total, -n_ads))
+        return [(labels[j], int(n_ads[j]), float(total[j])) for j in order[:top_k] if n_ads[j] > 0]
@@ -0,0 +1,116 @@
+# skills.py
+"""
+Kompetenssvar: koppla en fråga till ett yrke i taxonomin och hitta de kompetenser
+som faktiskt nämns i annonserna. Använder de processgemensamma indexen i resources.
+"""
+from embeddings import get_embedding, encode_uncached
+from resources import get_skill_matcher, get_occupation_index, get_skill_embeddings
+from skill_embeddings import SKILL_MODE
+from occupation_index import EMBEDDING_FALLBACK
+from text_utils import normalize_text
+from phrase_matcher import PhraseMatcher, most_common
+from tracing import span
+
+def find_best_occupation_from_query_or_titles(query, df, use_embeddings=None):
+    """
+    Försök matcha en yrkesetikett från taxonomin:
+    1) kolla query text (etiketterna matchas på hela ord, inte som delsträngar)
+    2) om inget: titta på titlar i annonsdata och räkna träffar per occupation
+    3) om inget och use_embeddings: närmaste yrkesetikett i embedding-rummet.
+       Bara meningsfullt för sökfrågor, inte fria chattfrågor; standard är
+       OCCUPATION_EMBEDDING_FALLBACK (av).
+    Returnerar occupation-lower eller None
+    """
+    if use_embeddings is None:
+        use_embeddings = EMBEDDING_FALLBACK
+    # 1) matcha direkt i query
+    occupation_index = get_occupation_index()
+    occ = occupation_index.match_query(query)
+    if occ:
+        return occ
+
+    # 2) matcha genom titlar i df (räkna)
+    if df is not None and not df.empty:
+        occ = occupation_index.match_titles(df["title"].fillna(""))
+        if occ:
+            return occ
+
+    # 3) semantisk fallback mot förberäknade yrkes-embeddings
+    if use_embeddings and query:
+        return occupation_index.nearest(get_embedding(query), encode_uncached)
+    return None
+
+def extract_skills_present_in_descriptions(skills_candidates, descriptions, top_k=7):
+    """
+    Givet en lista skills_candidates (lowercase phrases) och annonsbeskrivningar,
+    returnera de skills som faktiskt förekommer i texten, sorterade efter frekvens.
+    """
+    if not skills_candidates:
+        return []
+    candidates = {normalize_text(sk).strip("- ") for sk in skills_candidates}
+    candidates = {sk for sk in candidates if len(sk) >= 2}
+    if not candidates:
+        return []
+    skill_matcher = get_skill_matcher()
+    # taxonomi-skills finns redan i den förbyggda automaten; annars bygg en liten för kandidaterna
+    matcher = skill_matcher if all(sk in skill_matcher for sk in candidates) else PhraseMatcher(candidates)
+    counts = matcher.count([s for s in descriptions if isinstance(s, str)])
+    found = {sk: c for sk, c in counts.items() if sk in candidates}
+    return most_common(found, top_k)
+
+def semantic_skills(descriptions, top_k=7, candidates=None):
+    """
+    Skills vars etikett liknar meningar i annonserna (embeddings i stället för exakt
+    textmatchning), ev. begränsat till candidates (t.ex. ett yrkes skills).
+    Returnerar normaliserade etiketter, vanligast först.
+    """
+    skill_embeddings = get_skill_embeddings()
+    columns = skill_embeddings.columns(candidates) if candidates is not None else None
+    if columns is not None and not len(columns):
+        return []
+    ranked = skill_embeddings.top_skills(descriptions, encode_uncached, top_k=top_k, columns=columns)
+    return [normalize_text(label) for label, _, _ in ranked]
+
+_NOT_GIVEN = object()
+
+def get_skills_for_user_query(query, df, top_k=7, mode=None, use_embeddings=False, occ=_NOT_GIVEN):
+    """
+    Huvudfunktion för kompetenssvar:
+    - försök koppla frågan till ett yrke
+    - om yrke hittas: hämta skills från taxonomy för det yrket
+      - returnera de av dessa skills som faktiskt syns i annonsbeskrivningar (upp till top_k)
+      - om inga av dem syns, returnera top_k skills från taxonomy för detta yrke (som generella tips)
+    - om inget yrke hittas: försök hitta vanliga skills i beskrivningarna genom att matcha hela taxonomy_skill_set
+    mode "exact" matchar etiketterna som text, "semantic" jämför embeddings (se skill_embeddings);
+    standard är SKILL_EXTRACTION.
+    use_embeddings slår på närmaste-yrke-fallbacken (se find_best_occupation_from_query_or_titles);
+    av som standard eftersom query ofta är en chattfråga.
+    occ är ett redan uppslaget yrke (eller None om inget hittades), så att anroparen
+    slipper slå upp det två gånger.
+    """
+    semantic = (mode or SKILL_MODE) == "semantic"
+    occupation_index = get_occupation_index()
+    if occ is _NOT_GIVEN:
+        with span("taxonomy_match"):
+            occ = find_best_occupation_from_query_or_titles(query, df, use_embeddings=use_embeddings)
+    descriptions = df["description"].fillna("").tolist() if df is not None else []
+    if occ:
+        skills_for_occ = occupation_index.skills_for(occ)
+        # prefer those present in descriptions
+        with span("skill_extraction"):
+            if semantic:
+                present = semantic_skills(descriptions, top_k, candidates=skills_for_occ)
+            else:
+                present = extract_skills_present_in_descriptions(
+                    occupation_index.normalized_skills[occ], descriptions, top_k=top_k)
+        if present:
+            return present
+        # otherwise return first top_k skills from taxonomy for this occupation
+        return skills_for_occ[:top_k] if skills_for_occ else ["Ingen specifik kompetens hittades"]
+    # fallback: räkna alla taxonomy-skills som förekommer i descriptions i en enda genomgång
+    with span("skill_extraction"):
+        if semantic:
+            hits = semantic_skills(descriptions, top_k)
+        else:
+            hits = most_common(get_skill_matcher().count(descriptions), top_k)
+    return hits if hits else ["Ingen specifik kompetens hittades"]
@@ -0,0 +1,171 @@
+# taxonomy_snapshot.py
+import hashlib
+import os
+import tempfile
+import numpy as np
+from text_utils import normalize_text
+
+SNAPSHOT_VERSION = 1
+_SEP = "\x00"
+
+def snapshot_path_for(json_path):
+    """
+    Snapshot-filen ligger bredvid källfilen: foo.json -> foo.snapshot.npz
+    """
+    base, _ = os.path.splitext(json_path)
+    return base + ".snapshot.npz"
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _pack(labels):
+    return np.frombuffer(_SEP.join(labels).encode("utf-8"), dtype=np.uint8)
+
+def _unpack(blob):
+    if blob.size == 0:
+        return []
+    return blob.tobytes().decode("utf-8").split(_SEP)
+
+class TaxonomySnapshot:
+    """
+    Kompakt binär form av SSYK-taxonomin:
+      - skill_labels / skill_norm : internerade skills (skill-ID = position), råa och normaliserade
+      - occupations / occupation_norm : yrkesetiketter, råa och normaliserade
+      - indptr, indices : CSR-matris yrke -> skill-ID
+    """
+
+    def __init__(self, occupations, occupation_norm, skill_labels, skill_norm, indptr, indices):
+        self.occupations = occupations
+        self.occupation_norm = occupation_norm
+        self.skill_labels = skill_labels
+        self.skill_norm = skill_norm
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy):
+        skill_ids = {}
+        indptr = [0]
+        indices = []
+        for entry in taxonomy:
+            for sk in entry["skills"]:
+                indices.append(skill_ids.setdefault(sk, len(skill_ids)))
+            indptr.append(len(indices))
+        skill_labels = list(skill_ids)
+        occupations = [entry["occupation"] for entry in taxonomy]
+        return cls(
+            occupations,
+            [normalize_text(o) for o in occupations],
+            skill_labels,
+            [normalize_text(sk) for sk in skill_labels],
+            np.asarray(indptr, dtype=np.int32),
+            np.asarray(indices, dtype=np.int32),
+        )
+
+    def skill_ids_for(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def to_taxonomy(self):
+        """
+        Samma format som load_taxonomy: (lista av {occupation, skills[]}, set av skills).
+        """
+        labels = self.skill_labels
+        taxonomy = [
+            {"occupation": occ, "skills": [labels[j] for j in self.skill_ids_for(i).tolist()]}
+            for i, occ in enumerate(self.occupations)
+        ]
+        return taxonomy, set(labels)
+
+    def normalized_skills_by_occupation(self):
+        norm = self.skill_norm
+        return {occ: [norm[j] for j in self.skill_ids_for(i).tolist()]
+                for i, occ in enumerate(self.occupations)}
+
+    def save(self, path, source_path, source_sha1=None):
+        """
+        Skriver snapshoten atomärt (via en egen temporärfil i samma katalog) med
+        källfilens storlek, mtime och SHA-1 (source_sha1 om den redan är beräknad).
+        """
+        stat = os.stat(source_path)
+        source_sha1 = source_sha1 or file_sha1(source_path)
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), prefix=".snapshot-",
+                                         suffix=".npz", delete=False) as f:
+            tmp = f.name
+            try:
+                np.savez(
+                    f,
+                    version=np.int32(SNAPSHOT_VERSION),
+                    source_size=np.int64(stat.st_size),
+                    source_mtime_ns=np.int64(stat.st_mtime_ns),
+                    source_sha1=np.frombuffer(bytes.fromhex(source_sha1), dtype=np.uint8),
+                    occupations=_pack(self.occupations),
+                    occupation_norm=_pack(self.occupation_norm),
+                    skill_labels=_pack(self.skill_labels),
+                    skill_norm=_pack(self.skill_norm),
+                    indptr=self.indptr,
+                    indices=self.indices,
+                )
+            except BaseException:
+                f.close()
+                os.remove(tmp)
+                raise
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, source_path=None):
+        """
+        Läser en snapshot. Med source_path returneras None om snapshoten är inaktuell
+        (annan version, eller källfilen har ändrats: storlek/mtime skiljer och hashen skiljer).
+        Har bara storlek/mtime ändrats (t.ex. efter en ny checkout) sparas de nya värdena,
+        så att nästa start slipper hasha källfilen igen.
+        """
+        if not os.path.exists(path):
+            return None
+        touched_sha1 = None
+        with np.load(path) as data:
+            if int(data["version"]) != SNAPSHOT_VERSION:
+                return None
+            if source_path is not None:
+                stat = os.stat(source_path)
+                same_stat = (int(data["source_size"]) == stat.st_size
+                             and int(data["source_mtime_ns"]) == stat.st_mtime_ns)
+                if not same_stat:
+                    touched_sha1 = data["source_sha1"].tobytes().hex()
+                    if touched_sha1 != file_sha1(source_path):
+                        return None
+            snapshot = cls(
+                _unpack(data["occupations"]),
+                _unpack(data["occupation_norm"]),
+                _unpack(data["skill_labels"]),
+                _unpack(data["skill_norm"]),
+                data["indptr"],
+                data["indices"],
+            )
+        if touched_sha1 is not None:
+            try:
+                snapshot.save(path, source_path, touched_sha1)
+            except OSError as e:
+                print(f"⚠️ Kunde inte uppdatera {path}: {e}")
+        return snapshot
+
+def compile_snapshot(json_path, out_path=None):
+    """
+    Kompilerar JSON-taxonomin till en binär snapshot och returnerar den.
+    """
+    from load_taxonomy import parse_taxonomy_file
+    taxonomy, _ = parse_taxonomy_file(json_path)
+    snapshot = TaxonomySnapshot.from_taxonomy(taxonomy)
+    snapshot.save(out_path or snapshot_path_for(json_path), json_path)
+    return snapshot
+
+if __name__ == "__main__":
+    import sys
+    src = sys.argv[1] if len(sys.argv) > 1 else "ssyk-level-4-groups-with-related-skills.json"
+    snap = compile_snapshot(src)
+    print(f"✅ Skrev {snapshot_path_for(src)}: {len(snap.occupations)} yrken, {len(snap.skill_labels)} skills")
+
+# python taxonomy_snapshot.py
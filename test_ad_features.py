@@ -0,0 +1,31 @@
+# test_ad_features.py
+import pandas as pd
+from ad_features import AdFeature, EMPLOYMENT_TYPES, add_features, has_any, remote_mask, onsite_mask
+
+TEXTS = [
+    "Arbetet sker på distans. Heltid, tillsvidare.",
+    "Vi erbjuder distansutbildning, men jobbet är på plats. Deltid.",
+    "Hybrid upplägg. B-körkort krävs. Du talar svenska och engelska.",
+    "Krav: gymnasieutbildning. Meriterande med examen från högskola.",
+    "Du har gymnasie examen. Timanställning och vikariat.",
+    None,
+]
+
+def old_contains(df, pattern):
+    return df["description"].str.contains(pattern, case=False, na=False).to_numpy()
+
+def test_masks_match_old_regex_scans():
+    df = add_features(pd.DataFrame({"description": TEXTS}))
+    remote = old_contains(df, r"\b(?:distans|remote|hemifrån|fjärr)\b")
+    assert (remote_mask(df) == (remote & ~old_contains(df, r"distansutbildning|distanskurs"))).all()
+    assert (onsite_mask(df) == ~remote).all()
+    assert (has_any(df, AdFeature.GYMNASIE) == old_contains(df, r"\bgymnasie\b")).all()
+    assert (has_any(df, AdFeature.UNIVERSITET) == old_contains(df, r"\b(?:universitet|högskola|högre utbildning)\b")).all()
+    for word, flag in EMPLOYMENT_TYPES.items():
+        assert (has_any(df, flag) == old_contains(df, word)).all(), word
+
+def test_bitmask_per_ad():
+    df = add_features(pd.DataFrame({"description": TEXTS}))
+    assert df["features"].iloc[2] == AdFeature.HYBRID | AdFeature.KORKORT | AdFeature.SVENSKA | AdFeature.ENGELSKA
+    assert df["features"].iloc[5] == 0
+    assert has_any(df, AdFeature.TIMANSTALLNING | AdFeature.DELTID).tolist() == [False, True, False, False, True, False]
@@ -0,0 +1,59 @@
+# test_batch.py
+import json
+import pandas as pd
+from ad_features import add_features
+from batch import load_ads, analyze_ads, analyze_query
+
+ADS = [
+    {"title": "Förskollärare", "company": "A", "city": "Malmö", "description": "Distans ej möjligt. Förskollärarlegitimation krävs.", "url": "u1"},
+    {"title": "Förskollärare", "company": "B", "city": "Malmö", "description": "Hybrid, två dagar hemifrån.", "url": "u2"},
+    {"title": "Barnskötare", "company": "C", "city": "Lund", "description": "Heltid.", "url": "u3"},
+]
+
+def test_load_ads_formats(tmp_path):
+    flat = tmp_path / "ads.jsonl"
+    flat.write_text("\n".join(json.dumps(a, ensure_ascii=False) for a in ADS) + "\n", encoding="utf-8")
+    assert load_ads(str(flat))["title"].tolist() == ["Förskollärare", "Förskollärare", "Barnskötare"]
+
+    df = load_ads("testdata/jobtech_search.json")
+    assert list(df.columns) == ["title", "company", "city", "description", "url"]
+    assert len(df) == 40
+
+def test_analyze_ads_report():
+    df = add_features(pd.DataFrame(ADS))
+    report = analyze_ads("Förskollärare", df, top_k=3)
+    assert report["n_ads"] == 3
+    assert report["top_cities"] == [["Malmö", 2], ["Lund", 1]]
+    assert report["remote_share"] == round(2 / 3, 4)
+    assert report["hybrid_share"] == round(1 / 3, 4)
+    assert report["occupation"] == "förskollärare"
+    assert "förskollärarlegitimation" in report["skills"]
+    assert [ad["url"] for ad in report["ads"]] == ["u1", "u2", "u3"]
+    json.dumps(report, ensure_ascii=False)
+
+def test_analyze_ads_empty():
+    assert analyze_ads("x", pd.DataFrame()) == {"query": "x", "n_ads": 0}
+
+def test_analyze_ads_looks_up_occupation_once(monkeypatch):
+    import batch
+    import skills
+    calls = []
+    real = skills.find_best_occupation_from_query_or_titles
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return real(*args, **kwargs)
+    monkeypatch.setattr(batch, "find_best_occupation_from_query_or_titles", counting)
+    monkeypatch.setattr(skills, "find_best_occupation_from_query_or_titles", counting)
+    report = analyze_ads("Förskollärare", add_features(pd.DataFrame(ADS)), top_k=3)
+    assert calls == ["Förskollärare"]
+    assert "förskollärarlegitimation" in report["skills"]
+
+def test_analyze_query_reports_ranking_failure(monkeypatch):
+    import batch
+    from pipeline import SearchResult
+    unranked = add_features(pd.DataFrame(ADS))
+    monkeypatch.setattr(batch, "run_search", lambda q, n: SearchResult(q, unranked, None, error="OSError: ingen modell"))
+    report = analyze_query("Systemutvecklare")
+    assert report["error"] == "RuntimeError: rangordningen misslyckades: OSError: ingen modell"
+    assert "occupation" not in report and "ads" not in report
@@ -0,0 +1,31 @@
+# test_bench_load.py
+from bench_load import compare
+
+def report(sessions_per_s, search_p95, rank_p50, peak_rss=500.0):
+    return {"sessions_per_s": sessions_per_s, "searches_per_s": sessions_per_s, "peak_rss_mb": peak_rss,
+            "stages": {"search": {"p50_ms": 50.0, "p95_ms": search_p95, "p99_ms": 120.0}},
+            "spans": [{"span": "rank", "p50_ms": rank_p50, "p95_ms": 2.0}]}
+
+def regressions(rows):
+    return {name for name, _, _, _, regression in rows if regression}
+
+def test_compare_flags_changes_beyond_threshold():
+    base = report(10.0, 100.0, 1.0)
+    assert regressions(compare(base, base)) == set()
+    # latens +20 % och genomströmning -20 % är regressioner, förbättringar är det inte
+    worse = report(8.0, 120.0, 1.05, peak_rss=400.0)
+    assert regressions(compare(base, worse)) == {"sessions_per_s", "searches_per_s", "search.p95_ms"}
+    assert regressions(compare(worse, base)) == {"peak_rss_mb"}
+
+def test_compare_threshold_and_spans():
+    base, slower = report(10.0, 100.0, 1.0), report(10.0, 105.0, 1.5)
+    rows = {name: (before, after, change) for name, before, after, change, _ in compare(base, slower)}
+    assert rows["search.p95_ms"] == (100.0, 105.0, 0.05)
+    assert regressions(compare(base, slower)) == {"span.rank.p50_ms"}
+    assert regressions(compare(base, slower, threshold=0.01)) == {"search.p95_ms", "span.rank.p50_ms"}
+    assert regressions(compare(base, slower, threshold=0.60)) == set()
+
+def test_compare_skips_missing_measures():
+    old = {"sessions_per_s": 10.0, "stages": {"get_jobs": {"p50_ms": 5.0}}}   # rapport från äldre version
+    names = [name for name, *_ in compare(old, report(10.0, 100.0, 1.0))]
+    assert names == ["sessions_per_s"]
@@ -0,0 +1,70 @@
+# test_bm25_index.py
+import numpy as np
+from bm25_index import BM25Index, ids_digest
+
+TITLES = ["Javautvecklare", "Lagerarbetare", "Systemutvecklare", "Sjuksköterska"]
+DESCRIPTIONS = [
+    "Vi söker en utvecklare med erfarenhet av java och sql.",
+    "Truckkort krävs. Arbete i lager med plock och pack.",
+    "Backend i python, gärna java. Erfarenhet av molntjänster.",
+    "Legitimerad sjuksköterska till vår avdelning.",
+]
+
+def build(chunks=1):
+    index = BM25Index()
+    ids = [f"ad{i}" for i in range(len(TITLES))]
+    step = -(-len(ids) // chunks)
+    for start in range(0, len(ids), step):
+        index.add(ids[start:start + step], TITLES[start:start + step], DESCRIPTIONS[start:start + step])
+    return index
+
+def test_search_ranks_exact_terms():
+    index = build()
+    ids, scores = index.search("java", k=10)
+    assert set(ids) == {"ad0", "ad2"} and np.all(np.diff(scores) <= 0)
+    assert index.search("javautvecklare")[0] == ["ad0"]   # rubriken
+    assert index.search("truckkort lager")[0][0] == "ad1"
+    assert index.search("finns inte")[0] == []
+
+def test_incremental_inserts_match_bulk_build():
+    bulk, incremental = build(), build(chunks=4)
+    for query in ("java", "erfarenhet av sql", "sjuksköterska lager"):
+        assert np.allclose(bulk.scores(query), incremental.scores(query))
+    assert len(incremental._segments) <= 2
+
+def test_replace_delete_compact_and_persistence(tmp_path):
+    index = build()
+    index.add(["ad1"], ["Javaarkitekt"], ["java java java"])
+    assert len(index) == 4 and index.search("java")[0][0] == "ad1"
+    assert index.search("truckkort")[0] == []
+    assert index.delete(["ad0", "saknas"]) == 1
+    assert "ad0" not in index.search("java")[0]
+
+    before = {q: dict(zip(*index.search(q))) for q in ("java", "python molntjänster")}
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+    assert len(loaded) == 3 and loaded.ids == index.ids
+    for query, expected in before.items():
+        ids, scores = loaded.search(query)
+        assert set(ids) == set(expected)
+
+def test_from_payloads():
+    payloads = {f"ad{i}": {"title": t, "description": d} for i, (t, d) in enumerate(zip(TITLES, DESCRIPTIONS))}
+    index = BM25Index.from_payloads(payloads, chunk_size=3)
+    assert np.allclose(index.scores("java sql"), build().scores("java sql"))
+
+def test_open_lexical_index_rebuilds_when_ids_differ(tmp_path):
+    from ingest import open_lexical_index
+    from vector_index import IVFIndex
+    payloads = [{"title": t, "description": d} for t, d in zip(TITLES, DESCRIPTIONS)]
+    index = IVFIndex(4, n_lists=2)
+    index.add(["ad0", "ad1", "ad2", "ad3"], np.eye(4), payloads=payloads)
+    build().save(str(tmp_path))
+    assert open_lexical_index(str(tmp_path), index).saved_digest == ids_digest(index.ids)
+
+    # samma antal annonser men en annan mängd: byggs om och sparas
+    index.delete(["ad3"])
+    index.add(["ad9"], np.eye(4)[3:], payloads=payloads[3:])
+    lexical = open_lexical_index(str(tmp_path), index, save=True)
+    assert "ad9" in lexical and "ad3" not in lexical
+    assert BM25Index.load(str(tmp_path)).saved_digest == ids_digest(["ad0", "ad1", "ad2", "ad9"])
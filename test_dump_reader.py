@@ -0,0 +1,69 @@
+# test_dump_reader.py
+import gzip
+import json
+import pytest
+from dump_reader import iter_records, iter_ad_chunks, _JSONStream
+
+FIXTURE = "testdata/jobtech_search.json"
+
+def fixture_hits():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return json.load(f)["hits"]
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 64, 1 << 20])
+def test_hits_object_matches_json_load(buffer_size):
+    assert list(iter_records(FIXTURE, buffer_size=buffer_size)) == fixture_hits()
+
+def test_array_jsonl_and_gzip(tmp_path):
+    hits = fixture_hits()
+    (tmp_path / "ads.json").write_text(json.dumps(hits, indent=2), encoding="utf-8")
+    (tmp_path / "ads.jsonl").write_text("".join(json.dumps(h) + "\n" for h in hits), encoding="utf-8")
+    with gzip.open(tmp_path / "ads.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(h) + "\n" for h in hits)
+    for name in ("ads.json", "ads.jsonl", "ads.jsonl.gz"):
+        assert list(iter_records(str(tmp_path / name), buffer_size=16)) == hits
+
+def test_numbers_split_across_buffers(tmp_path):
+    path = tmp_path / "nums.json"
+    path.write_text('{"total": {"value": 123456789}, "hits": [{"id": 1234567}, {"id": 2.5e10}], "x": []}')
+    assert list(iter_records(str(path), buffer_size=3)) == [{"id": 1234567}, {"id": 2.5e10}]
+
+def test_empty_and_invalid(tmp_path):
+    for text in ("[]", "{}", '{"hits": []}'):
+        (tmp_path / "e.json").write_text(text)
+        assert list(iter_records(str(tmp_path / "e.json"))) == []
+    (tmp_path / "bad.json").write_text('[{"id": 1} {"id": 2}]')
+    with pytest.raises(ValueError):
+        list(iter_records(str(tmp_path / "bad.json")))
+
+def test_invalid_value_fails_without_reading_rest_of_file(tmp_path):
+    hits = fixture_hits()
+    text = json.dumps(hits[:2])[:-1] + ', {"id": 3 "x": 1}, ' + json.dumps(hits)[1:]
+    error_at = text.index('3 "x"') + 2
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    reads = []
+
+    class CountingFile:
+        def __init__(self, f):
+            self.f = f
+        def read(self, n):
+            reads.append(n)
+            return self.f.read(n)
+
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JSONStream(CountingFile(f), buffer_size=64)
+        with pytest.raises(ValueError, match=f"tecken {error_at}:"):
+            list(stream.hits())
+    assert sum(reads) < len(text) // 2
+
+def test_chunks_have_app_schema(tmp_path):
+    chunks = list(iter_ad_chunks(FIXTURE, chunk_size=15, with_id=True))
+    assert [len(c) for c in chunks] == [15, 15, 10]
+    assert list(chunks[0].columns) == ["id", "title", "company", "city", "description", "url", "deadline"]
+
+    flat = tmp_path / "flat.jsonl"
+    flat.write_text(json.dumps({"title": "Lärare", "city": None}) + "\n")
+    (df,) = iter_ad_chunks(str(flat))
+    assert list(df.columns) == ["title", "company", "city", "description", "url"]
+    assert df["city"].tolist() == ["Ingen ort"]
@@ -0,0 +1,80 @@
+# test_embedding_backends.py
+import numpy as np
+import pytest
+from embedding_backends import load_backend, mean_pool
+
+TEXTS = ["vi söker en python utvecklare", "sjuksköterska till akuten i malmö", "lärare", ""]
+
+@pytest.fixture(scope="module")
+def tiny_model_dir(tmp_path_factory):
+    """
+    En liten slumpinitierad BERT i sentence-transformers-format, byggd lokalt utan nätverk.
+    """
+    torch = pytest.importorskip("torch")
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+    root = tmp_path_factory.mktemp("tiny")
+    words = sorted({w for t in TEXTS for w in t.split()})
+    (root / "vocab.txt").write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+    hf_dir = root / "hf"
+    torch.manual_seed(0)
+    BertModel(BertConfig(vocab_size=5 + len(words), hidden_size=64, num_hidden_layers=2,
+                         num_attention_heads=4, intermediate_size=128)).save_pretrained(hf_dir)
+    BertTokenizerFast(vocab_file=str(root / "vocab.txt")).save_pretrained(hf_dir)
+    transformer = models.Transformer(str(hf_dir), max_seq_length=32)
+    st_model = SentenceTransformer(modules=[transformer, models.Pooling(64, "mean"), models.Normalize()])
+    out = root / "st"
+    st_model.save(str(out))
+    return str(out)
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]])
+    assert np.allclose(mean_pool(hidden, np.array([[1, 1, 0]])), [[2.0, 2.0]])
+
+def test_unknown_backend_and_missing_dir():
+    with pytest.raises(ValueError):
+        load_backend("tensorflow", "x", "/tmp")
+    with pytest.raises(ValueError):
+        load_backend("onnx", "x", None)
+
+def test_tokenized_backend_requires_forward(tiny_model_dir):
+    from embedding_backends import _TokenizedBackend
+    with pytest.raises(TypeError):
+        _TokenizedBackend(tiny_model_dir)
+
+def test_cache_name_depends_on_model_dir(tiny_model_dir, tmp_path, monkeypatch):
+    import embeddings
+    monkeypatch.setattr(embeddings, "BACKEND", "sentence-transformers")
+    monkeypatch.setattr(embeddings, "MODEL_DIR", None)
+    assert embeddings.cache_name() == embeddings.MODEL_NAME
+    monkeypatch.setattr(embeddings, "MODEL_DIR", tiny_model_dir)
+    own = embeddings.cache_name()
+    assert own != embeddings.MODEL_NAME and own == embeddings.cache_name()
+    monkeypatch.setattr(embeddings, "MODEL_DIR", str(tmp_path))
+    assert embeddings.cache_name() != own
+    monkeypatch.setattr(embeddings, "BACKEND", "onnx")
+    assert "@onnx@" in embeddings.cache_name()
+
+def test_torch_int8_parity_with_reference(tiny_model_dir):
+    reference = load_backend("sentence-transformers", None, tiny_model_dir)
+    backend = load_backend("torch-int8", None, tiny_model_dir)
+    assert backend.get_sentence_embedding_dimension() == reference.get_sentence_embedding_dimension()
+    ref = reference.encode(TEXTS, batch_size=2, convert_to_numpy=True)
+    got = backend.encode(TEXTS, batch_size=2)
+    cosine = (ref * got).sum(axis=1) / np.linalg.norm(ref, axis=1) / np.linalg.norm(got, axis=1)
+    assert cosine.min() > 0.99
+    assert np.allclose(backend.encode(TEXTS[0]), got[0], atol=1e-5)
+
+def test_onnx_parity_with_reference(tiny_model_dir, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from export_model import export_onnx
+    export_onnx(tiny_model_dir, str(tmp_path / "model.onnx"))
+    import shutil
+    for name in ("tokenizer.json", "sentence_bert_config.json"):
+        shutil.copy(f"{tiny_model_dir}/{name}", tmp_path / name)
+    reference = load_backend("sentence-transformers", None, tiny_model_dir)
+    backend = load_backend("onnx", None, str(tmp_path))
+    ref = reference.encode(TEXTS, convert_to_numpy=True)
+    got = backend.encode(TEXTS)
+    assert ((ref * got).sum(axis=1)).min() > 0.999
@@ -0,0 +1,77 @@
+# test_embedding_cache.py
+import threading
+import numpy as np
+import pytest
+import embedding_cache
+from embedding_cache import EmbeddingCache, text_key
+
+def test_text_key_ignores_whitespace_differences():
+    assert text_key("Vi söker  en\nutvecklare ") == text_key("Vi söker en utvecklare")
+    assert text_key("a") != text_key("b")
+
+def test_hits_misses_and_lru_eviction(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "test-model", dim=3, capacity=2)
+    keys = [text_key(t) for t in ["a", "b", "c"]]
+    vecs = np.eye(3, dtype=np.float32)
+
+    cache.put_many(keys[:2], vecs[:2])
+    found, out = cache.get_many([keys[0]])  # "a" blir senast använd
+    assert found.tolist() == [True]
+    assert np.allclose(out[0], vecs[0])
+
+    cache.put_many([keys[2]], vecs[2:])  # evictar "b"
+    found, _ = cache.get_many(keys)
+    assert found.tolist() == [True, False, True]
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+def test_cache_survives_reopen(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=4)
+    cache.put_many([text_key("annons")], np.array([[0.6, 0.8]], dtype=np.float32))
+    del cache
+
+    reopened = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=4)
+    found, out = reopened.get_many([text_key("annons")])
+    assert found[0] and np.allclose(out[0], [0.6, 0.8])
+
+def test_two_writers_on_same_directory_never_return_wrong_vectors(tmp_path):
+    # två instanser motsvarar två processer (t.ex. appen och ingest.py) på samma katalog
+    a = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=2)
+    b = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=2)
+    k = [text_key(t) for t in ["x", "y", "z"]]
+    v = np.array([[1, 0], [0, 1], [0.6, 0.8]], dtype=np.float32)
+
+    a.put_many(k[:1], v[:1])
+    b.put_many(k[1:3], v[1:3])   # b läser in a:s skrivning först och evictar "x" i stället för att krocka
+    found, out = a.get_many(k)
+    assert found.tolist() == [False, True, True]
+    assert np.allclose(out[1:], v[1:])
+
+    a.put_many(k[:1], v[:1])     # återanvänder en rad som b fortfarande har i sitt index
+    found, out = b.get_many(k)
+    assert found[0]
+    for i in np.flatnonzero(found):
+        assert np.allclose(out[i], v[i])
+
+    # ett inaktuellt index (raden har skrivits över på disk) ger en miss, aldrig fel vektor
+    b._index[k[1]] = b._index[k[0]]
+    found, _ = b.get_many([k[1]])
+    assert found.tolist() == [False]
+
+@pytest.mark.skipif(embedding_cache.fcntl is None, reason="fillås kräver fcntl")
+def test_reader_waits_for_a_write_in_progress(tmp_path):
+    reader = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=2)
+    writer = EmbeddingCache(str(tmp_path), "test-model", dim=2, capacity=2)
+    key = text_key("annons")
+    result = {}
+    with writer._file_lock():
+        # en annan process mitt i put_many: nyckeln och generationen är publicerade, vektorn inte
+        writer._keys[0] = np.frombuffer(key, dtype=np.uint8)
+        writer._ticks[0] = 1
+        writer._gen[0] += 1
+        thread = threading.Thread(target=lambda: result.update(zip(("found", "out"), reader.get_many([key]))))
+        thread.start()
+        thread.join(0.3)
+        assert thread.is_alive()   # läsaren väntar på skrivlåset
+        writer._vectors[0] = [0.6, 0.8]
+    thread.join(5)
+    assert result["found"].tolist() == [True] and np.allclose(result["out"][0], [0.6, 0.8])
@@ -0,0 +1,51 @@
+# test_embedding_store.py
+import numpy as np
+import pytest
+from embedding_store import EmbeddingStore, quantize_int8, ndcg_at_k
+from ranking import rank_by_similarity
+
+def unit_rows(n, dim, seed=0):
+    m = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+def test_int8_roundtrip_error_is_small():
+    m = unit_rows(100, 32)
+    q, scales = quantize_int8(m)
+    assert q.dtype == np.int8 and scales.shape == (100,)
+    assert np.abs(q.astype(np.float32) * scales[:, None] - m).max() <= scales.max() / 2 + 1e-7
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_scores_close_to_float32(dtype):
+    m, q = unit_rows(500, 64), unit_rows(1, 64, seed=1)[0]
+    store = EmbeddingStore(m, dtype)
+    assert np.allclose(store.scores(q), m @ q, atol=0.02)
+    assert store.nbytes <= m.nbytes
+
+def test_rerank_with_exact_matches_exact_ranking():
+    m, q = unit_rows(2000, 32), unit_rows(1, 32, seed=2)[0]
+    exact_idx, exact_scores = rank_by_similarity(q, m, top_k=10)
+    idx, scores = EmbeddingStore(m, "int8", exact=m).rank(q * 5, top_k=10)
+    assert idx.tolist() == exact_idx.tolist()
+    assert np.allclose(scores, exact_scores)
+
+def test_take_save_and_load(tmp_path):
+    m = unit_rows(50, 16)
+    store = EmbeddingStore(m, "int8", exact=m)
+    sub = store.take([3, 1])
+    assert np.allclose(sub.vectors(), m[[3, 1]], atol=0.01)
+    store.save(tmp_path)
+    loaded = EmbeddingStore.load(tmp_path)
+    assert loaded.dtype == "int8" and isinstance(loaded.exact, np.memmap)
+    assert np.array_equal(loaded.data, store.data)
+    assert loaded.rank(m[7], top_k=1)[0].tolist() == [7]
+
+def test_empty_and_invalid():
+    store = EmbeddingStore(np.empty((0, 0), dtype=np.float32), "int8")
+    assert len(store) == 0 and store.rank(np.ones(3))[0].size == 0
+    with pytest.raises(ValueError):
+        EmbeddingStore(unit_rows(2, 4), "int4")
+
+def test_ndcg():
+    rel = [3, 2, 0, 1]
+    assert ndcg_at_k([0, 1, 3, 2], rel, 4) == pytest.approx(1.0)
+    assert ndcg_at_k([2, 3, 1, 0], rel, 4) < 1.0
@@ -0,0 +1,59 @@
+# test_encode_texts.py
+import numpy as np
+import pytest
+import embeddings
+from embedding_cache import EmbeddingCache
+
+class CountingModel:
+    """
+    Ersättning för modellen: onormaliserad vektor (textens längd, antal "a", 1) och
+    en logg över alla batchar som kodats.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32) * 10
+
+def expected(texts):
+    m = np.array([[len(t), t.count("a"), 1.0] for t in texts], dtype=np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+@pytest.fixture
+def model(monkeypatch, tmp_path):
+    model = CountingModel()
+    monkeypatch.setattr(embeddings, "_model", model)
+    monkeypatch.setattr(embeddings, "_cache", EmbeddingCache(str(tmp_path), "test-model", dim=3, capacity=100))
+    return model
+
+TEXTS = ["en lång annonstext om java", "kort", "mellanlång annons", "a", "kort"]
+
+def test_length_sort_is_undone_and_rows_are_normalized(model):
+    out = embeddings.encode_texts(TEXTS, batch_size=2, use_cache=False)
+    assert np.allclose(out, expected(TEXTS))
+    assert np.allclose(np.linalg.norm(out, axis=1), 1.0)
+    # batcharna kodas i längdordning
+    lengths = [len(t) for batch in model.batches for t in batch]
+    assert lengths == sorted(lengths)
+
+def test_duplicate_misses_are_encoded_once_and_cached(model):
+    out = embeddings.encode_texts(TEXTS, batch_size=2)
+    assert np.allclose(out, expected(TEXTS))
+    encoded = [t for batch in model.batches for t in batch]
+    assert sorted(encoded) == sorted(set(TEXTS))
+
+    model.batches.clear()
+    again = embeddings.encode_texts(["kort", "a", "ny text"])
+    assert model.batches == [["ny text"]]
+    assert np.allclose(again, expected(["kort", "a", "ny text"]))
+    assert embeddings.get_embedding_cache().stats()["size"] == 5
+
+def test_empty_and_non_string_input(model):
+    assert embeddings.encode_texts([]).shape == (0, 3)
+    out = embeddings.encode_texts([None, "kort"], use_cache=False)
+    assert np.allclose(out, expected(["", "kort"]))
@@ -0,0 +1,51 @@
+# test_intents.py
+import pandas as pd
+from ad_features import add_features
+from intents import (Intent, IntentRouter, CityIndex, answer_question, answer_top_city,
+                     get_router, NO_DATA_ANSWER, FALLBACK_ANSWER)
+
+def make_df():
+    return add_features(pd.DataFrame({
+        "title": ["Utvecklare", "Testare", "Lärare", "Sjuksköterska"],
+        "company": ["A", "B", "C", "D"],
+        "city": ["Stockholm", "Göteborg", "Stockholm", "Upplands Väsby"],
+        "description": [
+            "Jobba på distans, heltid.",
+            "Hybrid. Körkort krävs.",
+            "Du talar svenska. Vikariat.",
+            "På plats. Högskola är meriterande.",
+        ],
+    }))
+
+def test_router_picks_lowest_priority():
+    router = get_router()
+    assert router.route("finns det distansjobb på heltid?").name == "remote"
+    assert router.route("Hur många heltidsjobb?").name == "employment_type"
+    assert router.route("krävs körkort?").name == "korkort"
+    assert router.route("vad är vädret?") is None
+
+def test_prefix_keywords_share_a_position():
+    router = IntentRouter([Intent("kort", ["plats"], None, 2), Intent("lang", ["platsbank"], None, 1)])
+    assert [i.name for i in router.match("platsbanken")] == ["lang", "kort"]
+
+def test_city_index_normalizes_names():
+    index = CityIndex(["Stockholm", "Upplands Väsby", ""])
+    assert len(index) == 2
+    assert index.find("Hur många jobb finns i STOCKHOLM?") == "Stockholm"
+    assert index.find("jobb i upplands väsby") == "Upplands Väsby"
+    assert index.find("jobb i Stockholms län") == "Stockholm"
+    assert index.find("jobb i Malmö") is None
+
+def test_answers_match_old_chain():
+    df = make_df()
+    assert answer_question("Jobb i Stockholm på distans?", df).startswith("📄 Det finns 2 jobb i Stockholm.")
+    assert answer_question("distans?", df) == "🌍 Jag hittade 1 distansjobb. Exempel: Utvecklare på A (Stockholm)."
+    assert answer_question("hybrid?", df).startswith("💻 Jag hittade 1 hybridjobb.")
+    assert answer_question("vikariat eller heltid?", df).startswith("🕒 Jag hittade 2 jobb som matchar (heltid, vikariat).")
+    assert answer_question("högskola?", df).startswith("🎓 1 jobb nämner universitet")
+    assert answer_question("engelska?", df) == "🗣️ Inga jobb nämner engelska i de sökta annonserna."
+    assert answer_question("vad är vädret?", df) == FALLBACK_ANSWER
+    assert answer_question("distans?", pd.DataFrame()) == NO_DATA_ANSWER
+
+def test_top_city_button():
+    assert answer_top_city("", make_df()) == "🏙️ Flest jobb finns i: Stockholm (2 annonser)."
@@ -0,0 +1,46 @@
+# test_jobtech_client.py
+import asyncio
+import pytest
+from jobtech_client import JobTechClient, JobTechError, stream_pages
+from jobtech_stub import StubJobTechServer, load_recorded_hits
+from fetch_jobs import get_jobs
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_paginated_fetch_keeps_api_order():
+    with StubJobTechServer(total=250) as stub:
+        async def fetch():
+            async with JobTechClient(stub.base_url, concurrency=3) as client:
+                return await client.fetch_hits("systemutvecklare", max_ads=230, page_size=50)
+        hits = run(fetch())
+        assert [h["id"] for h in hits] == [h["id"] for h in stub.hits[:230]]
+        assert stub.requests == 5
+
+def test_retries_on_server_errors():
+    with StubJobTechServer(fail_first=2) as stub:
+        async def fetch():
+            async with JobTechClient(stub.base_url, backoff=0.01) as client:
+                return await client.fetch_hits("kock", max_ads=10)
+        assert len(run(fetch())) == 10
+        assert stub.requests == 3
+
+def test_gives_up_after_retries():
+    with StubJobTechServer(fail_first=10) as stub:
+        async def fetch():
+            async with JobTechClient(stub.base_url, retries=1, backoff=0.01) as client:
+                return await client.fetch_hits("kock", max_ads=10)
+        with pytest.raises(JobTechError):
+            run(fetch())
+
+def test_get_jobs_and_streaming_against_stub():
+    with StubJobTechServer() as stub:
+        df = get_jobs("systemutvecklare", limit=15, base_url=stub.base_url)
+        assert list(df.columns) == ["title", "company", "city", "description", "url"]
+        assert len(df) == 15
+        assert df["title"].tolist() == [h["headline"] for h in load_recorded_hits()[:15]]
+        assert not df["city"].isna().any()
+
+        pages = list(stream_pages("systemutvecklare", 40, page_size=10, base_url=stub.base_url))
+        assert sorted(offset for offset, _ in pages) == [0, 10, 20, 30]
+        assert sum(len(hits) for _, hits in pages) == 40
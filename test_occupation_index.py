@@ -0,0 +1,40 @@
+# test_occupation_index.py
+import numpy as np
+from occupation_index import OccupationIndex
+
+TAXONOMY = [
+    {"occupation": "drifttekniker, it", "skills": ["WAN", "Servrar, installation och underhåll"]},
+    {"occupation": "lastbilsförare m.fl.", "skills": ["C-körkort"]},
+    {"occupation": "förare", "skills": ["B-körkort"]},
+    {"occupation": "systemutvecklare", "skills": ["Python", "Java"]},
+]
+
+def test_query_match_prefers_longest_label():
+    index = OccupationIndex(TAXONOMY)
+    assert index.match_query("Jag vill bli lastbilsförare") == "lastbilsförare m.fl."
+    assert index.match_query("förare sökes") == "förare"
+    assert index.match_query("Drifttekniker, IT i Umeå") == "drifttekniker, it"
+    assert index.match_query("kock") is None
+
+def test_titles_are_counted():
+    index = OccupationIndex(TAXONOMY)
+    titles = ["Systemutvecklare Java", "Förare", "Senior systemutvecklare"]
+    assert index.match_titles(titles) == "systemutvecklare"
+    assert index.skills_for("systemutvecklare") == ["Python", "Java"]
+
+def test_nearest_uses_label_embeddings():
+    index = OccupationIndex(TAXONOMY)
+    encode = lambda texts: np.eye(len(texts), dtype=np.float32)
+    assert index.nearest(np.array([0, 0, 0, 2.0]), encode) == "systemutvecklare"
+    assert index.nearest(np.array([1, 1, 1, 1.0]), encode, min_score=0.9) is None
+
+def test_chat_question_does_not_use_embedding_fallback(monkeypatch):
+    import pandas as pd
+    import skills
+
+    def fail(*args, **kwargs):
+        raise AssertionError("embedding-fallbacken ska inte köras för chattfrågor")
+    monkeypatch.setattr(OccupationIndex, "nearest", fail)
+    df = pd.DataFrame({"title": ["Jobb"], "description": ["Du kan Python och SQL."]})
+    assert skills.find_best_occupation_from_query_or_titles("Vilka kompetenser behövs?", df) is None
+    assert skills.get_skills_for_user_query("Vilka kompetenser behövs?", df)
@@ -0,0 +1,27 @@
+# test_phrase_matcher.py
+import re
+from phrase_matcher import PhraseMatcher, most_common
+from text_utils import normalize_text
+
+SKILLS = ["Python", "SQL, databaser", "Java", "JavaScript", "projektledning", "ledning", "C++"]
+TEXT = ("Vi söker en Python-utvecklare med Python, SQL, databaser och JavaScript. "
+        "Java är meriterande. Erfarenhet av projektledning och ledning av team.")
+
+def test_counts_match_word_bounded_regex():
+    matcher = PhraseMatcher(SKILLS)
+    text = normalize_text(TEXT)
+    expected = {p: len(re.findall(rf"\b{re.escape(p)}\b", text)) for p in matcher.phrases}
+    expected = {p: c for p, c in expected.items() if c}
+    assert dict(matcher.count(TEXT)) == expected
+
+def test_real_frequencies_drive_ordering():
+    matcher = PhraseMatcher(SKILLS)
+    counts = matcher.count([TEXT, "Python och åter python."])
+    assert counts["python"] == 4
+    assert counts["ledning"] == 1  # inte inuti "projektledning", ordgräns krävs
+    # vid lika antal vinner den längre frasen
+    assert most_common(counts, 2) == ["python", "projektledning"]
+
+def test_short_and_duplicate_phrases_are_skipped():
+    matcher = PhraseMatcher(["c++", "Python", "python", "x"])
+    assert matcher.phrases == ["python"]
@@ -0,0 +1,55 @@
+# test_ranking.py
+import numpy as np
+from ranking import rank_by_similarity, stack_embeddings, reciprocal_rank_fusion, weighted_fusion
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((200, 8)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    q = rng.standard_normal(8).astype(np.float32) * 3  # frågan behöver inte vara normaliserad
+
+    full_idx, full_scores = rank_by_similarity(q, matrix)
+    idx, scores = rank_by_similarity(q, matrix, top_k=10)
+    assert idx.tolist() == full_idx[:10].tolist()
+    assert np.allclose(scores, full_scores[:10])
+    assert np.all(np.diff(scores) <= 0)
+    assert np.isclose(scores[0], np.max(matrix @ (q / np.linalg.norm(q))))
+
+def test_stack_and_empty_input():
+    m = stack_embeddings([np.ones(3), np.zeros(3)])
+    assert m.shape == (2, 3) and m.dtype == np.float32
+    idx, scores = rank_by_similarity(np.ones(3), np.empty((0, 3), dtype=np.float32), top_k=5)
+    assert len(idx) == 0 and len(scores) == 0
+
+def test_reciprocal_rank_fusion():
+    ids, scores = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]])
+    assert ids[0] == "c" and set(ids) == {"a", "b", "c", "d"}
+    assert np.all(np.diff(scores) <= 0)
+    # lika poäng: den första listans ordning behålls
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "a"]])[0] == ["a", "b"]
+    assert reciprocal_rank_fusion([["a", "b"], ["b"]], weights=[1.0, 0.0])[0] == ["a", "b"]
+
+def test_weighted_fusion():
+    ids, scores = weighted_fusion([(["a", "b", "c"], [0.9, 0.5, 0.1]), (["c"], [12.0])], weights=[1.0, 2.0])
+    assert ids == ["c", "a", "b"] and np.isclose(scores[0], 2.0)
+
+def test_run_search_ranks_in_full_precision(monkeypatch):
+    import pandas as pd
+    import pipeline
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal((30, 16)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query_vec = matrix[7] + 0.01 * matrix[3]
+    ads = pd.DataFrame({"title": [f"jobb {i}" for i in range(30)], "company": "A", "city": "Malmö",
+                        "description": [f"annons {i}" for i in range(30)], "url": "#"})
+    monkeypatch.setattr(pipeline, "get_jobs", lambda query, limit: ads)
+    monkeypatch.setattr(pipeline, "encode_texts", lambda texts: matrix)
+    monkeypatch.setattr(pipeline, "get_embedding", lambda text: query_vec)
+    monkeypatch.setattr(pipeline, "FUSION", "semantic")
+
+    result = pipeline.run_search("xyz", 30)
+    expected_idx, expected = rank_by_similarity(query_vec, matrix)
+    assert result.error is None
+    assert result.df["title"].tolist() == [f"jobb {i}" for i in expected_idx.tolist()]
+    assert np.allclose(result.df["similarity"].to_numpy(), expected, atol=1e-6)
+    assert result.embeddings.dtype == pipeline.STORE_DTYPE and len(result.embeddings) == 30
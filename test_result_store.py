@@ -0,0 +1,64 @@
+# test_result_store.py
+import gc
+import numpy as np
+import pandas as pd
+from result_store import AdStore, SessionRegistry, ad_keys, trim_history
+
+def ads(ids, city="Stockholm"):
+    return pd.DataFrame({
+        "title": [f"Jobb {i}" for i in ids],
+        "company": ["Volvo"] * len(ids),
+        "city": [city] * len(ids),
+        "description": [f"Beskrivning {i}. Du kan jobba på distans." for i in ids],
+        "url": [f"https://example.se/ad/{i}" for i in ids],
+        "similarity": np.linspace(0.9, 0.5, len(ids)),
+    })
+
+def test_ad_keys_prefer_id_then_url_then_content():
+    df = pd.DataFrame({"id": ["7", ""], "title": ["a", "b"], "url": ["#", "https://x/1"]})
+    assert ad_keys(df) == ["id:7", "url:https://x/1"]
+    no_url = pd.DataFrame({"title": ["a", "a", "b"], "url": ["#", "#", "#"]})
+    keys = ad_keys(no_url)
+    assert keys[0] == keys[1] != keys[2] and keys[0].startswith("sha1:")
+
+def test_views_share_deduplicated_ads():
+    store = AdStore()
+    a = store.view(ads([1, 2, 3]))
+    b = store.view(ads([3, 2, 4]))
+    assert len(store) == 4
+    assert a.rows[1] == b.rows[1] and a.rows[2] == b.rows[0]
+    frame = b.frame()
+    assert frame["title"].tolist() == ["Jobb 3", "Jobb 2", "Jobb 4"]
+    assert np.allclose(frame["similarity"], [0.9, 0.7, 0.5])
+    assert frame["features"].dtype == np.uint16 and (frame["features"] > 0).all()   # distans
+
+def test_release_frees_unreferenced_rows_for_reuse():
+    store = AdStore()
+    a = store.view(ads([1, 2]))
+    b = store.view(ads([2, 3]))
+    a.release()
+    a.release()   # idempotent
+    assert len(store) == 2 and store.stats()["free_rows"] == 1
+    c = store.view(ads([9]))
+    assert store.stats()["rows"] == 3          # den lediga raden återanvänds
+    del b
+    gc.collect()
+    assert len(store) == 1 and c.frame()["title"].tolist() == ["Jobb 9"]
+
+def test_registry_evicts_idle_sessions():
+    now = [0.0]
+    store, registry = AdStore(), SessionRegistry(idle_seconds=60, clock=lambda: now[0])
+    registry.set("a", store.view(ads([1, 2])))
+    registry.set("b", store.view(ads([2, 3])))
+    now[0] = 50
+    assert registry.get("a") is not None        # a används, b är inaktiv
+    now[0] = 100
+    assert registry.get("b") is None and registry.evicted == 1
+    assert len(store) == 2
+    registry.set("a", store.view(ads([5])))     # nytt resultat släpper det gamla
+    assert len(store) == 1 and registry.stats()["sessions"] == 1
+
+def test_trim_history():
+    history = [{"role": "bot", "content": str(i)} for i in range(10)]
+    assert [m["content"] for m in trim_history(history, 3)] == ["7", "8", "9"]
+    assert len(history) == 3
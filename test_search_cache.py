@@ -0,0 +1,52 @@
+# test_search_cache.py
+import threading
+import time
+from search_cache import SearchCache, search_key
+
+def test_key_normalizes_query():
+    assert search_key("  Systemutvecklare! ", 10) == search_key("systemutvecklare", 10)
+    assert search_key("systemutvecklare", 10) != search_key("systemutvecklare", 20)
+
+def test_concurrent_identical_searches_share_one_call():
+    cache = SearchCache()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "resultat"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+               for _ in range(8)]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["resultat"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+def test_ttl_and_memory_bound():
+    cache = SearchCache(ttl=0.05, max_bytes=10, sizeof=len)
+    cache.get_or_compute("a", lambda: "12345")
+    cache.get_or_compute("b", lambda: "12345")
+    cache.get_or_compute("c", lambda: "12345")  # "a" evictas, max 10 byte
+    assert len(cache) == 2
+    assert cache.get_or_compute("b", lambda: "nytt") == "12345"
+    time.sleep(0.06)
+    assert cache.get_or_compute("b", lambda: "nytt") == "nytt"
+
+def test_errors_and_uncacheable_values_are_not_stored():
+    cache = SearchCache()
+    try:
+        cache.get_or_compute("k", lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert cache.get_or_compute("k", lambda: "", cache_if=len) == ""
+    assert cache.get_or_compute("k", lambda: "ok", cache_if=len) == "ok"
+    assert len(cache) == 1
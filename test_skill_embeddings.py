@@ -0,0 +1,92 @@
+# test_skill_embeddings.py
+import os
+import zlib
+import numpy as np
+from skill_embeddings import SkillEmbeddings, split_sentences, skill_embeddings_path
+
+DIM = 64
+
+def bag_of_words(texts):
+    """
+    Deterministisk ersättning för modellen: ordhashning, L2-normaliserad.
+    """
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.lower().replace(".", " ").split():
+            out[i, zlib.crc32(word.encode("utf-8")) % DIM] += 1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.where(norms == 0, 1.0, norms)
+
+LABELS = ["java", "sql databaser", "truckkort", "kundservice"]
+ADS = [
+    "Vi söker en utvecklare. Du kan java och java ee.\nErfarenhet av sql databaser är meriterande.",
+    "Lagerarbete med truckkort. Du trivs med kundservice mot våra kunder.",
+    "",
+    "Kort.",
+]
+
+def test_split_sentences():
+    text = "Vi söker en utvecklare. Du har erfarenhet av Java!\n• Kunskap i SQL och databaser\n- God kommunikativ förmåga\nKort."
+    assert split_sentences(text) == ["Vi söker en utvecklare.", "Du har erfarenhet av Java!",
+                                     "Kunskap i SQL och databaser", "God kommunikativ förmåga"]
+    assert split_sentences(None) == []
+    assert len(split_sentences("En mening som är lång nog. " * 100, max_sentences=5)) == 5
+
+def test_blocked_scores_match_unblocked():
+    skills = SkillEmbeddings.build(LABELS, bag_of_words)
+    full = skills.ad_scores(ADS, bag_of_words, block_sentences=10_000)
+    for block in (1, 2, 3):
+        assert np.allclose(skills.ad_scores(ADS, bag_of_words, block_sentences=block), full)
+    # referens: max över annonsens meningar, räknat rad för rad
+    expected = (bag_of_words(split_sentences(ADS[0])) @ skills.matrix.T).max(axis=0)
+    assert np.allclose(full[0], expected)
+    assert (full[2] == -1).all() and (full[3] == -1).all()
+
+def test_top_skills_per_ad_and_for_result():
+    skills = SkillEmbeddings.build(LABELS, bag_of_words)
+    per_ad = skills.top_skills_per_ad(ADS, bag_of_words, top_k=2, min_score=0.3)
+    assert {label for label, _ in per_ad[0]} == {"java", "sql databaser"}
+    assert per_ad[0][0][1] >= per_ad[0][1][1]
+    assert {label for label, _ in per_ad[1]} == {"truckkort", "kundservice"}
+    assert per_ad[2] == [] and per_ad[3] == []
+    ranked = skills.top_skills(ADS + ADS[:1], bag_of_words, top_k=3, min_score=0.3)
+    # java och sql finns i två annonser, övriga i en
+    assert {label for label, _, _ in ranked[:2]} == {"java", "sql databaser"}
+    assert [n for _, n, _ in ranked] == [2, 2, 1]
+
+def test_columns_restrict_candidates():
+    skills = SkillEmbeddings.build(LABELS, bag_of_words)
+    columns = skills.columns(["truckkort", "finns inte"])
+    assert columns.tolist() == [2]
+    ranked = skills.top_skills(ADS, bag_of_words, min_score=0.3, columns=columns)
+    assert [label for label, _, _ in ranked] == ["truckkort"]
+
+def test_save_and_load_checks_labels_and_model(tmp_path):
+    path = skill_embeddings_path(str(tmp_path / "tax.json"), "sentence-transformers/all-MiniLM-L6-v2")
+    assert path.endswith(".skills.sentence-transformers_all-MiniLM-L6-v2.npz")
+    skills = SkillEmbeddings.build(LABELS, bag_of_words)
+    skills.save(path, "m")
+    skills.save(path, "m")   # skriver över atomärt
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(path)]   # ingen temporärfil kvar
+    loaded = SkillEmbeddings.load(path, LABELS, "m")
+    assert np.array_equal(loaded.matrix, skills.matrix)
+    assert SkillEmbeddings.load(path, LABELS, "annan-modell") is None
+    assert SkillEmbeddings.load(path, LABELS[:-1], "m") is None
+    assert SkillEmbeddings.load(str(tmp_path / "saknas.npz"), LABELS, "m") is None
+
+def test_semantic_skills_bypass_embedding_cache(monkeypatch):
+    import embeddings
+    import skills
+
+    class BagOfWordsModel:
+        def get_sentence_embedding_dimension(self):
+            return DIM
+        def encode(self, texts, **kwargs):
+            return bag_of_words(texts)
+
+    def no_cache():
+        raise AssertionError("meningsfragment ska inte hamna i annonscachen")
+    monkeypatch.setattr(embeddings, "_model", BagOfWordsModel())
+    monkeypatch.setattr(embeddings, "get_embedding_cache", no_cache)
+    monkeypatch.setattr(skills, "get_skill_embeddings", lambda: SkillEmbeddings.build(LABELS, embeddings.encode_uncached))
+    assert "truckkort" in skills.semantic_skills(ADS[1:2], top_k=2)
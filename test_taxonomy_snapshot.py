@@ -0,0 +1,51 @@
+# test_taxonomy_snapshot.py
+import json
+import os
+from load_taxonomy import load_taxonomy, load_taxonomy_snapshot, parse_taxonomy_file
+from taxonomy_snapshot import TaxonomySnapshot, snapshot_path_for
+
+def write_taxonomy(path, occupations):
+    concepts = [{"preferred_label": occ, "related": [{"preferred_label": sk, "type": "skill"} for sk in skills]}
+                for occ, skills in occupations.items()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"data": {"concepts": concepts}}, f)
+
+def test_snapshot_roundtrip_matches_json(tmp_path):
+    src = str(tmp_path / "tax.json")
+    write_taxonomy(src, {"Drifttekniker, IT": ["WAN", "Servrar, installation"], "Kockar": ["Matlagning", "WAN"]})
+
+    expected = parse_taxonomy_file(src)
+    assert load_taxonomy(src) == expected  # första gången: parsar JSON och skriver snapshot
+    assert os.path.exists(snapshot_path_for(src))
+    assert load_taxonomy(src) == expected  # andra gången: från snapshoten
+
+    snapshot = TaxonomySnapshot.load(snapshot_path_for(src), source_path=src)
+    assert snapshot.skill_labels == ["wan", "servrar, installation", "matlagning"]
+    assert snapshot.occupation_norm == ["drifttekniker it", "kockar"]
+    assert snapshot.skill_ids_for(1).tolist() == [2, 0]
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    src = str(tmp_path / "tax.json")
+    write_taxonomy(src, {"Kockar": ["Matlagning"]})
+    load_taxonomy_snapshot(src)
+
+    write_taxonomy(src, {"Kockar": ["Matlagning", "Bakning"], "Präster": ["Predikan"]})
+    assert TaxonomySnapshot.load(snapshot_path_for(src), source_path=src) is None
+    assert load_taxonomy_snapshot(src).occupations == ["kockar", "präster"]
+
+def test_touched_source_updates_stored_stat(tmp_path, monkeypatch):
+    import taxonomy_snapshot
+    src = str(tmp_path / "tax.json")
+    write_taxonomy(src, {"Kockar": ["Matlagning"]})
+    load_taxonomy_snapshot(src)
+    stat = os.stat(src)
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))   # samma innehåll, ny mtime
+
+    hashed = []
+    real_sha1 = taxonomy_snapshot.file_sha1
+    monkeypatch.setattr(taxonomy_snapshot, "file_sha1", lambda p: hashed.append(p) or real_sha1(p))
+    assert TaxonomySnapshot.load(snapshot_path_for(src), source_path=src).occupations == ["kockar"]
+    assert len(hashed) == 1
+    assert TaxonomySnapshot.load(snapshot_path_for(src), source_path=src) is not None
+    assert len(hashed) == 1   # mtime uppdaterades i snapshoten, ingen ny hashning
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["tax.json", "tax.snapshot.npz"]   # ingen temporärfil kvar
@@ -0,0 +1,84 @@
+# test_tracing.py
+import time
+import urllib.request
+import pytest
+import tracing
+from tracing import Tracer, span, count, tracer
+
+@pytest.fixture
+def enabled():
+    tracing.enable(True)
+    tracer.reset()
+    yield tracer
+    tracing.enable(False)
+    tracer.reset()
+
+def test_disabled_spans_record_nothing():
+    tracing.enable(False)
+    tracer.reset()
+    with span("fetch"):
+        pass
+    count("x")
+    assert tracer.snapshot()["spans"] == [] and tracer.snapshot()["counters"] == {}
+
+def test_disabled_overhead_is_negligible():
+    tracing.enable(False)
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        with span("rank"):
+            pass
+    assert (time.perf_counter() - start) / n < 5e-6
+
+def test_spans_errors_and_counters(enabled):
+    for _ in range(3):
+        with span("rank"):
+            time.sleep(0.002)
+    with pytest.raises(KeyError):
+        with span("fetch"):
+            raise KeyError("x")
+    count("rank_failures", 2)
+    snap = enabled.snapshot()
+    rows = {r["span"]: r for r in snap["spans"]}
+    assert rows["rank"]["antal"] == 3 and rows["rank"]["fel"] == 0
+    assert rows["rank"]["p50_ms"] >= 2
+    assert rows["fetch"]["fel"] == 1
+    assert snap["counters"] == {"rank_failures": 2}
+
+def test_prometheus_text():
+    t = Tracer()
+    t.record("embed", 0.02)
+    t.record("embed", 3.0, error=True)
+    t.count("fetch_errors")
+    t.add_collector("search_cache", lambda: {"hits": 4, "hit_rate": 0.5, "name": "x"}, counters=("hits",))
+    text = t.prometheus_text()
+    assert 'jobcoach_span_seconds_bucket{span="embed",le="0.025"} 1' in text
+    assert 'jobcoach_span_seconds_bucket{span="embed",le="+Inf"} 2' in text
+    assert 'jobcoach_span_seconds_count{span="embed"} 2' in text
+    assert 'jobcoach_span_errors_total{span="embed"} 1' in text
+    assert "jobcoach_fetch_errors_total 1" in text
+    assert "# TYPE jobcoach_search_cache_hits_total counter\njobcoach_search_cache_hits_total 4" in text
+    assert "# TYPE jobcoach_search_cache_hit_rate gauge\njobcoach_search_cache_hit_rate 0.5" in text
+    assert "name" not in text
+
+def test_failing_collector_is_skipped():
+    t = Tracer()
+    t.record("embed", 0.02)
+    t.add_collector("broken", lambda: 1 / 0)
+    t.add_collector("sessions", lambda: {"sessions": 3})
+    text = t.prometheus_text()
+    assert 'jobcoach_span_seconds_count{span="embed"} 1' in text
+    assert "jobcoach_sessions_sessions 3" in text and "broken" not in text
+    assert t.snapshot()["gauges"] == {"sessions_sessions": 3}
+    assert t.snapshot()["counters"]["collector_errors"] >= 2
+
+def test_metrics_endpoint(enabled):
+    with span("fetch"):
+        pass
+    server = tracing.start_metrics_server(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+        assert 'jobcoach_span_seconds_count{span="fetch"} 1' in body
+    finally:
+        server.shutdown()
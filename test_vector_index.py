@@ -0,0 +1,42 @@
+# test_vector_index.py
+import numpy as np
+from vector_index import IVFIndex
+
+def random_unit(n, dim, seed=0):
+    m = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+def test_search_finds_exact_match_after_training():
+    data = random_unit(2000, 16)
+    index = IVFIndex(16, n_lists=16, nprobe=4, train_size=1000)
+    index.add([f"ad{i}" for i in range(1000)], data[:1000])
+    assert index.trained
+    index.add([f"ad{i}" for i in range(1000, 2000)], data[1000:])  # inkrementellt efter träning
+    ids, scores = index.search(data[1500], k=5)
+    assert ids[0] == "ad1500" and np.isclose(scores[0], 1.0)
+    assert index.brute_force(data[1500], k=1)[0] == ["ad1500"]
+
+def test_delete_replace_and_persistence(tmp_path):
+    data = random_unit(50, 8)
+    index = IVFIndex(8, n_lists=4)
+    index.add([str(i) for i in range(50)], data, payloads=[{"title": f"jobb {i}"} for i in range(50)])
+    assert index.delete(["3", "saknas"]) == 1
+    assert "3" not in index.search(data[3], k=50)[0]
+
+    index.add(["4"], data[5:6], payloads=[{"title": "ny"}])  # ersätter vektor och payload
+    assert index.search(data[5], k=2)[0][:2] in (["4", "5"], ["5", "4"])
+
+    index.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path))
+    assert len(loaded) == 49
+    assert loaded.payloads["4"] == {"title": "ny"}
+    assert loaded.search(data[10], k=1)[0] == ["10"]
+
+def test_duplicate_ids_in_one_add_keep_the_last():
+    data = random_unit(3, 8)
+    index = IVFIndex(8, n_lists=4)
+    index.add(["a", "a", "b"], data, payloads=[{"v": 0}, {"v": 1}, {"v": 2}])
+    assert len(index) == 2
+    ids, _ = index.search(data[1], k=5)
+    assert sorted(ids) == ["a", "b"] and ids[0] == "a"
+    assert index.payloads["a"] == {"v": 1}
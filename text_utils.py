@@ -0,0 +1,10 @@
+# text_utils.py
+import re
+
+def normalize_text(s):
+    if not isinstance(s, str):
+        return ""
+    s = s.lower()
+    s = re.sub(r"[^\wåäö\- ]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
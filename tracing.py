@@ -0,0 +1,212 @@
+# tracing.py
+"""
+Lättviktig spårning: tidtagna spans runt stegen i sökflödet (hämta, embedda, rangordna,
+taxonomimatchning, chattens intents) och räknare, samt export i Prometheus textformat.
+
+Avstängd som standard (JOBCOACH_TRACING=1 slår på). Avstängd kostar ett span bara ett
+funktionsanrop som returnerar ett delat no-op-objekt.
+"""
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+ENABLED = os.environ.get("JOBCOACH_TRACING", "0") == "1"
+METRICS_PORT = int(os.environ.get("JOBCOACH_METRICS_PORT", "0"))   # 0 = ingen /metrics-server
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT = 1000   # senaste durationerna per span, för percentiler i panelen
+
+class _SpanStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=RECENT)
+
+class Tracer:
+    """
+    Samlar spans och räknare för hela processen (delas av alla sessioner).
+    """
+
+    def __init__(self):
+        self._spans = {}
+        self._counters = {}
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, error=False):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = _SpanStats()
+            stats.count += 1
+            stats.errors += error
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.recent.append(seconds)
+            for i, le in enumerate(BUCKETS):
+                if seconds <= le:
+                    stats.buckets[i] += 1
+                    break
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def add_collector(self, name, fn, counters=()):
+        """
+        fn() -> dict med mätvärden som läses vid export, t.ex. en cache:s stats().
+        Nycklarna i counters är kumulativa räknare (t.ex. träffar och missar) och
+        exporteras som Prometheus-counters (*_total); övriga som gauges.
+        """
+        with self._lock:
+            self._collectors[name] = (fn, frozenset(counters))
+
+    def _collect(self, collectors):
+        """
+        Läser alla collectors. En collector som kastar hoppas över (och räknas i
+        collector_errors) så att resten av mätvärdena ändå exporteras.
+        """
+        out = []
+        for prefix, (fn, counters) in sorted(collectors.items()):
+            try:
+                values = fn()
+            except Exception as e:
+                print(f"⚠️ Mätvärden från {prefix} kunde inte läsas: {type(e).__name__}: {e}")
+                self.count("collector_errors")
+                continue
+            out.append((prefix, counters, values))
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """
+        Sammanställning per span (antal, fel, medel/p50/p95/max i ms), räknare och insamlade värden.
+        """
+        with self._lock:
+            spans = {name: (s.count, s.errors, s.total, s.max, list(s.recent)) for name, s in self._spans.items()}
+            counters = dict(self._counters)
+            collectors = dict(self._collectors)
+        rows = []
+        for name, (n, errors, total, worst, recent) in sorted(spans.items()):
+            p50, p95 = np.percentile(recent, [50, 95]) if recent else (0.0, 0.0)
+            rows.append({"span": name, "antal": n, "fel": errors, "medel_ms": total / n * 1000,
+                         "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "max_ms": worst * 1000})
+        gauges = {}
+        for prefix, _, values in self._collect(collectors):
+            for key, value in values.items():
+                gauges[f"{prefix}_{key}"] = value
+        return {"spans": rows, "counters": counters, "gauges": gauges}
+
+    def prometheus_text(self):
+        """
+        Alla mätvärden i Prometheus textformat (version 0.0.4).
+        """
+        with self._lock:
+            spans = {name: (s.count, s.errors, s.total, list(s.buckets)) for name, s in self._spans.items()}
+            counters = dict(self._counters)
+            collectors = dict(self._collectors)
+        lines = ["# HELP jobcoach_span_seconds Tid per steg i sökflödet och chatten.",
+                 "# TYPE jobcoach_span_seconds histogram"]
+        for name, (n, _, total, buckets) in sorted(spans.items()):
+            cumulative = 0
+            for le, b in zip(BUCKETS, buckets):
+                cumulative += b
+                lines.append(f'jobcoach_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'jobcoach_span_seconds_bucket{{span="{name}",le="+Inf"}} {n}')
+            lines.append(f'jobcoach_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'jobcoach_span_seconds_count{{span="{name}"}} {n}')
+        lines += ["# HELP jobcoach_span_errors_total Steg som avslutades med ett undantag.",
+                  "# TYPE jobcoach_span_errors_total counter"]
+        for name, (_, errors, _, _) in sorted(spans.items()):
+            lines.append(f'jobcoach_span_errors_total{{span="{name}"}} {errors}')
+        for name, value in sorted(counters.items()):
+            metric = f"jobcoach_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for prefix, counter_keys, values in self._collect(collectors):
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)):
+                    metric = f"jobcoach_{_metric_name(prefix)}_{_metric_name(key)}"
+                    kind = "counter" if key in counter_keys else "gauge"
+                    if kind == "counter":
+                        metric += "_total"
+                    lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name.lower())
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        tracer.record(self.name, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+tracer = Tracer()
+
+def enabled():
+    return ENABLED
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = bool(flag)
+
+def span(name):
+    """
+    Tidtar ett block:  with span("rank"): ...
+    Undantag släpps igenom men räknas som fel för spannet.
+    """
+    return _Span(name) if ENABLED else _NOOP
+
+def count(name, n=1):
+    if ENABLED:
+        tracer.count(name, n)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = tracer.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """
+    Startar en /metrics-endpoint för Prometheus i en bakgrundstråd. Returnerar servern.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,239 @@
+# vector_index.py
+"""
+IVF-index (inverted file) för approximativ närmaste-granne-sökning i NumPy.
+Vektorerna antas vara L2-normaliserade, så likhet = skalärprodukt (cosinus).
+"""
+import json
+import os
+import numpy as np
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def spherical_kmeans(matrix, k, iters=10, seed=0):
+    """
+    k-means på enhetssfären: centroider = normaliserat medelvärde av tilldelade vektorer.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(matrix))
+    centroids = matrix[rng.choice(len(matrix), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, matrix)
+        empty = np.bincount(assign, minlength=k) == 0
+        # tomma kluster får en slumpad punkt i stället
+        sums[empty] = matrix[rng.choice(len(matrix), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    Vektorerna delas upp i n_lists kluster; en sökning jämför bara mot de nprobe
+    närmaste klustren. Stöder inkrementella insättningar, borttagning (tombstones
+    som städas bort med compact()) och persistens till en katalog.
+    Varje id kan bära en JSON-serialiserbar payload, t.ex. annonsens metadata.
+
+    Innan indexet har tränats (färre än train_size vektorer) söks allt exakt.
+    """
+
+    def __init__(self, dim, n_lists=256, nprobe=8, train_size=None):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.train_size = train_size or n_lists * 40
+        self.centroids = None
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._list_of = np.empty(0, dtype=np.int32)   # kluster per rad, -1 innan träning
+        self._alive = np.empty(0, dtype=bool)
+        self._size = 0
+        self.ids = []          # rad -> id
+        self._row = {}         # id -> rad
+        self.payloads = {}
+        self._lists = None     # cache: kluster -> array med rader
+
+    def __len__(self):
+        return len(self._row)
+
+    def __contains__(self, ad_id):
+        return ad_id in self._row
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def _grow(self, extra):
+        need = self._size + extra
+        cap = len(self._vectors)
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2, 1024)
+        vectors = np.empty((new_cap, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        list_of = np.full(new_cap, -1, dtype=np.int32)
+        list_of[:self._size] = self._list_of[:self._size]
+        alive = np.zeros(new_cap, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._vectors, self._list_of, self._alive = vectors, list_of, alive
+
+    def train(self, iters=10, seed=0):
+        """
+        Tränar klustren på de vektorer som finns och fördelar om alla rader.
+        """
+        rows = np.flatnonzero(self._alive[:self._size])
+        if len(rows) == 0:
+            return
+        self.centroids = spherical_kmeans(self._vectors[rows], self.n_lists, iters=iters, seed=seed)
+        self._assign(np.arange(self._size))
+
+    def _assign(self, rows):
+        if len(rows):
+            self._list_of[rows] = np.argmax(self._vectors[rows] @ self.centroids.T, axis=1)
+        self._lists = None
+
+    def add(self, ids, vectors, payloads=None):
+        """
+        Lägger till (eller ersätter) vektorer för ids.
+        """
+        vectors = _normalize(vectors).reshape(-1, self.dim)
+        if payloads is None:
+            payloads = [None] * len(ids)
+        last = {ad_id: i for i, ad_id in enumerate(ids)}
+        if len(last) < len(ids):
+            # samma id flera gånger i anropet: den sista vinner, som i BM25Index.add
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            vectors = vectors[keep]
+            payloads = [payloads[i] for i in keep]
+        self.delete([i for i in ids if i in self._row])
+        self._grow(len(ids))
+        start = self._size
+        rows = np.arange(start, start + len(ids))
+        self._vectors[rows] = vectors
+        self._alive[rows] = True
+        self._size += len(ids)
+        for ad_id, row, payload in zip(ids, rows.tolist(), payloads):
+            self.ids.append(ad_id)
+            self._row[ad_id] = row
+            if payload is not None:
+                self.payloads[ad_id] = payload
+        if self.trained:
+            self._assign(rows)
+        elif len(self) >= self.train_size:
+            self.train()
+
+    def delete(self, ids):
+        """
+        Markerar ids som borttagna. Returnerar antal borttagna.
+        """
+        removed = 0
+        for ad_id in ids:
+            row = self._row.pop(ad_id, None)
+            if row is None:
+                continue
+            self._alive[row] = False
+            self.payloads.pop(ad_id, None)
+            removed += 1
+        if removed:
+            self._lists = None
+        return removed
+
+    def compact(self):
+        """
+        Tar bort borttagna rader ur lagringen (ändrar radnumren).
+        """
+        rows = np.flatnonzero(self._alive[:self._size])
+        self._vectors = self._vectors[rows].copy()
+        self._list_of = self._list_of[rows].copy()
+        self._alive = np.ones(len(rows), dtype=bool)
+        self._size = len(rows)
+        self.ids = [self.ids[r] for r in rows.tolist()]
+        self._row = {ad_id: i for i, ad_id in enumerate(self.ids)}
+        self._lists = None
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            rows = np.flatnonzero(self._alive[:self._size])
+            order = rows[np.argsort(self._list_of[rows], kind="stable")]
+            bounds = np.searchsorted(self._list_of[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._lists
+
+    def vectors_for(self, ids):
+        return self._vectors[[self._row[ad_id] for ad_id in ids]]
+
+    def _top_k(self, rows, q, k):
+        if len(rows) == 0 or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+        scores = self._vectors[rows] @ q
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.ids[r] for r in rows[top].tolist()], scores[top]
+
+    def search(self, query_vec, k=10, nprobe=None):
+        """
+        De k mest lika vektorerna. Returnerar (ids, scores) sorterade med högst likhet först.
+        """
+        q = _normalize(query_vec).reshape(self.dim)
+        if not self.trained:
+            rows = np.flatnonzero(self._alive[:self._size])
+        else:
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+            lists = self._inverted_lists()
+            rows = np.concatenate([lists[i] for i in probe])
+        return self._top_k(rows, q, k)
+
+    def brute_force(self, query_vec, k=10):
+        """
+        Exakt sökning över alla vektorer (referens för recall-mätning).
+        """
+        q = _normalize(query_vec).reshape(self.dim)
+        if k <= 0 or not len(self):
+            return [], np.empty(0, dtype=np.float32)
+        # alla rader på en gång (utan att kopiera matrisen); borttagna rader maskas bort
+        scores = self._vectors[:self._size] @ q
+        scores[~self._alive[:self._size]] = -np.inf
+        k = min(k, len(self))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.ids[r] for r in top.tolist()], scores[top]
+
+    def save(self, directory):
+        """
+        Sparar indexet (komprimerat, utan borttagna rader) i en katalog.
+        """
+        self.compact()
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), self._vectors[:self._size])
+        np.save(os.path.join(directory, "lists.npy"), self._list_of[:self._size])
+        if self.trained:
+            np.save(os.path.join(directory, "centroids.npy"), self.centroids)
+        meta = {"dim": self.dim, "n_lists": self.n_lists, "nprobe": self.nprobe,
+                "train_size": self.train_size, "ids": self.ids}
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with open(os.path.join(directory, "payloads.json"), "w", encoding="utf-8") as f:
+            json.dump(self.payloads, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "index.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], n_lists=meta["n_lists"], nprobe=meta["nprobe"], train_size=meta["train_size"])
+        index._vectors = np.load(os.path.join(directory, "vectors.npy"))
+        index._list_of = np.load(os.path.join(directory, "lists.npy"))
+        index._size = len(index._vectors)
+        index._alive = np.ones(index._size, dtype=bool)
+        centroids = os.path.join(directory, "centroids.npy")
+        if os.path.exists(centroids):
+            index.centroids = np.load(centroids)
+        index.ids = meta["ids"]
+        index._row = {ad_id: i for i, ad_id in enumerate(index.ids)}
+        with open(os.path.join(directory, "payloads.json"), "r", encoding="utf-8") as f:
+            index.payloads = json.load(f)
+        return index